@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""Offline advisory index for the dependency-audit workflow of /shaktra:analyze.
+
+Usage: analysis_advisories.py import <DUMP>... [--db PATH] [--licenses CSV]
+       analysis_advisories.py stats [--db PATH]
+
+Imports OSV-format advisories (https://ossf.github.io/osv-schema/) into a SQLite
+database so lockfile audits need no network. A DUMP is an OSV zip export (such
+as an ecosystem's all.zip), a directory of advisory JSON files, or one JSON file
+holding an advisory or a list of them. Re-importing is incremental: an advisory
+is replaced only when its `modified` time is newer, and withdrawn ones are removed.
+
+Each affected range is stored as introduced/fixed/last_affected bounds indexed by
+(ecosystem, package); explicitly listed affected versions are indexed by
+(ecosystem, package, version). match() looks up a whole batch of packages with
+one join per table and compares versions in Python (ecosystem version orders are
+not lexical). --licenses loads `ecosystem,package,license` rows (CSV with a header)
+for packages whose lockfile does not record a license.
+
+The database defaults to $SHAKTRA_ADVISORY_DB, else .shaktra/advisories.db in
+$CLAUDE_PROJECT_DIR or the current directory. Only the stdlib sqlite3 module is used.
+Prints JSON counts. Exit 0 = success, Exit 1 = usage or input error.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import zipfile
+
+SCHEMA_VERSION = 1
+RANGE_TYPES = ("ECOSYSTEM", "SEMVER")  # GIT ranges name commits, not package versions
+SCHEMA = """
+DROP TABLE IF EXISTS advisories;
+DROP TABLE IF EXISTS ranges;
+DROP TABLE IF EXISTS versions;
+DROP TABLE IF EXISTS licenses;
+CREATE TABLE advisories (
+    id TEXT PRIMARY KEY,
+    modified TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    severity TEXT,
+    cve TEXT
+);
+CREATE TABLE ranges (
+    ecosystem TEXT NOT NULL,
+    package TEXT NOT NULL,
+    advisory TEXT NOT NULL,
+    introduced TEXT,
+    fixed TEXT,
+    last_affected TEXT
+);
+CREATE INDEX ranges_package ON ranges (ecosystem, package);
+CREATE INDEX ranges_advisory ON ranges (advisory);
+CREATE TABLE versions (ecosystem TEXT NOT NULL, package TEXT NOT NULL, version TEXT NOT NULL, advisory TEXT NOT NULL);
+CREATE INDEX versions_package ON versions (ecosystem, package, version);
+CREATE INDEX versions_advisory ON versions (advisory);
+CREATE TABLE licenses (ecosystem TEXT NOT NULL, package TEXT NOT NULL, license TEXT NOT NULL,
+                       PRIMARY KEY (ecosystem, package));
+"""
+_VERSION_RE = re.compile(r"^(?:(\d+)!)?[vV]?(\d+(?:\.\d+)*)(.*)$")
+_PHASES = {"dev": 0, "a": 1, "alpha": 1, "b": 2, "beta": 2, "c": 3, "rc": 3, "pre": 3, "preview": 3,
+           "post": 5, "rev": 5, "r": 5}
+_SEVERITIES = {"critical": "critical", "high": "high", "moderate": "medium", "medium": "medium", "low": "low"}
+
+
+def default_db() -> str:
+    return os.environ.get("SHAKTRA_ADVISORY_DB") or os.path.join(
+        os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()), ".shaktra", "advisories.db")
+
+
+def normalize_pypi(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def version_key(version: str | None) -> tuple | None:
+    """Sort key for PEP 440, SemVer, and Go module versions, or None if unparseable.
+
+    Release numbers compare numerically with trailing zeros ignored; pre-releases
+    (a/b/rc, SemVer `-x`, Go pseudo-versions) sort before the release and post-releases
+    after it. Build metadata (`+...`, including Go's +incompatible) is ignored.
+    """
+    m = _VERSION_RE.match((version or "").split("+", 1)[0].strip())
+    if not m:
+        return None
+    release = [int(n) for n in m.group(2).split(".")]
+    while release and release[-1] == 0:
+        release.pop()
+    tokens = re.findall(r"\d+|[a-z]+", m.group(3).lower())
+    phase = 4 if not tokens else 1 if tokens[0].isdigit() else _PHASES.get(tokens[0], 1)
+    return (int(m.group(1) or 0), tuple(release), phase,
+            tuple((0, int(t), "") if t.isdigit() else (1, 0, t) for t in tokens))
+
+
+def affected(version: str, introduced: str | None, fixed: str | None, last_affected: str | None) -> bool:
+    """Whether version lies in [introduced, fixed) or [introduced, last_affected]."""
+    key = version_key(version)
+    if key is None:
+        return False
+    low = version_key(introduced) if introduced not in (None, "0") else None
+    if low is not None and key < low:
+        return False
+    high = version_key(fixed)
+    if high is not None and key >= high:
+        return False
+    last = version_key(last_affected)
+    return last is None or key <= last
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open the advisory database, creating (or recreating, on a schema change) its tables."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.executescript(SCHEMA + f"PRAGMA user_version = {SCHEMA_VERSION};")
+    return conn
+
+
+def documents(dump: str):
+    """Yield the advisory dicts in an OSV zip, directory, or JSON file."""
+    def parsed(data):
+        doc = json.loads(data)
+        yield from (d for d in (doc if isinstance(doc, list) else [doc]) if isinstance(d, dict))
+
+    if os.path.isdir(dump):
+        for root, _, names in os.walk(dump):
+            for name in sorted(n for n in names if n.endswith(".json")):
+                with open(os.path.join(root, name), "rb") as f:
+                    yield from parsed(f.read())
+    elif zipfile.is_zipfile(dump):
+        with zipfile.ZipFile(dump) as archive:
+            for name in archive.namelist():
+                if name.endswith(".json"):
+                    yield from parsed(archive.read(name))
+    else:
+        with open(dump, "rb") as f:
+            yield from parsed(f.read())
+
+
+def rows(doc: dict) -> tuple[tuple, list[tuple], list[tuple]]:
+    """The advisories row and the ranges and versions rows of one OSV advisory."""
+    severity = (doc.get("database_specific") or {}).get("severity")
+    for item in doc.get("affected") or []:
+        severity = severity or (item.get("ecosystem_specific") or {}).get("severity")
+    cves = [a for a in [doc["id"]] + list(doc.get("aliases") or []) if str(a).startswith("CVE-")]
+    advisory = (doc["id"], str(doc.get("modified") or ""), str(doc.get("summary") or doc.get("details") or "")[:300],
+                _SEVERITIES.get(str(severity).lower()) if severity else None, cves[0] if cves else None)
+    ranges, versions = [], []
+    for item in doc.get("affected") or []:
+        pkg = item.get("package") or {}
+        ecosystem, name = pkg.get("ecosystem"), pkg.get("name")
+        if not ecosystem or not name:
+            continue
+        name = normalize_pypi(name) if ecosystem == "PyPI" else name
+        versions += [(ecosystem, name, str(v), doc["id"]) for v in item.get("versions") or []]
+        for span in item.get("ranges") or []:
+            if span.get("type") not in RANGE_TYPES:
+                continue
+            introduced = None
+            for event in span.get("events") or []:  # OSV lists events in version order
+                if "introduced" in event:
+                    if introduced is not None:
+                        ranges.append((ecosystem, name, doc["id"], introduced, None, None))
+                    introduced = str(event["introduced"])
+                elif "fixed" in event or "last_affected" in event:
+                    ranges.append((ecosystem, name, doc["id"], introduced or "0",
+                                   event.get("fixed"), event.get("last_affected")))
+                    introduced = None
+            if introduced is not None:
+                ranges.append((ecosystem, name, doc["id"], introduced, None, None))
+    return advisory, ranges, versions
+
+
+def import_dumps(conn: sqlite3.Connection, dumps: list[str]) -> dict[str, int]:
+    """Upsert the advisories of every dump in one transaction; return counts."""
+    stored = dict(conn.execute("SELECT id, modified FROM advisories"))
+    counts = {"read": 0, "imported": 0, "unchanged": 0, "withdrawn": 0}
+    with conn:
+        for dump in dumps:
+            for doc in documents(dump):
+                if not doc.get("id"):
+                    continue
+                counts["read"] += 1
+                advisory_id = str(doc["id"])
+                if not doc.get("withdrawn") and str(doc.get("modified") or "") <= stored.get(advisory_id, ""):
+                    counts["unchanged"] += 1
+                    continue
+                for table, column in (("ranges", "advisory"), ("versions", "advisory"), ("advisories", "id")):
+                    conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (advisory_id,))
+                if doc.get("withdrawn"):
+                    counts["withdrawn"] += 1
+                    stored.pop(advisory_id, None)
+                    continue
+                advisory, ranges, versions = rows(doc)
+                conn.execute("INSERT INTO advisories VALUES (?, ?, ?, ?, ?)", advisory)
+                conn.executemany("INSERT INTO ranges VALUES (?, ?, ?, ?, ?, ?)", ranges)
+                conn.executemany("INSERT INTO versions VALUES (?, ?, ?, ?)", versions)
+                stored[advisory_id] = advisory[1]
+                counts["imported"] += 1
+    return counts
+
+
+def import_licenses(conn: sqlite3.Connection, path: str) -> int:
+    with open(path, newline="", encoding="utf-8") as f:
+        entries = [(r["ecosystem"], normalize_pypi(r["package"]) if r["ecosystem"] == "PyPI" else r["package"],
+                    r["license"]) for r in csv.DictReader(f) if r.get("package") and r.get("license")]
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO licenses VALUES (?, ?, ?)", entries)
+    return len(entries)
+
+
+def match(conn: sqlite3.Connection, packages: list[dict]) -> dict[tuple, list[dict]]:
+    """Advisories affecting each pinned package, keyed by (ecosystem, name, version).
+
+    Each hit is {"id", "summary", "severity", "cve", "fixed"}; "fixed" is the first
+    fixed version of the matching range, or None.
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS audit (ecosystem TEXT, package TEXT, version TEXT)")
+    conn.execute("DELETE FROM audit")
+    conn.executemany("INSERT INTO audit VALUES (?, ?, ?)",
+                     {(p["ecosystem"], p["name"], p["version"]) for p in packages if p["version"]})
+    hits: dict[tuple, dict[str, str | None]] = {}
+    for eco, name, version, advisory, introduced, fixed, last in conn.execute(
+            "SELECT a.ecosystem, a.package, a.version, r.advisory, r.introduced, r.fixed, r.last_affected "
+            "FROM audit a JOIN ranges r ON r.ecosystem = a.ecosystem AND r.package = a.package"):
+        if affected(version, introduced, fixed, last):
+            hits.setdefault((eco, name, version), {})[advisory] = fixed
+    for eco, name, version, advisory in conn.execute(
+            "SELECT a.ecosystem, a.package, a.version, v.advisory FROM audit a JOIN versions v "
+            "ON v.ecosystem = a.ecosystem AND v.package = a.package AND v.version = a.version"):
+        hits.setdefault((eco, name, version), {}).setdefault(advisory, None)
+    ids = sorted({a for found in hits.values() for a in found})
+    details = {}
+    for start in range(0, len(ids), 500):  # stay under SQLite's bound-parameter limit
+        chunk = ids[start:start + 500]
+        details.update((row[0], row) for row in conn.execute(
+            f"SELECT id, summary, severity, cve FROM advisories WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+    return {key: [{"id": a, "summary": details[a][1], "severity": details[a][2], "cve": details[a][3],
+                   "fixed": fixed} for a, fixed in sorted(found.items()) if a in details]
+            for key, found in hits.items()}
+
+
+def licenses(conn: sqlite3.Connection, packages: list[dict]) -> dict[tuple, str]:
+    """Imported licenses for packages, keyed by (ecosystem, name)."""
+    wanted = {(p["ecosystem"], p["name"]) for p in packages}
+    return {(e, n): lic for e, n, lic in conn.execute("SELECT ecosystem, package, license FROM licenses")
+            if (e, n) in wanted}
+
+
+def stats(conn: sqlite3.Connection) -> dict:
+    return {
+        "advisories": conn.execute("SELECT COUNT(*) FROM advisories").fetchone()[0],
+        "packages": dict(conn.execute("SELECT ecosystem, COUNT(DISTINCT package) FROM ranges GROUP BY ecosystem")),
+        "licenses": conn.execute("SELECT COUNT(*) FROM licenses").fetchone()[0],
+        "last_modified": conn.execute("SELECT MAX(modified) FROM advisories").fetchone()[0],
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    command = args.pop(0) if args else None
+    db, license_csv, dumps = default_db(), None, []
+    while args:
+        arg = args.pop(0)
+        if arg == "--db" and args:
+            db = args.pop(0)
+        elif arg == "--licenses" and args:
+            license_csv = args.pop(0)
+        elif not arg.startswith("-") and command == "import":
+            dumps.append(arg)
+        else:
+            command = None
+    if command not in ("import", "stats") or (command == "import" and not (dumps or license_csv)):
+        print(__doc__.strip().splitlines()[2], file=sys.stderr)
+        sys.exit(1)
+    missing = [p for p in dumps + ([license_csv] if license_csv else []) if not os.path.exists(p)]
+    if missing:
+        print(f"Error: {missing[0]} not found", file=sys.stderr)
+        sys.exit(1)
+
+    conn = connect(db)
+    report = {"db": db}
+    try:
+        if command == "import":
+            report.update(import_dumps(conn, dumps))
+            if license_csv:
+                report["licenses_imported"] = import_licenses(conn, license_csv)
+        report.update(stats(conn))
+    except (ValueError, KeyError, zipfile.BadZipFile) as e:
+        print(f"Error: {type(e).__name__}: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
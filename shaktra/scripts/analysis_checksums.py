@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Checksum engine for /shaktra:analyze incremental refresh.
+
+Usage: analysis_checksums.py [PROJECT_DIR] [--update] [--workers N] [--detector auto|git|sha256]
+
+Compares the source files of .shaktra/analysis/static.yml (file_inventory) with
+.shaktra/analysis/checksum.yml and prints the stale dimensions as JSON.
+
+Each checksum.yml entry keeps the file's size, mtime_ns, and inode next to its
+SHA256, the way git's index does. A file whose stat matches its entry is not
+read; the rest are hashed in a thread pool with chunked reads (hashlib releases
+the GIL). Files modified within RACY_WINDOW_NS of the recorded stat (on
+whole-second mtime filesystems), or after it, are always hashed.
+
+In a git repository the default detector checks only the files git reports as
+changed since the commit recorded in checksum.yml (analysis_git.py); without
+git, or when that commit is gone, every file goes through the stat check.
+Renames (from git, or a deleted and an added file with the same hash) keep
+their dimensions and are stale only if their content also changed.
+
+Stale dimensions come straight from each changed or deleted file's
+files[].dimensions. D9 (git intelligence) is always stale. Files in static.yml
+with no checksum entry are reported as added; they belong to no dimension yet.
+
+--update rewrites checksum.yml with the current hashes, stat fields, and git
+baseline, keeping each file's dimensions (renamed files keep those of their old
+path; added files get an empty list for the Lead to fill in).
+Exit 0 = success, Exit 1 = usage or input error.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import analysis_git
+from yaml_cache import load_yaml
+
+ALGORITHM = "SHA256"
+RACY_WINDOW_NS = 2_000_000_000
+READ_CHUNK = 1 << 20
+ALWAYS_STALE = {"D9": "always stale (new commits)"}
+DETECTORS = ("auto", "git", "sha256")
+
+
+def analysis_dir(project: str) -> str:
+    return os.path.join(project, ".shaktra", "analysis")
+
+
+def inventory(static: dict) -> list[str]:
+    """Source file paths listed in static.yml file_inventory.by_type[].files."""
+    paths = set()
+    by_type = (static.get("file_inventory") or {}).get("by_type") if isinstance(static, dict) else None
+    for group in by_type if isinstance(by_type, list) else []:
+        files = group.get("files") if isinstance(group, dict) else None
+        if isinstance(files, list):
+            paths.update(str(f) for f in files if f)
+    return sorted(paths)
+
+
+def stored_entries(checksums: dict) -> dict[str, dict]:
+    files = checksums.get("files") if isinstance(checksums, dict) else None
+    files = files if isinstance(files, list) else []
+    return {str(e["path"]): e for e in files if isinstance(e, dict) and e.get("path")}
+
+
+def sha256_file(path: str) -> str | None:
+    """SHA256 of path in READ_CHUNK reads, or None if it vanished or is unreadable."""
+    digest, buffer = hashlib.sha256(), bytearray(READ_CHUNK)
+    view = memoryview(buffer)
+    try:
+        with open(path, "rb", buffering=0) as f:
+            while n := f.readinto(buffer):
+                digest.update(view[:n])
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def stat_matches(entry: dict, st: os.stat_result, taken_ns: int) -> bool:
+    """True when st equals the entry's recorded stat and that record was not racy."""
+    if (entry.get("size"), entry.get("mtime_ns"), entry.get("inode")) != (st.st_size, st.st_mtime_ns, st.st_ino):
+        return False
+    coarse = st.st_mtime_ns % 1_000_000_000 == 0
+    return taken_ns - st.st_mtime_ns > (RACY_WINDOW_NS if coarse else 0)
+
+
+def scan(project: str, paths, stored: dict[str, dict], taken_ns: int, workers: int) -> dict:
+    """Classify each of paths against its stored entry; hash only stat misses.
+
+    Returns {"current": {path: {hash, size, mtime_ns, inode}}, "changed", "added",
+    "deleted", "stat_hits", "hashed"}.
+    """
+    current, to_hash, deleted = {}, [], []
+    stat_hits = 0
+    for path in sorted(paths):
+        try:
+            st = os.stat(os.path.join(project, path))
+        except OSError:
+            if path in stored:
+                deleted.append(path)
+            continue
+        record = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+        entry = stored.get(path)
+        if entry is not None and entry.get("hash") and stat_matches(entry, st, taken_ns):
+            current[path] = {"hash": entry["hash"], **record}
+            stat_hits += 1
+        else:
+            current[path] = record
+            to_hash.append(path)
+
+    jobs = [os.path.join(project, p) for p in to_hash]
+    if len(jobs) > 1 and workers > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            digests = list(pool.map(sha256_file, jobs))
+    else:
+        digests = [sha256_file(p) for p in jobs]
+
+    changed, added = [], []
+    for path, digest in zip(to_hash, digests):
+        if digest is None:  # vanished or unreadable since the stat
+            del current[path]
+            if path in stored:
+                deleted.append(path)
+            continue
+        current[path]["hash"] = digest
+        if path not in stored:
+            added.append(path)
+        elif stored[path].get("hash") != digest:
+            changed.append(path)
+    return {"current": current, "changed": changed, "added": added, "deleted": sorted(deleted),
+            "stat_hits": stat_hits, "hashed": len(jobs)}
+
+
+def pair_renames(result: dict, stored: dict[str, dict], renames: dict) -> dict[str, str]:
+    """Turn deleted/added pairs into renames in result; return {new path: old path}.
+
+    renames holds git's {old: (new, similarity)}; remaining pairs match by hash.
+    A rename whose content changed is also listed in result["changed"].
+    """
+    deleted, added, current = set(result["deleted"]), set(result["added"]), result["current"]
+    origin, moved = {}, []
+    by_hash = {}
+    for path in sorted(deleted):
+        by_hash.setdefault(stored[path].get("hash"), []).append(path)
+    pairs = [(old, new, score) for old, (new, score) in sorted(renames.items())
+             if old in deleted and new in added]
+    for path in sorted(added):
+        candidates = by_hash.get(current[path]["hash"])
+        if candidates and path not in {new for _, new, _ in pairs}:
+            pairs.append((candidates.pop(0), path, 100))
+    for old, new, score in pairs:
+        if old not in deleted or new not in added:
+            continue
+        deleted.discard(old)
+        added.discard(new)
+        origin[new] = old
+        modified = current[new]["hash"] != stored[old].get("hash")
+        moved.append({"from": old, "to": new, "similarity": score, "modified": modified})
+        if modified:
+            result["changed"].append(new)
+    result.update(deleted=sorted(deleted), added=sorted(added), renamed=moved)
+    result["changed"].sort()
+    return origin
+
+
+def detect(project: str, paths: list[str], stored: dict[str, dict], checksums: dict, detector: str,
+           workers: int) -> dict:
+    """Run the git or SHA256 detector and pair renames; see the module docstring."""
+    taken_ns = checksums.get("stat_taken_ns", 0)
+    taken_ns = taken_ns if isinstance(taken_ns, int) else 0
+    everything = set(paths) | set(stored)
+    check, renames, reason = None, {}, None
+    if detector == "git" or (detector == "auto" and analysis_git.has_git(project)):
+        check, renames, reason = analysis_git.candidates(project, checksums.get("git"), everything, stored)
+    result = scan(project, everything if check is None else check, stored, taken_ns, workers)
+    unchanged = everything - check if check is not None else set()
+    for path in unchanged:  # git reports no change since the baseline: reuse the stored entry
+        result["current"][path] = {k: stored[path].get(k) for k in ("hash", "size", "mtime_ns", "inode")}
+    result.update(detector="sha256" if check is None else "git", fallback_reason=reason,
+                  git_unchanged=len(unchanged))
+    result["origin"] = pair_renames(result, stored, renames)
+    return result
+
+
+def stale_dimensions(stored: dict[str, dict], paths: list[str]) -> dict[str, list[str]]:
+    """Map each dimension to the given files (changed or deleted) it analyzed."""
+    stale: dict[str, list[str]] = {}
+    for path in paths:
+        dims = stored.get(path, {}).get("dimensions")
+        for dim in dims if isinstance(dims, list) else []:
+            stale.setdefault(str(dim), []).append(path)
+    return stale
+
+
+def render(stored: dict[str, dict], result: dict, taken_ns: int, git: dict | None) -> dict:
+    """Build the new checksum.yml document, keeping each file's (or its old path's) dimensions."""
+    files, counts = [], {}
+    current, origin = result["current"], result["origin"]
+    for path in sorted(current):
+        dims = stored.get(origin.get(path, path), {}).get("dimensions")
+        dims = [str(d) for d in dims] if isinstance(dims, list) else []
+        for dim in dims:
+            counts[dim] = counts.get(dim, 0) + 1
+        record = current[path]
+        files.append({"path": path, **{k: record.get(k) for k in ("hash", "size", "mtime_ns", "inode")},
+                      "dimensions": dims})
+    return {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "algorithm": ALGORITHM,
+        "stat_taken_ns": taken_ns,
+        **({"git": git} if git else {}),
+        "files": files,
+        "dimension_file_counts": dict(sorted(counts.items())),
+    }
+
+
+def write_checksums(path: str, doc: dict, yaml) -> None:
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            yaml.dump(doc, f, Dumper=dumper, default_flow_style=False, sort_keys=False)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def main():
+    project, update, workers, detector = None, False, min(32, (os.cpu_count() or 1) + 4), "auto"
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        if arg == "--update":
+            update = True
+        elif arg == "--workers" and args and args[0].isdigit():
+            workers = max(1, int(args.pop(0)))
+        elif arg == "--detector" and args and args[0] in DETECTORS:
+            detector = args.pop(0)
+        elif not arg.startswith("-") and project is None:
+            project = arg
+        else:
+            print(__doc__.strip().splitlines()[2], file=sys.stderr)
+            sys.exit(1)
+
+    def import_yaml():
+        try:
+            import yaml
+            return yaml
+        except ImportError:
+            print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
+            sys.exit(1)
+
+    project = os.path.abspath(project or os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+    static_path = os.path.join(analysis_dir(project), "static.yml")
+    checksum_path = os.path.join(analysis_dir(project), "checksum.yml")
+    if not os.path.exists(static_path):
+        print(f"Error: {static_path} not found — run Stage 1 first", file=sys.stderr)
+        sys.exit(1)
+    checksums = load_yaml(checksum_path, import_yaml) if os.path.exists(checksum_path) else {}
+    checksums = checksums if isinstance(checksums, dict) else {}
+    stored = stored_entries(checksums)
+
+    started_ns = time.time_ns()
+    result = detect(project, inventory(load_yaml(static_path, import_yaml)), stored, checksums, detector, workers)
+    origin = result["origin"]
+    stale = stale_dimensions(stored, [origin.get(p, p) for p in result["changed"]] + result["deleted"])
+    report = {
+        "algorithm": ALGORITHM,
+        "files_checked": len(result["current"]) + len(result["deleted"]),
+        **{k: result[k] for k in ("detector", "fallback_reason", "git_unchanged", "stat_hits", "hashed",
+                                  "changed", "added", "deleted", "renamed")},
+        "stale_dimensions": [
+            {"dimension": dim, "changed_files": len(stale[dim]), "files": stale[dim]} for dim in sorted(stale)
+        ] + [{"dimension": dim, "changed_files": None, "reason": reason} for dim, reason in ALWAYS_STALE.items()],
+    }
+    if update:
+        git = analysis_git.baseline(project, result["current"]) if detector != "sha256" else None
+        write_checksums(checksum_path, render(stored, result, started_ns, git), import_yaml())
+        report["updated"] = os.path.relpath(checksum_path, project)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
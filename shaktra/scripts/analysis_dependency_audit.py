@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Offline lockfile audit for the dependency-audit workflow of /shaktra:analyze.
+
+Usage: analysis_dependency_audit.py [PROJECT_DIR] [--db PATH] [--dry-run]
+
+Parses every lockfile in the project (analysis_lockfiles.py) and resolves all
+pinned packages against the advisory index (analysis_advisories.py) in one
+batch, then writes .shaktra/analysis/dependency-audit.yml in the
+analysis-output-schemas.md schema:
+
+  critical   one item per vulnerable package@version, with the lowest version
+             that fixes every matched advisory and a [Security] story draft
+  license    AGPL/SSPL, GPL, and UNLICENSED packages (an SPDX `OR` expression is
+             flagged only when every alternative is)
+  outdated   direct dependencies a major version behind, from dependencies.yml
+  overlap    carried over from dependencies.yml
+
+upgrade_difficulty of outdated items is a first estimate from the major-version
+gap, and overlap stories do not name a winner; the CBA analyzer refines both and
+the summary in dependency-audit mode. Without an advisory database the audit
+still runs and reports `advisory_db: null` (vulnerabilities not checked).
+
+--dry-run prints the report without writing the file.
+Prints a JSON report. Exit 0 = success, Exit 1 = usage or input error.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+
+import analysis_advisories
+import analysis_lockfiles
+import analysis_static
+from yaml_cache import load_yaml
+
+_SEVERITY_RANK = {"critical": 0, "high": 1, "medium": 2, "low": 3, None: 4}
+_LICENSE_RULES = [
+    (re.compile(r"\bAGPL|\bSSPL", re.IGNORECASE), "network copyleft: offering the software as a service can require "
+     "releasing the project's source", "Legal review, or replace with a permissively licensed alternative"),
+    (re.compile(r"(?<![L\w])GPL", re.IGNORECASE), "strong copyleft: incompatible with proprietary distribution",
+     "Confirm the distribution model permits GPL, else replace the package"),
+    (re.compile(r"^UNLICENSED$|^SEE LICENSE", re.IGNORECASE), "no open-source license granted",
+     "Obtain the license terms or replace the package"),
+]
+
+
+def major(version: str | None) -> int:
+    key = analysis_advisories.version_key(version)
+    return key[1][0] if key and key[1] else 0
+
+
+def license_issue(license: str) -> tuple[str, str] | None:
+    """(issue, recommendation) when every alternative of an SPDX expression is flagged."""
+    found = []
+    for alternative in re.split(r"\s+OR\s+", license.strip("() ")):
+        rule = next(((issue, advice) for regex, issue, advice in _LICENSE_RULES if regex.search(alternative)), None)
+        if rule is None:
+            return None
+        found.append(rule)
+    return found[0] if found else None
+
+
+def critical_item(package: dict, advisories: list[dict]) -> dict:
+    name, version = package["name"], package["version"]
+    advisories = sorted(advisories, key=lambda a: (_SEVERITY_RANK.get(a["severity"], 4), a["id"]))
+    fixes = [a["fixed"] for a in advisories if a["fixed"]]
+    upgrade_to = max(fixes, key=analysis_advisories.version_key) if fixes else "none available"
+    first = advisories[0]
+    issue = f"[{first['severity'] or 'unrated'}] {first['id']}: {first['summary']}"
+    if len(advisories) > 1:
+        issue += f" (+{len(advisories) - 1} more: {', '.join(a['id'] for a in advisories[1:])})"
+    if fixes and len(fixes) < len(advisories):
+        issue += "; some advisories have no fixed version"
+    cve = next((a["cve"] for a in advisories if a["cve"]), None)
+    breaking = [f"Major version change {major(version)} -> {major(upgrade_to)}: review the changelog for API changes"] \
+        if fixes and major(upgrade_to) != major(version) else []
+    return {
+        "package": name, "version": version, "issue": issue, "cve": cve, "upgrade_to": upgrade_to,
+        "breaking_changes": breaking,
+        "story_draft": {
+            "title": f"[Security] Remediate {name}@{version} — {cve or first['id']}",
+            "scope": f"{package['source']} and all files importing or depending on {name}",
+            "acceptance_criteria": [
+                f"Package upgraded to {upgrade_to} or replaced with a maintained alternative" if fixes
+                else f"{name} replaced with a maintained alternative or the vulnerable code path mitigated",
+                "All existing tests pass after upgrade",
+                f"No new vulnerability findings for {name}",
+                "Breaking changes addressed (list specific API changes if applicable)",
+            ],
+        },
+    }
+
+
+def audit(project: str, db: str) -> tuple[dict, dict]:
+    """Return (dependency-audit.yml document, report)."""
+    packages, errors = analysis_lockfiles.collect(project, analysis_static.list_files(project))
+    hits, imported_licenses = None, {}
+    if os.path.exists(db):
+        conn = analysis_advisories.connect(db)
+        hits = analysis_advisories.match(conn, packages)
+        imported_licenses = analysis_advisories.licenses(conn, packages)
+        conn.close()
+
+    critical, license_items, unhealthy = [], [], set()
+    for package in packages:
+        key = (package["ecosystem"], package["name"], package["version"])
+        if hits and key in hits:
+            rank = min(_SEVERITY_RANK.get(a["severity"], 4) for a in hits[key])
+            critical.append((rank, package["name"], critical_item(package, hits[key])))
+            unhealthy.add(package["name"])
+        license = package["license"] or imported_licenses.get(key[:2])
+        flagged = license_issue(license) if license else None
+        if flagged:
+            license_items.append({"package": package["name"], "license": license, "issue": flagged[0],
+                                  "recommendation": flagged[1]})
+            unhealthy.add(package["name"])
+    critical = [item for _, _, item in sorted(critical, key=lambda c: c[:2])]
+
+    deps_path = os.path.join(project, ".shaktra", "analysis", "dependencies.yml")
+    deps = load_yaml(deps_path, _import_yaml) if os.path.exists(deps_path) else None
+    details = deps.get("details") if isinstance(deps, dict) and isinstance(deps.get("details"), dict) else {}
+    outdated = []
+    for entry in details.get("direct") or []:
+        current, latest = str(entry.get("version") or ""), str(entry.get("latest_version") or "")
+        behind = major(latest) - major(current) if current and latest else 0
+        if behind >= 1:
+            outdated.append({"package": entry.get("name"), "current_version": current, "latest_version": latest,
+                             "versions_behind": behind, "upgrade_difficulty": "moderate" if behind == 1 else "hard"})
+            unhealthy.update((entry.get("name"), analysis_advisories.normalize_pypi(str(entry.get("name")))))
+    overlap = [{"purpose": o.get("purpose"), "libraries": o.get("libraries") or [],
+                "recommendation": o.get("recommendation"),
+                "story_draft": {"title": f"[Consolidate] Standardize on one library for {o.get('purpose')}",
+                                "scope": "All files using the replaced libraries, plus the package manifest",
+                                "acceptance_criteria": ["All usage of the replaced libraries moved to the chosen one",
+                                                        "Replaced libraries removed from dependencies",
+                                                        "All existing tests pass", "No functionality regression"]}}
+               for o in details.get("overlaps") or [] if isinstance(o, dict)]
+
+    plan = [{"priority": 1, "story_draft": {**{k: c["story_draft"][k] for k in ("title", "scope")},
+                                            "packages": [c["package"]],
+                                            "acceptance_criteria": list(c["story_draft"]["acceptance_criteria"])},
+             "estimated_effort": "large" if c["upgrade_to"] == "none available"
+             else "medium" if c["breaking_changes"] else "small"} for c in critical]
+    for group, priority, effort in (([o for o in outdated if o["upgrade_difficulty"] == "hard"], 2, "large"),
+                                    ([o for o in outdated if o["upgrade_difficulty"] != "hard"], 3, "medium")):
+        if group:
+            plan.append({"priority": priority, "story_draft": {
+                "title": f"[Upgrade] Update {'major-gap' if priority == 2 else 'outdated'} packages to latest",
+                "scope": "All packages in the group with their importing files",
+                "packages": [o["package"] for o in group],
+                "acceptance_criteria": ["All packages in group upgraded to specified versions",
+                                        "All existing tests pass after upgrade",
+                                        "Deprecated API usage replaced with current equivalents",
+                                        "No new type errors or linting failures introduced"]},
+                "estimated_effort": effort})
+    plan += [{"priority": 3, "story_draft": {**{k: o["story_draft"][k] for k in ("title", "scope")},
+                                             "packages": list(o["libraries"]),
+                                             "acceptance_criteria": list(o["story_draft"]["acceptance_criteria"])},
+              "estimated_effort": "medium"} for o in overlap]
+
+    total = len({(p["ecosystem"], p["name"]) for p in packages})
+    healthy = len({(p["ecosystem"], p["name"]) for p in packages if p["name"] not in unhealthy})
+    lockfiles = sorted({p["source"] for p in packages})
+    summary = [f"{total} dependencies audited from {len(lockfiles)} lockfile(s): {', '.join(lockfiles) or 'none'}.",
+               f"{len(critical)} vulnerable package(s): " + (", ".join(
+                   f"{c['package']}@{c['version']}" + (f" ({c['cve']})" if c["cve"] else "")
+                   for c in critical[:10]) or "none") + "." if hits is not None
+               else "Vulnerabilities not checked: no advisory database (import one with analysis_advisories.py).",
+               f"{len(outdated)} outdated (major version behind), {len(overlap)} overlap group(s), "
+               f"{len(license_items)} license issue(s).",
+               "Upgrade order: security remediations first, then major-gap upgrades, then grouped upgrades "
+               "and consolidations."]
+    doc = {
+        "summary": "\n".join(summary) + "\n",
+        "risks": {"critical": critical, "outdated": outdated, "overlap": overlap, "license": license_items},
+        "upgrade_plan": plan,
+        "metrics": {"total_dependencies": total, "healthy_percent": round(100 * healthy / total) if total else 100,
+                    "critical_count": len(critical), "outdated_count": len(outdated)},
+    }
+    report = {"lockfiles": lockfiles, "packages": len(packages),
+              "unpinned": sum(1 for p in packages if not p["version"]),
+              "advisory_db": db if hits is not None else None, "vulnerable": len(critical),
+              "advisories": sum(len(v) for v in (hits or {}).values()), "license_issues": len(license_items),
+              "outdated": len(outdated), "overlap": len(overlap), "errors": errors}
+    return doc, report
+
+
+def _import_yaml():
+    try:
+        import yaml
+        return yaml
+    except ImportError:
+        print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    project, db, dry_run = None, None, False
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        if arg == "--dry-run":
+            dry_run = True
+        elif arg == "--db" and args:
+            db = args.pop(0)
+        elif not arg.startswith("-") and project is None:
+            project = arg
+        else:
+            print(__doc__.strip().splitlines()[2], file=sys.stderr)
+            sys.exit(1)
+    project = os.path.abspath(project or os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+    if not os.path.isdir(project):
+        print(f"Error: {project} not found", file=sys.stderr)
+        sys.exit(1)
+    db = db or os.environ.get("SHAKTRA_ADVISORY_DB") or os.path.join(project, ".shaktra", "advisories.db")
+
+    yaml = _import_yaml()
+    doc, report = audit(project, db)
+    if not dry_run:
+        path = os.path.join(project, ".shaktra", "analysis", "dependency-audit.yml")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            yaml.dump(doc, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+                      default_flow_style=False, sort_keys=False, allow_unicode=True)
+        os.replace(tmp, path)
+        report["written"] = os.path.relpath(path, project)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Git-based change detection for analysis_checksums.py.
+
+checksum.yml records the commit (and tree) the analysis was built from, plus the
+files that differed from that commit or were not tracked at the time ("dirty").
+On refresh, `git diff --name-status -M <commit>` against the working tree lists
+the tracked files changed since then, renames included. Only those files, the
+recorded dirty files, and files without a checksum entry are stat-checked and
+hashed; every other file is unchanged by construction and is not even stat'ed.
+
+Every function returns None when git is unavailable or the recorded commit is
+gone (shallow clone, rebase, gc), so the caller can fall back to the SHA256 path.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+
+GIT_TIMEOUT = 120
+
+
+def has_git(project: str) -> bool:
+    """True when project is inside a directory tree with a .git entry."""
+    head = os.path.abspath(project)
+    while True:
+        if os.path.exists(os.path.join(head, ".git")):
+            return True
+        parent = os.path.dirname(head)
+        if parent == head:
+            return False
+        head = parent
+
+
+def git(project: str, *args: str) -> str | None:
+    """Run git in project and return stdout, or None on any failure."""
+    try:
+        result = subprocess.run(["git", "-C", project, *args], capture_output=True, text=True,
+                                timeout=GIT_TIMEOUT, encoding="utf-8", errors="surrogateescape")
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def head(project: str) -> dict | None:
+    """Return {"commit", "tree"} of HEAD, or None."""
+    out = git(project, "rev-parse", "HEAD", "HEAD^{tree}")
+    lines = out.split() if out else []
+    return {"commit": lines[0], "tree": lines[1]} if len(lines) == 2 else None
+
+
+def changes_since(project: str, commit: str) -> dict | None:
+    """Files changed between commit and the working tree, relative to project.
+
+    Returns {"paths": set of changed, added, or deleted paths (both sides of a rename),
+    "renames": {old: (new, similarity percent)}}, or None if commit is unknown.
+    """
+    if git(project, "cat-file", "-e", f"{commit}^{{commit}}") is None:
+        return None
+    out = git(project, "diff", "--no-ext-diff", "--name-status", "-M", "-z", "--relative", commit, "--")
+    if out is None:
+        return None
+    fields = out.split("\0")
+    paths, renames = set(), {}
+    i = 0
+    while i < len(fields) and fields[i]:
+        status = fields[i]
+        if status[0] in "RC":
+            old, new = fields[i + 1], fields[i + 2]
+            paths.update((old, new) if status[0] == "R" else (new,))
+            if status[0] == "R":
+                renames[old] = (new, int(status[1:] or 100))
+            i += 3
+        else:
+            paths.add(fields[i + 1])
+            i += 2
+    return {"paths": paths, "renames": renames}
+
+
+def candidates(project: str, recorded, paths: set[str], stored: dict) -> tuple[set | None, dict, str | None]:
+    """Return (paths to check, git renames {old: (new, similarity)}, fallback reason).
+
+    The paths are those git changed since the recorded commit, the recorded dirty
+    files, and files without a stored entry. None means "check every file".
+    """
+    recorded = recorded if isinstance(recorded, dict) else {}
+    if not recorded.get("commit"):
+        return None, {}, "no git baseline in checksum.yml"
+    changes = changes_since(project, str(recorded["commit"]))
+    if changes is None:
+        return None, {}, f"commit {str(recorded['commit'])[:12]} not found"
+    dirty = recorded.get("dirty") if isinstance(recorded.get("dirty"), list) else []
+    check = changes["paths"] | {str(p) for p in dirty} | (paths - set(stored))
+    return check & (paths | {new for new, _ in changes["renames"].values()}), changes["renames"], None
+
+
+def tracked(project: str) -> set[str] | None:
+    """Paths git tracks under project (relative to it), or None."""
+    out = git(project, "ls-files", "-z")
+    return None if out is None else {p for p in out.split("\0") if p}
+
+
+def baseline(project: str, paths) -> dict | None:
+    """The git fields to record in checksum.yml for the analysis of paths, or None."""
+    current = head(project)
+    if current is None:
+        return None
+    changes = changes_since(project, current["commit"])
+    known = tracked(project)
+    if changes is None or known is None:
+        return None
+    paths = set(paths)
+    dirty = {p for p in changes["paths"] if p in paths} | {p for p in paths if p not in known}
+    return {**current, "dirty": sorted(dirty)}
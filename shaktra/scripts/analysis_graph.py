@@ -0,0 +1,164 @@
+"""Cross-file graphs of static.yml, merged from per-file parser facts.
+
+analysis_static.py keeps the facts of every file (analysis_parsers.py) in its
+cache and calls merge() with all of them, so a refresh that re-parsed a handful
+of files still produces the complete dependency graph, call graph, type
+hierarchy, and pattern list.
+
+Imports are resolved to project files where the language allows it: Python and
+Java/Kotlin dotted names (under any source root), relative JavaScript/TypeScript
+specifiers, Go package directories, and Rust `crate::` paths and `mod` items.
+Unresolved imports are kept as written (third-party modules).
+
+A call is attributed to a definition of the same name in the calling file, else
+in the files it imports, else to the only file defining that name; ambiguous
+calls are left out. Each definition lists at most MAX_CALL_SITES call sites.
+"""
+
+from __future__ import annotations
+
+import os
+import posixpath
+import re
+
+MAX_CALL_SITES = 25
+DOTTED_EXTENSIONS = (".py", ".pyi", ".java", ".kt")
+JS_SUFFIXES = ("", ".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", "/index.ts", "/index.tsx", "/index.js")
+PATTERNS = {
+    "singleton": re.compile(r"Singleton$|^get_?[Ii]nstance$"),
+    "factory": re.compile(r"Factory$|^(create|make|build)_[a-z]"),
+    "repository": re.compile(r"Repo(sitory)?$"),
+    "service": re.compile(r"Service$"),
+    "middleware": re.compile(r"Middleware$|^middleware"),
+    "controller": re.compile(r"Controller$"),
+    "handler": re.compile(r"Handler$"),
+    "adapter": re.compile(r"Adapter$"),
+    "observer": re.compile(r"(Observer|Listener|Subscriber)$"),
+    "builder": re.compile(r"Builder$"),
+    "strategy": re.compile(r"Strategy$"),
+}
+
+
+def module_index(paths) -> dict[str, list[tuple[int, str]]]:
+    """Dotted name -> [(stripped leading parts, path)] for every suffix of each module path."""
+    index: dict[str, list[tuple[int, str]]] = {}
+    for path in paths:
+        stem, ext = os.path.splitext(path)
+        if ext not in DOTTED_EXTENSIONS:
+            continue
+        parts = stem.split("/")
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        for skip in range(len(parts)):
+            index.setdefault(".".join(parts[skip:]), []).append((skip, path))
+    return index
+
+
+def _lookup(index: dict, dotted: str) -> list[str]:
+    """Paths for dotted, preferring the ones found under the shallowest source root."""
+    found = index.get(dotted)
+    if not found:
+        return []
+    best = min(skip for skip, _ in found)
+    return [path for skip, path in found if skip == best]
+
+
+def resolve(path: str, language: str, imported: list, index: dict, files: set[str], dirs: set[str]) -> list[str]:
+    """Project files (or directories, for Go) an import refers to, else [the import as written]."""
+    module, level, names = imported
+    folder = posixpath.dirname(path)
+    found: list[str] = []
+    if language == "python" and level:
+        base = folder.split("/") if folder else []
+        base = base[:len(base) - (level - 1)] if level > 1 else base
+        prefix = "/".join(base + (module.split(".") if module else []))
+        for target in [prefix] + [f"{prefix}/{n}" if prefix else n for n in names]:
+            found += [f for f in (f"{target}.py", f"{target}/__init__.py") if f in files]
+        return sorted(set(found)) or ["." * level + module]
+    if language in ("python", "java"):
+        found = _lookup(index, module.rstrip(".*"))
+        for name in names:
+            found += _lookup(index, f"{module}.{name}")
+        if language == "java" and not found and "." in module:  # member import: com.x.Class.member
+            found = _lookup(index, module.rsplit(".", 1)[0])
+    elif language == "javascript" and module.startswith("."):
+        target = posixpath.normpath(posixpath.join(folder, module))
+        stem = os.path.splitext(target)[0]
+        found = [c for c in (target + s for s in JS_SUFFIXES) if c in files][:1] or \
+                [c for c in (stem + s for s in JS_SUFFIXES[1:]) if c in files][:1]
+    elif language == "go":
+        found = sorted((d for d in dirs if d and (module == d or module.endswith(f"/{d}"))), key=len)[-1:]
+    elif language == "rust":
+        parts = path.split("/")
+        crate = "/".join(parts[:parts.index("src") + 1]) if "src" in parts[:-1] else folder
+        if module.startswith("crate::"):
+            items = module.split("::")[1:]
+            while items and not found:  # the longest prefix naming a module file; the rest are items
+                target = posixpath.join(crate, *items)
+                found = [f for f in (f"{target}.rs", f"{target}/mod.rs") if f in files]
+                items = items[:-1]
+        elif "::" not in module:  # `mod name;`
+            candidates = (posixpath.join(folder, f"{module}.rs"), posixpath.join(folder, module, "mod.rs"),
+                          f"{posixpath.splitext(path)[0]}/{module}.rs")
+            found = [f for f in candidates if f in files][:1]
+    return sorted(set(found)) or [module]
+
+
+def merge(facts_by_path: dict[str, dict], languages: dict[str, str]) -> dict:
+    """Return the dependency_graph, call_graph, type_hierarchy, and detected_patterns sections."""
+    files = set(facts_by_path)
+    dirs = {posixpath.dirname(p) for p in files if languages.get(p) == "go"}
+    index = module_index(files)
+    dependency_graph, deps = [], {}
+    for path in sorted(files):
+        imports = set()
+        for imported in facts_by_path[path]["imports"]:
+            imports.update(resolve(path, languages[path], imported, index, files, dirs))
+        imports.discard(path)
+        deps[path] = imports & files
+        if imports:
+            dependency_graph.append({"source": path, "imports": sorted(imports)})
+
+    definers: dict[str, set[str]] = {}
+    for path, facts in facts_by_path.items():
+        for definition in facts["definitions"]:
+            definers.setdefault(definition["name"], set()).add(path)
+    sites: dict[tuple[str, str], list[str]] = {}
+    for path in sorted(files):
+        for name, line in facts_by_path[path]["calls"]:
+            targets = definers.get(name)
+            if not targets:
+                continue
+            if path in targets:
+                chosen = [path]
+            else:
+                chosen = sorted(targets & deps[path]) or (list(targets) if len(targets) == 1 else [])
+            for target in chosen:
+                sites.setdefault((target, name), []).append(f"{path}:{line}")
+
+    call_graph, type_hierarchy, patterns = [], [], {}
+    for path in sorted(files):
+        facts = facts_by_path[path]
+        if facts["definitions"]:
+            names = sorted({d["name"] for d in facts["definitions"]})
+            call_graph.append({
+                "file": path,
+                "definitions": facts["definitions"],
+                "references": [{"name": n, "called_from": sites[(path, n)][:MAX_CALL_SITES]}
+                               for n in names if (path, n) in sites],
+            })
+        for kind in facts["types"]:
+            type_hierarchy.append({"name": kind["name"], "type": kind["type"], "file": path,
+                                   "extends": kind["extends"], "implements": kind["implements"]})
+        for definition in facts["definitions"]:
+            if definition["type"] == "method":
+                continue
+            for pattern, regex in PATTERNS.items():
+                if regex.search(definition["name"]):
+                    patterns.setdefault(pattern, set()).add(path)
+    return {
+        "dependency_graph": dependency_graph,
+        "call_graph": call_graph,
+        "type_hierarchy": type_hierarchy,
+        "detected_patterns": [{"pattern": p, "locations": sorted(patterns[p])} for p in sorted(patterns)],
+    }
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Git history miner for the D9 git-intelligence dimension of /shaktra:analyze.
+
+Usage: analysis_history.py [PROJECT_DIR] [--today YYYY-MM-DD] [--top N] [--full]
+
+Streams one `git log --numstat -M --reverse` pass through a generator parser and
+folds each commit into per-file aggregates: commits, fix commits (subject matches
+fix|bug|patch|hotfix), lines added/deleted, commits per author, last change, and
+per-day commit counts for the last 365 days. Co-changing file pairs are counted
+for commits touching at most MAX_COCHANGE_FILES files; when more than MAX_PAIRS
+pairs are tracked, pairs seen only once are dropped (they are far below the
+reporting minimum of 3, so counts of reported pairs are at worst slightly low).
+Renamed files carry their history to the new path.
+
+Memory is bounded by the number of files, authors per file, and MAX_PAIRS, not
+by the number of commits. The aggregates and the last processed commit (the
+cursor) are kept in .shaktra/.index/git-history.bin, so a refresh only reads
+commits after the cursor. The cursor is discarded (full pass) when it is no
+longer an ancestor of HEAD, or with --full.
+
+Prints JSON: commit counts, the cursor, and `details` in the
+analysis-dimensions-git.md schema, scoped to the static.yml file inventory (or
+all tracked files) and limited to the top N files per list (default 100).
+knowledge_risk is "high" for single-owner hot files; the analyzer raises it for
+single-owner files on critical paths. Exit 0 = success, Exit 1 = not a git repo.
+"""
+
+from __future__ import annotations
+
+import json
+import marshal
+import os
+import re
+import subprocess
+import sys
+from datetime import date
+
+import analysis_git
+from yaml_cache import load_yaml
+
+HISTORY_VERSION = 1
+FIX_RE = re.compile(r"\b(fix|fixes|fixed|bug|bugfix|patch|hotfix)\b", re.IGNORECASE)
+MAX_COCHANGE_FILES = 30  # larger commits are mass edits (renames, formatting), not coupling
+MAX_PAIRS = 200_000
+MIN_CO_CHANGES = 3
+RECORD, FIELD = "\x1e", "\x1f"
+_BRACE_RE = re.compile(r"^(.*)\{(.*) => (.*)\}(.*)$")
+
+
+def state_path(project: str) -> str:
+    return os.path.join(project, ".shaktra", ".index", "git-history.bin")
+
+
+def empty_state() -> dict:
+    return {"version": HISTORY_VERSION, "cursor": None, "commits": 0, "files": {}, "pairs": {}}
+
+
+def renamed(path: str) -> tuple[str | None, str]:
+    """Split a numstat path into (old path or None, new path)."""
+    m = _BRACE_RE.match(path)
+    if m:
+        head, old, new, tail = m.groups()
+        return re.sub("/+", "/", f"{head}{old}{tail}"), re.sub("/+", "/", f"{head}{new}{tail}")
+    if " => " in path:
+        old, new = path.split(" => ", 1)
+        return old, new
+    return None, path
+
+
+def commits(project: str, since: str | None):
+    """Yield (hash, author, day ordinal, ISO date, is_fix, [(old, path, added, deleted)]) oldest first."""
+    args = ["git", "-C", project, "-c", "core.quotepath=off", "log", "--reverse", "--no-merges", "-M",
+            "--numstat", "--relative", "--no-color", f"--format={RECORD}%H{FIELD}%aN{FIELD}%aI{FIELD}%s",
+            f"{since}..HEAD" if since else "HEAD", "--"]
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                            encoding="utf-8", errors="replace")
+    current = None
+    try:
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            if line.startswith(RECORD):
+                if current:
+                    yield current
+                sha, author, when, subject = (line[1:].split(FIELD) + ["", "", ""])[:4]
+                current = (sha, author, date.fromisoformat(when[:10]).toordinal(), when,
+                           bool(FIX_RE.search(subject)), [])
+            elif line and current:
+                added, deleted, path = line.split("\t", 2)
+                old, path = renamed(path.strip('"'))
+                current[5].append((old, path, int(added) if added.isdigit() else 0,
+                                   int(deleted) if deleted.isdigit() else 0))
+        if current:
+            yield current
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def fold(state: dict, commit: tuple) -> None:
+    """Add one commit to the aggregates."""
+    sha, author, day, when, is_fix, changes = commit
+    files, pairs = state["files"], state["pairs"]
+    for old, path, added, deleted in changes:
+        if old and old in files and path not in files:
+            files[path] = files.pop(old)
+        entry = files.setdefault(path, {"commits": 0, "fixes": 0, "added": 0, "deleted": 0,
+                                        "authors": {}, "last": "", "days": {}})
+        entry["commits"] += 1
+        entry["fixes"] += is_fix
+        entry["added"] += added
+        entry["deleted"] += deleted
+        entry["authors"][author] = entry["authors"].get(author, 0) + 1
+        entry["last"] = max(entry["last"], when)
+        bucket = entry["days"].setdefault(day, [0, 0])
+        bucket[0] += 1
+        bucket[1] += is_fix
+        if len(entry["days"]) > 400:  # keep about a year of days
+            cutoff = day - 366
+            entry["days"] = {d: b for d, b in entry["days"].items() if d >= cutoff}
+    paths = sorted({path for _, path, _, _ in changes})
+    if 1 < len(paths) <= MAX_COCHANGE_FILES:
+        for i, a in enumerate(paths):
+            for b in paths[i + 1:]:
+                pairs[(a, b)] = pairs.get((a, b), 0) + 1
+        if len(pairs) > MAX_PAIRS:
+            state["pairs"] = {k: v for k, v in pairs.items() if v > 1}
+    state["cursor"] = sha
+    state["commits"] += 1
+
+
+def mine(project: str, full: bool) -> tuple[dict, int]:
+    """Bring the stored aggregates up to HEAD; return (state, commits read now)."""
+    state = empty_state()
+    if not full:
+        try:
+            with open(state_path(project), "rb") as f:
+                loaded = marshal.load(f)
+            if loaded.get("version") == HISTORY_VERSION and loaded.get("cursor") and analysis_git.git(
+                    project, "merge-base", "--is-ancestor", loaded["cursor"], "HEAD") is not None:
+                state = loaded
+        except Exception:
+            pass  # no usable cursor — full pass
+    read = 0
+    for commit in commits(project, state["cursor"]):
+        fold(state, commit)
+        read += 1
+    if read:
+        path = state_path(project)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                marshal.dump(state, f)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+    return state, read
+
+
+def scope(project: str) -> tuple[set[str], dict[str, set[str]]]:
+    """Files to report on (static.yml inventory, else tracked files) and their project imports."""
+    static_path = os.path.join(project, ".shaktra", "analysis", "static.yml")
+    static = load_yaml(static_path, _import_yaml) if os.path.exists(static_path) else None
+    files, imports = set(), {}
+    if isinstance(static, dict):
+        for group in (static.get("file_inventory") or {}).get("by_type") or []:
+            files.update(group.get("files") or [])
+        for edge in static.get("dependency_graph") or []:
+            imports[edge.get("source")] = set(edge.get("imports") or [])
+    return files or (analysis_git.tracked(project) or set()), imports
+
+
+def age_category(days: int) -> str:
+    return "fresh" if days < 30 else "recent" if days < 180 else "aging" if days < 365 else "stale"
+
+
+def details(state: dict, files: set[str], imports: dict, today: int, top: int) -> dict:
+    stats = {p: e for p, e in state["files"].items() if p in files and e["commits"]}
+    ranked = sorted(stats, key=lambda p: (-stats[p]["commits"], p))
+    hot_cut, warm_cut = max(1, round(len(ranked) * 0.1)), max(1, round(len(ranked) * 0.5))
+    churn = {p: "hot" if i < hot_cut else "warm" if i < warm_cut else "cold" for i, p in enumerate(ranked)}
+
+    def recent(entry: dict, days: int, column: int = 0) -> int:
+        return sum(b[column] for d, b in entry["days"].items() if today - d < days)
+
+    def owners(entry: dict) -> tuple[str, int]:
+        primary = max(sorted(entry["authors"]), key=entry["authors"].get)
+        return primary, sum(1 for n in entry["authors"].values() if n > 0.2 * entry["commits"])
+
+    knowledge = []
+    for p in ranked:
+        primary, bus = owners(stats[p])
+        risk = "high" if bus == 1 and churn[p] == "hot" else "medium" if bus == 1 else "low"
+        knowledge.append({"file": p, "primary_author": primary, "author_count": len(stats[p]["authors"]),
+                          "bus_factor": bus, "knowledge_risk": risk})
+    fixes = sorted((p for p in ranked if stats[p]["fixes"]), key=lambda p: (-stats[p]["fixes"], p))
+    pairs = sorted(((n, a, b) for (a, b), n in state["pairs"].items()
+                    if n >= MIN_CO_CHANGES and a in stats and b in stats), key=lambda t: (-t[0], t[1], t[2]))
+    return {
+        "hotspots": [{"file": p, "commits_last_90_days": recent(stats[p], 90),
+                      "commits_last_365_days": recent(stats[p], 365),
+                      "distinct_authors": len(stats[p]["authors"]), "churn_category": churn[p]}
+                     for p in ranked[:top]],
+        "bug_fix_density": [{"file": p, "total_commits": stats[p]["commits"], "fix_commits": stats[p]["fixes"],
+                             "fix_ratio": round(stats[p]["fixes"] / stats[p]["commits"], 3),
+                             "recent_fixes": recent(stats[p], 90, 1)} for p in fixes[:top]],
+        "co_change_patterns": [{"cluster_name": f"{os.path.basename(a)} + {os.path.basename(b)}", "files": [a, b],
+                                "co_change_frequency": n,
+                                "linked_in_code": b in imports.get(a, ()) or a in imports.get(b, ()),
+                                "hidden_coupling": not (b in imports.get(a, ()) or a in imports.get(b, ()))}
+                               for n, a, b in pairs[:top]],
+        "knowledge_distribution": sorted(knowledge, key=lambda k: ({"high": 0, "medium": 1, "low": 2}
+                                                                   [k["knowledge_risk"]], k["file"]))[:top],
+        "code_age": [{"file": p, "last_modified": stats[p]["last"],
+                      "age_category": age_category(today - date.fromisoformat(stats[p]["last"][:10]).toordinal())}
+                     for p in sorted(stats, key=lambda p: (stats[p]["last"], p))[:top]],
+    }
+
+
+def _import_yaml():
+    try:
+        import yaml
+        return yaml
+    except ImportError:
+        print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    project, today, top, full = None, date.today(), 100, False
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        if arg == "--full":
+            full = True
+        elif arg == "--today" and args:
+            today = date.fromisoformat(args.pop(0))
+        elif arg == "--top" and args and args[0].isdigit():
+            top = int(args.pop(0))
+        elif not arg.startswith("-") and project is None:
+            project = arg
+        else:
+            print(__doc__.strip().splitlines()[2], file=sys.stderr)
+            sys.exit(1)
+    project = os.path.abspath(project or os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+    if analysis_git.head(project) is None:
+        print(f"Error: {project} is not a git repository with commits", file=sys.stderr)
+        sys.exit(1)
+
+    state, read = mine(project, full)
+    files, imports = scope(project)
+    result = details(state, files, imports, today.toordinal(), top)
+    shallow = state["commits"] < 10
+    if shallow:  # analysis-dimensions-git.md shallow clone guard
+        result = {k: result[k] for k in ("hotspots", "code_age")}
+    print(json.dumps({"commits_total": state["commits"], "commits_read": read, "cursor": state["cursor"],
+                      "shallow": shallow, "files_with_history": len(state["files"]), "details": result}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
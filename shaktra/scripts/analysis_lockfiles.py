@@ -0,0 +1,155 @@
+"""Lockfile parsers for analysis_dependency_audit.py.
+
+Each parser takes (path, text) and returns the packages a lockfile pins as
+{"ecosystem", "name", "version", "license"} dicts. Ecosystem names are the OSV
+ones, so a package can be looked up in the advisory index as-is:
+
+  requirements*.txt   PyPI       `name==version` pins (other specifiers: version None)
+  poetry.lock         PyPI       [[package]] name/version
+  package-lock.json   npm        lockfileVersion 2/3 `packages`, or v1 `dependencies`
+  Cargo.lock          crates.io  [[package]] name/version
+  go.sum              Go         the highest version listed per module
+
+PyPI names are normalized (PEP 503). go.sum also lists versions the module graph
+considered but did not select; the highest one is the version the build uses in
+all but unusual `replace`/`exclude` setups. Only package-lock.json records licenses.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+
+import analysis_advisories
+
+LOCKFILES: dict[str, object] = {}  # file name -> parser; requirements*.txt use "requirements.txt"
+_PIN_RE = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(===?|>=|<=|~=|!=|>|<)?\s*([^\s;,#]*)")
+_TOML_TABLE_RE = re.compile(r"^\s*\[\[?([^\]]+)\]\]?\s*$")
+_TOML_STRING_RE = re.compile(r'^\s*(name|version)\s*=\s*"([^"]*)"')
+
+
+def lockfile(*names: str):
+    def add(parser):
+        for name in names:
+            LOCKFILES[name] = parser
+        return parser
+    return add
+
+
+def parser_for(path: str):
+    """The parser for a project-relative path, or None."""
+    name = path.rsplit("/", 1)[-1]
+    if name.startswith("requirements") and name.endswith(".txt"):
+        return LOCKFILES["requirements.txt"]
+    return LOCKFILES.get(name)
+
+
+def package(ecosystem: str, name: str, version: str | None, license: str | None = None) -> dict:
+    if ecosystem == "PyPI":
+        name = analysis_advisories.normalize_pypi(name)
+    return {"ecosystem": ecosystem, "name": name, "version": version, "license": license}
+
+
+@lockfile("requirements.txt")
+def parse_requirements(path: str, text: str) -> list[dict]:
+    packages = []
+    for line in text.replace("\\\n", " ").splitlines():
+        line = line.split(" #", 1)[0].strip()
+        if not line or line.startswith(("#", "-", "git+", "http:", "https:", "file:", ".")):
+            continue  # comments, options and includes, VCS and path requirements
+        m = _PIN_RE.match(line)
+        if m:
+            pinned = m.group(2) in ("==", "===") and "*" not in m.group(3)
+            packages.append(package("PyPI", m.group(1), m.group(3) if pinned else None))
+    return packages
+
+
+def _toml_packages(text: str) -> list[tuple[str, str]]:
+    """(name, version) of every [[package]] table, read line by line."""
+    found, current = [], None
+    for line in text.splitlines():
+        table = _TOML_TABLE_RE.match(line)
+        if table:
+            if current and "name" in current and "version" in current:
+                found.append((current["name"], current["version"]))
+            current = {} if table.group(1).strip() == "package" and line.lstrip().startswith("[[") else None
+            continue
+        m = _TOML_STRING_RE.match(line) if current is not None else None
+        if m and m.group(1) not in current:
+            current[m.group(1)] = m.group(2)
+    if current and "name" in current and "version" in current:
+        found.append((current["name"], current["version"]))
+    return found
+
+
+@lockfile("poetry.lock")
+def parse_poetry(path: str, text: str) -> list[dict]:
+    return [package("PyPI", name, version) for name, version in _toml_packages(text)]
+
+
+@lockfile("Cargo.lock")
+def parse_cargo(path: str, text: str) -> list[dict]:
+    return [package("crates.io", name, version) for name, version in _toml_packages(text)]
+
+
+@lockfile("package-lock.json", "npm-shrinkwrap.json")
+def parse_npm(path: str, text: str) -> list[dict]:
+    doc = json.loads(text)
+    packages = []
+    if isinstance(doc.get("packages"), dict):
+        for key, entry in doc["packages"].items():
+            if not key or not isinstance(entry, dict) or entry.get("link") or "node_modules/" not in key:
+                continue  # the root project, workspace links
+            name = entry.get("name") or key.rsplit("node_modules/", 1)[1]
+            license = entry.get("license")
+            packages.append(package("npm", name, entry.get("version"),
+                                    license if isinstance(license, str) else None))
+        return packages
+    stack = [doc.get("dependencies") or {}]
+    while stack:  # lockfileVersion 1: nested dependencies
+        for name, entry in stack.pop().items():
+            if isinstance(entry, dict):
+                packages.append(package("npm", name, entry.get("version")))
+                stack.append(entry.get("dependencies") or {})
+    return packages
+
+
+@lockfile("go.sum")
+def parse_go_sum(path: str, text: str) -> list[dict]:
+    best: dict[str, tuple] = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) != 3:
+            continue
+        module, version = fields[0], fields[1].removesuffix("/go.mod")
+        key = analysis_advisories.version_key(version)
+        if key is not None and (module not in best or key > best[module][0]):
+            best[module] = (key, version)
+    return [package("Go", module, version) for module, (_, version) in sorted(best.items())]
+
+
+def collect(project: str, paths) -> tuple[list[dict], list[dict]]:
+    """Parse every lockfile among paths; return (packages with a "source", errors).
+
+    Packages listed by several lockfiles are reported once, from the first one.
+    """
+    packages, errors, seen = [], [], set()
+    for path in sorted(paths):
+        parser = parser_for(path)
+        if parser is None:
+            continue
+        try:
+            with open(os.path.join(project, path), encoding="utf-8", errors="replace") as f:
+                found = parser(path, f.read())
+        except (OSError, ValueError) as e:
+            errors.append({"file": path, "error": f"{type(e).__name__}: {e}"})
+            continue
+        for entry in found:
+            key = (entry["ecosystem"], entry["name"], entry["version"])
+            if entry["version"] and entry["version"].startswith(("file:", "link:", "git+")):
+                continue  # local and VCS packages have no registry advisories
+            if key not in seen:
+                seen.add(key)
+                packages.append({**entry, "source": path})
+    return packages, errors
@@ -0,0 +1,191 @@
+"""Per-language source parsers for analysis_static.py.
+
+Each parser takes (path, text) and returns the facts of one file as plain lists
+and dicts (marshal-able, so they can be cached):
+
+  imports:     [[module as written, relative level, [imported names]]]
+  definitions: [{"name", "type": function | method | class, "line"}]
+  calls:       [[called name, line]]
+  types:       [{"name", "type": class | interface | trait | protocol, "extends", "implements"}]
+
+Python is parsed with the ast module. The other languages use line-oriented
+regular expressions: they miss some constructs (nested or multi-line
+declarations) but are fast and deterministic. Use @register(language, *extensions)
+to add a parser for another language.
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+
+PARSERS: dict[str, tuple[str, object]] = {}  # extension -> (language, parser)
+_CALL_RE = re.compile(r"(?<![\w.$:])(?:[A-Za-z_$][\w$]*(?:\.|::))*([A-Za-z_$][\w$]*)\s*\(")
+_AST_LEAVES = frozenset({ast.Name, ast.Constant, ast.Load, ast.Store, ast.Del, ast.alias, ast.arg})
+_KEYWORDS = frozenset(
+    "if for while switch catch return function func fn typeof sizeof match else elif and or not "
+    "super this self print await yield throw case defer go select import require".split())
+
+
+def register(language: str, *extensions: str):
+    def add(parser):
+        for extension in extensions:
+            PARSERS[extension] = (language, parser)
+        return parser
+    return add
+
+
+def facts() -> dict:
+    return {"imports": [], "definitions": [], "calls": [], "types": []}
+
+
+@register("python", ".py", ".pyi")
+def parse_python(path: str, text: str) -> dict:
+    result = facts()
+    tree = ast.parse(text, filename=path)
+
+    def base_name(node) -> str:
+        return node.attr if isinstance(node, ast.Attribute) else ast.unparse(node)
+
+    stack, types = [(tree, False)], []
+    while stack:
+        node, in_class = stack.pop()
+        for field in node._fields:
+            value = getattr(node, field, None)
+            for child in value if isinstance(value, list) else (value,):
+                kind = type(child)
+                if kind in _AST_LEAVES or not isinstance(child, ast.AST):
+                    continue
+                if kind is ast.Call:
+                    func = child.func
+                    name = func.id if type(func) is ast.Name else func.attr if type(func) is ast.Attribute else None
+                    if name:
+                        result["calls"].append([name, child.lineno])
+                elif kind is ast.ClassDef:
+                    result["definitions"].append({"name": child.name, "type": "class", "line": child.lineno})
+                    bases = [base_name(b) for b in child.bases]
+                    category = "protocol" if "Protocol" in bases else "interface" if "ABC" in bases else "class"
+                    types.append((child.lineno, {"name": child.name, "type": category, "extends": bases,
+                                                 "implements": []}))
+                    stack.append((child, True))
+                    continue
+                elif kind is ast.FunctionDef or kind is ast.AsyncFunctionDef:
+                    result["definitions"].append(
+                        {"name": child.name, "type": "method" if in_class else "function", "line": child.lineno})
+                    stack.append((child, False))
+                    continue
+                elif kind is ast.Import:
+                    result["imports"] += [[alias.name, 0, []] for alias in child.names]
+                elif kind is ast.ImportFrom:
+                    result["imports"].append([child.module or "", child.level, [a.name for a in child.names]])
+                stack.append((child, in_class))
+    result["definitions"].sort(key=lambda d: d["line"])
+    result["calls"].sort(key=lambda c: c[1])
+    result["types"] = [t for _, t in sorted(types, key=lambda t: t[0])]
+    return result
+
+
+def _split_names(value: str | None) -> list[str]:
+    return [n.strip().split("<")[0] for n in re.split(r"[,+]", value) if n.strip()] if value else []
+
+
+def regex_parser(imports: list[str], definitions: list[tuple[str, str]], types: list[tuple[str, str]]):
+    """Build a line-oriented parser.
+
+    imports: patterns run over the whole text; group 1 is the module.
+    definitions: (pattern, type) per line; group "name" is the definition.
+    types: (pattern, kind) per line; groups "name", "extends", "implements".
+    """
+    import_res = [re.compile(p, re.MULTILINE) for p in imports]
+    definition_res = [(re.compile(p), kind) for p, kind in definitions]
+    type_res = [(re.compile(p), kind) for p, kind in types]
+
+    def parse(path: str, text: str) -> dict:
+        result = facts()
+        for pattern in import_res:
+            result["imports"] += [[m.group(1), 0, []] for m in pattern.finditer(text)]
+        for number, line in enumerate(text.splitlines(), 1):
+            stripped = line.lstrip()
+            if stripped.startswith(("//", "/*", "*", "#")):
+                continue
+            defined = None
+            for pattern, kind in definition_res:
+                m = pattern.match(line)
+                if m and m.group("name") not in _KEYWORDS:
+                    defined = m.group("name")
+                    result["definitions"].append({"name": defined, "type": kind, "line": number})
+                    break
+            for pattern, kind in type_res:
+                m = pattern.match(line)
+                if m:
+                    groups = m.groupdict()
+                    result["types"].append({"name": groups["name"], "type": kind,
+                                            "extends": _split_names(groups.get("extends")),
+                                            "implements": _split_names(groups.get("implements"))})
+                    break
+            result["calls"] += [[m.group(1), number] for m in _CALL_RE.finditer(line)
+                                if m.group(1) not in _KEYWORDS and m.group(1) != defined]
+        return result
+
+    return parse
+
+
+_TS_CLASS = (r"\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(?P<name>[\w$]+)(?:<[^>]*>)?"
+             r"(?:\s+extends\s+(?P<extends>[\w$.]+))?(?:\s+implements\s+(?P<implements>[\w$.,<>\s]+?))?\s*\{")
+register("javascript", ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx")(regex_parser(
+    imports=[r"""^\s*(?:import|export)\b[^'"`;]*?from\s*['"]([^'"]+)['"]""",
+             r"""^\s*import\s*['"]([^'"]+)['"]""",
+             r"""\b(?:require|import)\s*\(\s*['"]([^'"]+)['"]\s*\)"""],
+    definitions=[
+        (r"\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(?P<name>[\w$]+)", "function"),
+        (r"\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(?P<name>[\w$]+)", "class"),
+        (r"\s*(?:export\s+)?(?:const|let|var)\s+(?P<name>[\w$]+)\s*(?::[^=]+)?=\s*(?:async\s+)?"
+         r"(?:function\b|\([^)]*\)\s*(?::[^=]+)?=>|[\w$]+\s*=>)", "function"),
+        (r"\s+(?:(?:public|private|protected|static|async|readonly|override)\s+)*(?P<name>[\w$]+)\s*"
+         r"(?:<[^>]*>)?\([^)]*\)\s*(?::\s*[^{]+)?\{\s*$", "method"),
+    ],
+    types=[(_TS_CLASS, "class"),
+           (r"\s*(?:export\s+)?interface\s+(?P<name>[\w$]+)(?:<[^>]*>)?(?:\s+extends\s+(?P<extends>[^{]+))?",
+            "interface")],
+))
+
+_parse_go = regex_parser(
+    imports=[r'^\s*import\s+(?:[\w.]+\s+)?"([^"]+)"'],
+    definitions=[(r"func\s+\([^)]*\)\s*(?P<name>\w+)", "method"), (r"func\s+(?P<name>\w+)", "function"),
+                 (r"type\s+(?P<name>\w+)\s+(?:struct|interface)\b", "class")],
+    types=[(r"type\s+(?P<name>\w+)\s+struct\b", "class"), (r"type\s+(?P<name>\w+)\s+interface\b", "interface")],
+)
+_GO_IMPORT_BLOCK = re.compile(r"^import\s*\(([^)]*)\)", re.MULTILINE)
+
+
+@register("go", ".go")
+def parse_go(path: str, text: str) -> dict:
+    result = _parse_go(path, text)
+    for block in _GO_IMPORT_BLOCK.finditer(text):
+        result["imports"] += [[m, 0, []] for m in re.findall(r'"([^"]+)"', block.group(1))]
+    return result
+
+
+_JAVA_MODIFIERS = r"(?:(?:public|private|protected|static|final|abstract|sealed|open|data|internal)\s+)*"
+register("java", ".java", ".kt")(regex_parser(
+    imports=[r"^\s*import\s+(?:static\s+)?([\w.]+)"],
+    definitions=[
+        (rf"\s*{_JAVA_MODIFIERS}(?:class|interface|enum|record|object)\s+(?P<name>\w+)", "class"),
+        (r"\s*(?:(?:public|private|protected|static|final|abstract|synchronized|override|suspend)\s+)+"
+         r"(?:fun\s+)?(?:[\w<>\[\],.?]+\s+)?(?P<name>\w+)\s*\(", "method"),
+        (r"\s*fun\s+(?:<[^>]*>\s*)?(?P<name>\w+)\s*\(", "function"),
+    ],
+    types=[(rf"\s*{_JAVA_MODIFIERS}class\s+(?P<name>\w+)(?:<[^>]*>)?(?:\s+extends\s+(?P<extends>[\w.<>]+))?"
+            r"(?:\s+implements\s+(?P<implements>[\w.,<>\s]+?))?\s*[{(:]?\s*$", "class"),
+           (rf"\s*{_JAVA_MODIFIERS}interface\s+(?P<name>\w+)(?:<[^>]*>)?(?:\s+extends\s+(?P<extends>[\w.,<>\s]+?))?"
+            r"\s*\{?\s*$", "interface")],
+))
+
+register("rust", ".rs")(regex_parser(
+    imports=[r"^\s*(?:pub(?:\([^)]*\))?\s+)?use\s+([\w:]+)", r"^\s*(?:pub(?:\([^)]*\))?\s+)?mod\s+(\w+)\s*;"],
+    definitions=[(r"\s+(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:unsafe\s+)?fn\s+(?P<name>\w+)", "method"),
+                 (r"(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:unsafe\s+)?fn\s+(?P<name>\w+)", "function"),
+                 (r"(?:pub(?:\([^)]*\))?\s+)?(?:struct|enum|trait)\s+(?P<name>\w+)", "class")],
+    types=[(r"(?:pub(?:\([^)]*\))?\s+)?(?:struct|enum)\s+(?P<name>\w+)", "class"),
+           (r"(?:pub(?:\([^)]*\))?\s+)?trait\s+(?P<name>\w+)(?:\s*:\s*(?P<extends>[\w\s+]+?))?\s*\{?\s*$", "trait")],
+))
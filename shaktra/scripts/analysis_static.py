@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Stage 1 static extraction for /shaktra:analyze.
+
+Usage: analysis_static.py [PROJECT_DIR] [--jobs N] [--dry-run]
+
+Writes .shaktra/analysis/static.yml (analysis-output-schemas.md): the file
+inventory, dependency graph, call graph, type hierarchy, detected patterns, and
+config inventory, without an LLM reading the files.
+
+Source files come from `git ls-files` (tracked plus untracked, honoring
+.gitignore) or, outside git, a directory walk; vendored and build directories
+are skipped either way. Files with a parser in analysis_parsers.py (Python via
+ast; JavaScript/TypeScript, Go, Java/Kotlin, and Rust via regular expressions)
+are parsed across a process pool. Each file's facts are cached in
+.shaktra/.index/static-facts.bin with its stat and content hash: a file whose
+stat is unchanged is not read, and one whose content hash is unchanged is not
+re-parsed. The graphs are then rebuilt from all cached facts (analysis_graph.py).
+
+--dry-run prints the report without writing static.yml (the cache is still updated).
+Prints a JSON report. Exit 0 = success, Exit 1 = usage or input error.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import marshal
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import analysis_git
+import analysis_graph
+from analysis_parsers import PARSERS, facts as empty_facts
+from yaml_cache import load_yaml
+
+FACTS_VERSION = 1
+INLINE_MAX_FILES = 64  # below this a process pool costs more than it saves
+RACY_WINDOW_NS = 2_000_000_000
+SKIP_DIRS = {".git", ".shaktra", ".hg", ".svn", "node_modules", "bower_components", "vendor", "venv", ".venv",
+             "env", "__pycache__", ".tox", ".nox", ".mypy_cache", ".pytest_cache", "site-packages", "dist",
+             "build", "target", "out", "coverage", ".next", ".nuxt", ".gradle", ".idea", ".vscode"}
+CONFIG_DIRS = {".github", ".circleci", ".gitlab", ".devcontainer"}  # hidden directories still walked
+OTHER_SOURCE = {".rb", ".php", ".c", ".h", ".cc", ".cpp", ".hpp", ".cs", ".swift", ".scala", ".m", ".sh",
+                ".lua", ".dart", ".ex", ".exs", ".clj", ".vue", ".svelte", ".sql"}
+CONFIG_FILES = {
+    "pyproject.toml": "Python project and tool configuration", "setup.cfg": "Python package configuration",
+    "setup.py": "Python package build script", "requirements.txt": "Python dependencies",
+    "package.json": "Node package manifest and scripts", "tsconfig.json": "TypeScript compiler options",
+    "go.mod": "Go module definition", "Cargo.toml": "Rust crate manifest", "pom.xml": "Maven build",
+    "build.gradle": "Gradle build", "Dockerfile": "container image build", "docker-compose.yml": "local services",
+    "Makefile": "build and task targets", "tox.ini": "test environments", ".gitlab-ci.yml": "CI/CD pipeline",
+}
+CONFIG_EXTENSIONS = {".yml": "yaml", ".yaml": "yaml", ".json": "json", ".toml": "toml", ".ini": "ini",
+                     ".cfg": "ini", ".conf": "conf", ".properties": "properties", ".xml": "xml"}
+
+
+def list_files(project: str) -> list[str]:
+    """Project-relative paths of candidate files, without skipped directories."""
+    out = analysis_git.git(project, "ls-files", "-z", "--cached", "--others", "--exclude-standard") \
+        if analysis_git.has_git(project) else None
+    if out is not None:
+        paths = [p for p in out.split("\0") if p]
+    else:
+        paths = []
+        for root, dirnames, filenames in os.walk(project):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and (not d.startswith(".") or d in CONFIG_DIRS)]
+            rel = os.path.relpath(root, project)
+            paths += [f if rel == "." else f"{rel}/{f}".replace(os.sep, "/") for f in filenames]
+    return sorted(p for p in paths if not SKIP_DIRS.intersection(p.split("/")[:-1]))
+
+
+def config_entry(path: str) -> dict | None:
+    name = path.rsplit("/", 1)[-1]
+    ext = os.path.splitext(name)[1]
+    in_ci = path.startswith((".github/", ".circleci/", ".gitlab/"))
+    if name in CONFIG_FILES:
+        purpose = CONFIG_FILES[name]
+    elif name.startswith(".env"):
+        return {"file": path, "type": "env", "purpose": "environment variables"}
+    elif in_ci and ext in CONFIG_EXTENSIONS:
+        purpose = "CI/CD workflow"
+    elif ext in CONFIG_EXTENSIONS and ("/" not in path or path.split("/")[0] in ("config", "conf", "settings")):
+        purpose = "configuration"
+    else:
+        return None
+    kind = CONFIG_EXTENSIONS.get(ext) or {"Dockerfile": "docker", "Makefile": "make"}.get(name, ext.lstrip(".") or name)
+    return {"file": path, "type": kind, "purpose": purpose}
+
+
+def parse_file(task: tuple[str, str, str | None]) -> tuple[str, str | None, dict | None, str | None]:
+    """Worker: return (path, content hash, facts or None when the hash is unchanged, error)."""
+    full, path, cached_digest = task
+    try:
+        with open(full, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return path, None, empty_facts(), f"{type(e).__name__}: {e}"
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if digest == cached_digest:
+        return path, digest, None, None
+    _, parser = PARSERS[os.path.splitext(path)[1]]
+    try:
+        return path, digest, parser(path, data.decode("utf-8", errors="replace")), None
+    except (SyntaxError, ValueError, RecursionError) as e:
+        return path, digest, empty_facts(), f"{type(e).__name__}: {e}"
+
+
+def cache_path(project: str) -> str:
+    return os.path.join(project, ".shaktra", ".index", "static-facts.bin")
+
+
+def load_cache(project: str) -> dict:
+    try:
+        with open(cache_path(project), "rb") as f:
+            cache = marshal.load(f)
+        if cache.get("version") == FACTS_VERSION:
+            return cache
+    except Exception:
+        pass  # missing, corrupt, or older format — parse everything
+    return {"version": FACTS_VERSION, "built_ns": 0, "files": {}}
+
+
+def save_cache(project: str, cache: dict) -> None:
+    path = cache_path(project)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump(cache, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def extract(project: str, jobs: int) -> tuple[dict, dict]:
+    """Return (static.yml document, report)."""
+    paths = list_files(project)
+    sources = [p for p in paths if os.path.splitext(p)[1] in PARSERS or os.path.splitext(p)[1] in OTHER_SOURCE]
+    cache = load_cache(project)
+    cached, built_ns = cache["files"], cache["built_ns"]
+    started_ns = time.time_ns()
+
+    fresh, tasks, stat_hits = {}, [], 0
+    for path in sources:
+        if os.path.splitext(path)[1] not in PARSERS:
+            continue
+        try:
+            st = os.stat(os.path.join(project, path))
+        except OSError:
+            continue  # listed by git but deleted in the working tree
+        key = [st.st_size, st.st_mtime_ns, st.st_ino]
+        entry = cached.get(path)
+        coarse = st.st_mtime_ns % 1_000_000_000 == 0
+        if entry and entry[:3] == key and built_ns - st.st_mtime_ns > (RACY_WINDOW_NS if coarse else 0):
+            fresh[path] = entry
+            stat_hits += 1
+        else:
+            fresh[path] = key + [None, None, None]
+            tasks.append((os.path.join(project, path), path, entry[3] if entry else None))
+
+    if len(tasks) > INLINE_MAX_FILES and jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(parse_file, tasks, chunksize=max(1, len(tasks) // (jobs * 8))))
+    else:
+        results = [parse_file(t) for t in tasks]
+    parsed, errors = 0, []
+    for path, digest, facts, error in results:
+        if facts is None:  # same content as cached, e.g. after a checkout touched it
+            fresh[path][3:] = cached[path][3:]
+            continue
+        fresh[path][3:] = [digest, facts, error]
+        parsed += 1
+        if error:
+            errors.append({"file": path, "error": error})
+    save_cache(project, {"version": FACTS_VERSION, "built_ns": started_ns, "files": fresh})
+
+    by_type: dict[str, list[str]] = {}
+    for path in sources:
+        by_type.setdefault(os.path.splitext(path)[1], []).append(path)
+    languages = {p: PARSERS[os.path.splitext(p)[1]][0] for p in fresh}
+    counts: dict[str, int] = {}
+    for language in languages.values():
+        counts[language] = counts.get(language, 0) + 1
+    settings_path = os.path.join(project, ".shaktra", "settings.yml")
+    settings = load_yaml(settings_path, _import_yaml) if os.path.exists(settings_path) else {}
+    project_language = ((settings or {}).get("project") or {}).get("language") if isinstance(settings, dict) else None
+
+    doc = {
+        "extracted_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "language": project_language or max(sorted(counts), key=counts.get, default="unknown"),
+        "file_inventory": {
+            "total_files": len(sources),
+            "by_type": [{"extension": ext, "count": len(files), "files": files}
+                        for ext, files in sorted(by_type.items(), key=lambda kv: (-len(kv[1]), kv[0]))],
+        },
+        **analysis_graph.merge({p: e[4] for p, e in fresh.items()}, languages),
+        "config_inventory": [c for c in map(config_entry, paths) if c],
+    }
+    report = {"files": len(sources), "parsed_files": len(fresh), "stat_hits": stat_hits,
+              "reused": len(tasks) - parsed, "parsed": parsed, "parse_errors": errors}
+    return doc, report
+
+
+def _import_yaml():
+    try:
+        import yaml
+        return yaml
+    except ImportError:
+        print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    project, jobs, dry_run = None, os.cpu_count() or 1, False
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        if arg == "--dry-run":
+            dry_run = True
+        elif arg == "--jobs" and args and args[0].isdigit():
+            jobs = max(1, int(args.pop(0)))
+        elif not arg.startswith("-") and project is None:
+            project = arg
+        else:
+            print(__doc__.strip().splitlines()[2], file=sys.stderr)
+            sys.exit(1)
+    project = os.path.abspath(project or os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+    if not os.path.isdir(project):
+        print(f"Error: {project} not found", file=sys.stderr)
+        sys.exit(1)
+
+    yaml = _import_yaml()
+    started = time.perf_counter()
+    doc, report = extract(project, jobs)
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    if not dry_run:
+        path = os.path.join(project, ".shaktra", "analysis", "static.yml")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            yaml.dump(doc, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+                      default_flow_style=False, sort_keys=False, allow_unicode=True)
+        os.replace(tmp, path)
+        report["written"] = os.path.relpath(path, project)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Benchmark hook and memory script latency on synthetic .shaktra trees.
+
+Usage: bench_hooks.py [--runs N] [--sizes 10,1000,10000] [--cold] [--client]
+                      [--output FILE] [--compare BASELINE.json]
+
+Generates throwaway projects with N stories and handoffs (one active story
+declaring up to 5k files), memory stores at the tier 1/2/3 boundaries used by
+memory_retrieval.py, and long compound Bash commands. Each script is driven with
+realistic hook stdin payloads; wall time (p50/p95/p99) and peak RSS are recorded
+per scenario and written as JSON.
+
+Each run goes through a small launcher process that forks the script and reports
+its wall time and wait4() usage. On Linux a child's peak RSS starts at its
+parent's RSS at fork time, so measuring from the harness would report the
+harness's own size (which grows while fixtures are generated) for every small
+script; the launcher keeps that floor at a bare interpreter, reported as
+`rss_floor_kb`.
+
+--cold      clear .shaktra/.index and .shaktra/.cache before every run
+--client    drive hooks through hook_client.py (uses the daemon if one is running)
+--compare   print p95 ratios against an earlier report; exit 1 if any scenario
+            regressed by more than 25%
+"""
+
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+PLUGIN_JSON = SCRIPTS_DIR.parent / ".claude-plugin" / "plugin.json"
+DEFAULT_SIZES = (10, 1000, 10000)
+DEFAULT_RUNS = 20
+SCOPE_SIZES = {10: 10, 1000: 500, 10000: 5000}
+TIER1_MAX, TIER2_MAX = 100, 500  # memory_retrieval.py defaults
+COMMAND_BYTES = (1_000, 100_000, 1_000_000)
+REGRESSION_RATIO = 1.25
+
+# Forks argv with the harness's stdin, silences its output, and prints
+# [wall ms, child peak RSS KiB, exit code, launcher RSS KiB at fork].
+LAUNCHER = """
+import json, os, resource, sys, time
+try:  # own high-water mark; ru_maxrss would also carry the harness's, inherited at exec
+    with open("/proc/self/status") as f:
+        floor = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+except (OSError, StopIteration):
+    floor = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+pid = os.fork()
+if pid == 0:
+    null = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(null, 1)
+    os.dup2(null, 2)
+    os.execv(sys.argv[1], sys.argv[1:])
+_, status, usage = os.wait4(pid, 0)
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps([elapsed, usage.ru_maxrss, os.waitstatus_to_exitcode(status), floor]))
+"""
+
+
+def write_project(root: Path, stories: int) -> None:
+    """Create a .shaktra tree with `stories` stories; the newest handoff is the active one."""
+    stories_dir = root / ".shaktra" / "stories"
+    stories_dir.mkdir(parents=True)
+    scope = SCOPE_SIZES.get(stories, min(stories, 5000))
+    old = time.time() - 3600
+    for i in range(1, stories + 1):
+        sid = f"ST-{i:05d}"
+        active = i == stories
+        count = scope if active else 5
+        files = "".join(f"  - src/pkg{n % 50}/module_{n}.py\n" for n in range(count))
+        (stories_dir / f"{sid}.yml").write_text(
+            f"id: {sid}\ntitle: Story {i}\ndescription: Synthetic story\n"
+            f"tier: medium\nscope: feature\nfiles:\n{files}"
+        )
+        handoff_dir = stories_dir / sid
+        handoff_dir.mkdir()
+        findings = "".join(
+            f"  - severity: P{n % 4}\n    file: src/pkg0/module_{n}.py\n    line: {n}\n"
+            f"    issue: synthetic finding {n}\n    resolved: {'true' if n % 4 == 0 else 'false'}\n"
+            for n in range(200 if active else 3)
+        )
+        phase = "quality" if active else "complete"
+        done = "[plan, tests, code]" if active else "[plan, tests, code, quality]"
+        handoff = handoff_dir / "handoff.yml"
+        handoff.write_text(
+            f"story_id: {sid}\ncurrent_phase: {phase}\ncompleted_phases: {done}\n"
+            f"quality_findings:\n{findings}"
+        )
+        if not active:
+            os.utime(handoff, (old + i, old + i))
+
+
+def write_memory(root: Path, total: int) -> None:
+    """Create memory stores holding `total` active entries, split across the three files."""
+    memory = root / ".shaktra" / "memory"
+    memory.mkdir(parents=True, exist_ok=True)
+    split = {"principles": total // 2, "anti_patterns": total // 3}
+    split["procedures"] = total - split["principles"] - split["anti_patterns"]
+    for key, prefix, filename in (("principles", "PR", "principles.yml"),
+                                  ("anti_patterns", "AP", "anti-patterns.yml"),
+                                  ("procedures", "PC", "procedures.yml")):
+        lines = [f"{key}:"]
+        for n in range(split[key]):
+            lines += [
+                f"  - id: {prefix}-{n:04d}",
+                f"    text: Synthetic {key} entry {n} about caching, retries and schema drift",
+                "    categories: [performance, reliability]",
+                f"    tags: [tag{n % 40}, area{n % 7}]",
+                "    roles: [developer, sw-engineer]",
+                "    guidance: [Prefer idempotent writes, Bound every retry loop]",
+                f"    confidence: {0.4 + (n % 6) / 10:.1f}",
+                "    status: active",
+                "    created: 2026-01-15",
+            ]
+        (memory / filename).write_text("\n".join(lines) + "\n")
+    (root / ".shaktra" / "settings.yml").write_text(
+        f"memory:\n  retrieval_tier1_max: {TIER1_MAX}\n  retrieval_tier2_max: {TIER2_MAX}\n"
+        "  retrieval_chunk_size: 150\n"
+    )
+
+
+def long_command(size: int) -> str:
+    parts, total, n = [], 0, 0
+    while total < size:
+        part = f"echo step{n} --flag=value{n} src/pkg{n % 50}/module_{n}.py"
+        parts.append(part)
+        total += len(part) + 4
+        n += 1
+    return " && ".join(parts) + " && git commit -m 'synthetic'"
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def run_once(argv: list, payload: str, env: dict, cwd: Path) -> tuple[float, int, int, int]:
+    """Run argv once in cwd via LAUNCHER; return (wall ms, peak RSS KiB, exit code, RSS floor KiB)."""
+    proc = subprocess.run([sys.executable, "-c", LAUNCHER, *argv], input=payload.encode(),
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env, cwd=cwd)
+    try:
+        elapsed, peak, code, floor = json.loads(proc.stdout)
+    except ValueError:
+        raise RuntimeError(f"launcher failed for {argv}") from None
+    return elapsed, peak, code, floor
+
+
+def write_payload(project: Path, path: str) -> str:
+    return json.dumps({"tool_name": "Write", "tool_input": {"file_path": str(project / path), "content": "x"}})
+
+
+def hook_argv(hook: str, client: bool) -> list:
+    if client:
+        return [sys.executable, str(SCRIPTS_DIR / "hook_client.py"), hook]
+    return [sys.executable, str(SCRIPTS_DIR / f"{hook}.py")]
+
+
+def measure(name: str, argv: list, payload: str, project: Path, runs: int, cold: bool, params: dict) -> dict:
+    env = {**os.environ, "CLAUDE_PROJECT_DIR": str(project)}
+    env.pop("SHAKTRA_ALLOW_MAIN_BRANCH", None)
+    env.pop("SHAKTRA_SKIP_P0_CHECK", None)
+    times, rss, floors, codes = [], [], [], set()
+    for _ in range(runs):
+        if cold:
+            for derived in (".index", ".cache"):
+                shutil.rmtree(project / ".shaktra" / derived, ignore_errors=True)
+        ms, peak, code, floor = run_once(argv, payload, env, project)
+        times.append(ms)
+        rss.append(peak)
+        floors.append(floor)
+        codes.add(code)
+    return {
+        "name": name,
+        "script": " ".join([Path(argv[1]).name, *argv[2:3]]) if len(argv) == 3 else Path(argv[1]).name,
+        "params": params,
+        "runs": runs,
+        "p50_ms": round(percentile(times, 50), 2),
+        "p95_ms": round(percentile(times, 95), 2),
+        "p99_ms": round(percentile(times, 99), 2),
+        "peak_rss_kb": max(rss),
+        "rss_floor_kb": max(floors),
+        "exit_codes": sorted(codes),
+    }
+
+
+def bench(sizes, runs, cold, client, workdir: Path) -> list:
+    results = []
+    for size in sizes:
+        project = workdir / f"stories-{size}"
+        write_project(project, size)
+        subprocess.run(["git", "init", "-q", "-b", "feature/bench", str(project)], check=False)
+        active = f"ST-{size:05d}"
+        params = {"stories": size, "declared_files": SCOPE_SIZES.get(size, min(size, 5000))}
+        scenarios = [
+            ("scope-in", "validate_story_scope", write_payload(project, "src/pkg7/module_7.py")),
+            ("scope-out", "validate_story_scope", write_payload(project, "src/elsewhere.py")),
+            ("schema-handoff", "validate_schema", write_payload(project, f".shaktra/stories/{active}/handoff.yml")),
+            ("schema-other", "validate_schema", write_payload(project, "src/pkg7/module_7.py")),
+            ("stop-p0", "check_p0_findings", json.dumps({"stop_hook_active": False})),
+        ]
+        for name, hook, payload in scenarios:
+            results.append(measure(name, hook_argv(hook, client), payload, project, runs, cold, params))
+
+    project = workdir / "commands"
+    project.mkdir()
+    subprocess.run(["git", "init", "-q", "-b", "feature/bench", str(project)], check=False)
+    for size in COMMAND_BYTES:
+        payload = json.dumps({"tool_name": "Bash", "tool_input": {"command": long_command(size)}})
+        results.append(measure("bash-command", hook_argv("block_main_branch", client), payload,
+                               project, runs, cold, {"command_bytes": size}))
+
+    for total in (TIER1_MAX, TIER1_MAX + 1, TIER2_MAX, TIER2_MAX + 1):
+        project = workdir / f"memory-{total}"
+        write_memory(project, total)
+        story_dir = project / ".shaktra" / "stories" / "ST-00001"
+        story_dir.mkdir(parents=True)
+        argv = [sys.executable, str(SCRIPTS_DIR / "memory_retrieval.py"), str(story_dir),
+                str(project / ".shaktra" / "settings.yml")]
+        results.append(measure("memory-tier", argv, "", project, runs, cold, {"active_entries": total}))
+    return results
+
+
+def compare(report: dict, baseline_path: str) -> bool:
+    baseline = json.loads(Path(baseline_path).read_text())
+    key = lambda r: (r["name"], r["script"], json.dumps(r["params"], sort_keys=True))
+    old = {key(r): r for r in baseline.get("results", [])}
+    regressed = False
+    for r in report["results"]:
+        prev = old.get(key(r))
+        if not prev or not prev["p95_ms"]:
+            continue
+        ratio = r["p95_ms"] / prev["p95_ms"]
+        flag = "REGRESSED" if ratio > REGRESSION_RATIO else "ok"
+        regressed |= ratio > REGRESSION_RATIO
+        print(f"{flag:9} {r['name']:15} {r['script']:32} {json.dumps(r['params'])} "
+              f"p95 {prev['p95_ms']:.1f} -> {r['p95_ms']:.1f} ms ({ratio:.2f}x)", file=sys.stderr)
+    return regressed
+
+
+def main():
+    runs, sizes, cold, client, output, baseline = DEFAULT_RUNS, DEFAULT_SIZES, False, False, None, None
+    args = sys.argv[1:]
+    try:
+        while args:
+            flag = args.pop(0)
+            if flag == "--runs":
+                runs = int(args.pop(0))
+            elif flag == "--sizes":
+                sizes = tuple(int(s) for s in args.pop(0).split(","))
+            elif flag == "--cold":
+                cold = True
+            elif flag == "--client":
+                client = True
+            elif flag == "--output":
+                output = args.pop(0)
+            elif flag == "--compare":
+                baseline = args.pop(0)
+            else:
+                raise ValueError(flag)
+    except (IndexError, ValueError):
+        print(__doc__.strip().splitlines()[2], file=sys.stderr)
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory(prefix="shaktra-bench-") as tmp:
+        results = bench(sizes, runs, cold, client, Path(tmp))
+
+    version = json.loads(PLUGIN_JSON.read_text()).get("version", "") if PLUGIN_JSON.exists() else ""
+    report = {
+        "plugin_version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mode": {"cold": cold, "client": client},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(text + "\n")
+    else:
+        print(text)
+    if baseline and compare(report, baseline):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,37 +3,98 @@
 
 Event: PreToolUse (Bash)
 Exit 0 = allow, Exit 2 = block.
+
+Commands are classified by command_analyzer.py.
 """
 
 from __future__ import annotations
 
-import json
 import os
-import re
-import subprocess
 import sys
 
-
-PROTECTED = r"(?:main|master|prod|production)"
 PROTECTED_SET = {"main", "master", "prod", "production"}
-# git checkout <branch> or git switch <branch> — but NOT branch-creation flags
-# Handles intervening flags (e.g., --detach, --force) before the protected branch name
-# Excludes: -b, -B, -c, --create (branch creation, not switching)
-# Also catches remote-tracking refs: origin/main, upstream/production, refs/heads/main
-CHECKOUT_RE = re.compile(
-    rf"(?:^|[;&|]\s*)git\s+(?:checkout|switch)\s+(?!.*(?:-[bcB]\b|--create\b))(?:\S+\s+)*(?:\w+/)*{PROTECTED}(?![\w-])"
-)
-# git push ... <branch>  (captures "git push origin main", "git push main")
-# [^;&|]* stops at shell operators to avoid cross-command matching
-PUSH_RE = re.compile(rf"(?:^|[;&|]\s*)git\s+push\b[^;&|]*\b{PROTECTED}(?![\w-])")
-# git merge|rebase|reset ... <branch>
-MERGE_RE = re.compile(rf"(?:^|[;&|]\s*)git\s+(?:merge|rebase|reset)\b[^;&|]*\b{PROTECTED}(?![\w-])")
-
-BLOCK_PATTERNS = [CHECKOUT_RE, PUSH_RE, MERGE_RE]
+
+# Environment that changes how git discovers the repository; defer to git itself
+GIT_DISCOVERY_ENV = ("GIT_CEILING_DIRECTORIES", "GIT_DISCOVERY_ACROSS_FILESYSTEM", "GIT_COMMON_DIR")
+
+_head_cache: dict[str, tuple[int, str | None]] = {}
+
+
+def cannot_mention(raw: str, word: str) -> bool:
+    """True if raw JSON text cannot contain word in any string, even via \\u escapes."""
+    return word not in raw and "\\u" not in raw
+
+
+def find_git_dir(start: str) -> str | None:
+    """Return the git dir for start, honoring GIT_DIR and `.git` files (worktrees, submodules).
+
+    Returns None when no repository is found.
+    """
+    override = os.environ.get("GIT_DIR")
+    if override:
+        return os.path.abspath(override)
+    path = os.path.abspath(start)
+    while True:
+        dot_git = os.path.join(path, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git
+        if os.path.isfile(dot_git):
+            with open(dot_git) as f:
+                line = f.readline().strip()
+            if not line.startswith("gitdir:"):
+                raise ValueError(f"unrecognized .git file: {dot_git}")
+            return os.path.normpath(os.path.join(path, line[len("gitdir:"):].strip()))
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def read_head_branch(git_dir: str) -> str | None:
+    """Return the branch HEAD points at, or None when detached. Cached by HEAD mtime.
+
+    Raises ValueError for layouts this reader does not handle (e.g. reftable).
+    """
+    head = os.path.join(git_dir, "HEAD")
+    mtime_ns = os.stat(head).st_mtime_ns
+    cached = _head_cache.get(head)
+    if cached and cached[0] == mtime_ns:
+        return cached[1]
+    with open(head) as f:
+        content = f.read().strip()
+    if content.startswith("ref:"):
+        ref = content[len("ref:"):].strip()
+        if not ref.startswith("refs/heads/") or ref.endswith("/.invalid"):
+            raise ValueError(f"unsupported HEAD ref: {ref}")
+        branch = ref[len("refs/heads/"):]
+    elif len(content) in (40, 64) and all(c in "0123456789abcdef" for c in content):
+        branch = None  # detached HEAD, matching `git branch --show-current`
+    else:
+        raise ValueError("unrecognized HEAD contents")
+    _head_cache[head] = (mtime_ns, branch)
+    return branch
 
 
 def get_current_branch() -> str | None:
-    """Return the current git branch name, or None if not in a repo."""
+    """Return the current git branch name, or None if not in a repo.
+
+    Reads HEAD directly; falls back to `git branch --show-current` only for
+    layouts the direct reader does not handle.
+    """
+    if not any(os.environ.get(name) for name in GIT_DISCOVERY_ENV):
+        try:
+            git_dir = find_git_dir(os.getcwd())
+            if git_dir is None:
+                return None
+            return read_head_branch(git_dir)
+        except (OSError, ValueError):
+            pass
+    return _git_current_branch()
+
+
+def _git_current_branch() -> str | None:
+    """Ask git for the current branch (subprocess fallback)."""
+    import subprocess
     try:
         result = subprocess.run(
             ["git", "branch", "--show-current"],
@@ -48,24 +109,20 @@ def get_current_branch() -> str | None:
     return None
 
 
-def is_git_write(command: str) -> bool:
-    """Return True if the command is a git write operation (commit, push, merge, rebase, reset).
-
-    Anchored to command start or after a shell operator (;, &&, ||, |) to avoid
-    false positives from strings like: echo 'git commit'.
-    """
-    return bool(
-        re.search(r"(?:^|[;&|]\s*)git\s+(?:commit|push|merge|rebase|reset)\b", command)
-    )
-
-
 def main() -> None:
     if os.environ.get("SHAKTRA_ALLOW_MAIN_BRANCH"):
         sys.exit(0)
 
+    # Fast path: input that cannot mention git needs neither json nor the analyzer
+    raw = sys.stdin.read()
+    if cannot_mention(raw, "git"):
+        sys.exit(0)
+
+    import json
+
     try:
-        data = json.load(sys.stdin)
-    except (json.JSONDecodeError, EOFError):
+        data = json.loads(raw)
+    except json.JSONDecodeError:
         print("BLOCKED: Could not parse hook input — failing closed.")
         sys.exit(2)
 
@@ -73,19 +130,20 @@ def main() -> None:
     if not isinstance(command, str) or not command.strip():
         sys.exit(0)
 
+    from command_analyzer import analyze
+    branch, is_write = analyze(command)
+
     # Check 1: Block commands that explicitly target protected branches
-    for pattern in BLOCK_PATTERNS:
-        if pattern.search(command):
-            branch = re.search(PROTECTED, command).group()
-            print(
-                f"BLOCKED: Direct git operation on protected branch '{branch}'.\n"
-                f"Create a feature branch instead:\n"
-                f"  git checkout -b <branch-name>"
-            )
-            sys.exit(2)
+    if branch:
+        print(
+            f"BLOCKED: Direct git operation on protected branch '{branch}'.\n"
+            f"Create a feature branch instead:\n"
+            f"  git checkout -b <branch-name>"
+        )
+        sys.exit(2)
 
     # Check 2: Block git write operations when currently on a protected branch
-    if is_git_write(command):
+    if is_write:
         current = get_current_branch()
         if current and current in PROTECTED_SET:
             print(
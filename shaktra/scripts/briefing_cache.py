@@ -0,0 +1,96 @@
+"""Memoized story briefings for memory_retrieval.py.
+
+Each retrieval run records the hashes of its inputs — the story YAML, the memory
+snapshot's content hash, and the retrieval settings — in
+.shaktra/.index/briefings/<story>.json. On the next run, if .briefing.yml was
+written after that record and every hash still matches, the briefing is current
+and memory_retrieval.py returns the "cached" tier instead of a retrieval plan.
+
+On a miss the record keeps the reason (no briefing, briefing not regenerated,
+or which inputs changed), so a resumed story shows why it was re-briefed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+
+BRIEFING_CACHE_VERSION = 1
+
+
+def record_path(story_dir) -> str:
+    story_dir = os.path.abspath(story_dir)
+    shaktra = os.path.dirname(os.path.dirname(story_dir))
+    return os.path.join(shaktra, ".index", "briefings", f"{os.path.basename(story_dir)}.json")
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def inputs_key(story_dir, memory_hash: str, settings: dict) -> dict:
+    """Hashes of everything a briefing for story_dir depends on."""
+    story_dir = os.path.abspath(story_dir)
+    try:
+        with open(f"{story_dir}.yml", "rb") as f:
+            story = _digest(f.read())
+    except OSError:
+        story = None
+    return {
+        "version": BRIEFING_CACHE_VERSION,
+        "story": story,
+        "memory": memory_hash,
+        "settings": _digest(json.dumps(settings, sort_keys=True, default=str).encode()),
+    }
+
+
+def _load(path: str) -> dict | None:
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def check(story_dir, key: dict) -> tuple[dict | None, str | None]:
+    """Return (record, None) when the briefing is current, else (record or None, miss reason)."""
+    record = _load(record_path(story_dir))
+    if record is None or record.get("key", {}).get("version") != key["version"]:
+        return None, "no-record"
+    try:
+        briefing_ns = os.stat(os.path.join(story_dir, ".briefing.yml")).st_mtime_ns
+    except OSError:
+        return record, "no-briefing"
+    changed = [f"{name}-changed" for name in ("story", "memory", "settings")
+               if record["key"].get(name) != key[name]]
+    if changed:
+        return record, ",".join(changed)
+    if briefing_ns < record.get("written_ns", 0):
+        return record, "briefing-not-regenerated"
+    return record, None
+
+
+def record(story_dir, key: dict, reason: str, tier: int, candidate_count: int) -> None:
+    """Store the inputs of the briefing about to be generated. Failures are ignored."""
+    path = record_path(story_dir)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    data = {
+        "key": key,
+        "written_ns": time.time_ns(),
+        "tier": tier,
+        "candidate_count": candidate_count,
+        "last_miss": {"reason": reason, "at": time.strftime("%Y-%m-%dT%H:%M:%S%z")},
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Check command_analyzer.py against the block regexes it replaced.
+
+Usage: check_command_analyzer.py [--cases N] [--seed N] [--max-ms N]
+
+Fuzzes random compound commands built from git verbs, protected and
+look-alike branch names, flags, quotes, operators and odd whitespace, and
+requires analyze() to agree with the legacy regexes on both decisions (block a
+protected target; git write present). Then times analyze() on multi-megabyte
+commands, including inputs that made the regexes backtrack, and fails when
+any takes longer than --max-ms (default 2000).
+
+Prints a JSON report. Exit 0 = equivalent and bounded, Exit 1 = failure.
+"""
+
+import json
+import random
+import re
+import sys
+import time
+
+from command_analyzer import analyze
+
+# Reference copy of the block_main_branch.py patterns this analyzer replaced
+PROTECTED = r"(?:main|master|prod|production)"
+LEGACY_BLOCK_PATTERNS = [
+    rf"(?:^|[;&|]\s*)git\s+(?:checkout|switch)\s+(?!.*(?:-[bcB]\b|--create\b))(?:\S+\s+)*(?:\w+/)*{PROTECTED}(?![\w-])",
+    rf"(?:^|[;&|]\s*)git\s+push\b[^;&|]*\b{PROTECTED}(?![\w-])",
+    rf"(?:^|[;&|]\s*)git\s+(?:merge|rebase|reset)\b[^;&|]*\b{PROTECTED}(?![\w-])",
+]
+LEGACY_WRITE_PATTERN = r"(?:^|[;&|]\s*)git\s+(?:commit|push|merge|rebase|reset)\b"
+
+DEFAULT_CASES = 20000
+DEFAULT_MAX_MS = 2000.0
+FRAGMENTS = [
+    "git", "git ", "git  ", "git\t", "git\n", "gitx", "/usr/bin/git",
+    "checkout", "switch", "push", "pushx", "push-x", "merge", "merge-base", "mergetool",
+    "rebase", "reset", "commit", "commit-tree", "status", "log",
+    "main", "master", "prod", "production", "mainline", "main-fix", "my_main",
+    "origin/main", "refs/heads/main", "a.b/main", "feature/main", "main/feature",
+    "main.txt", "x-main", "prod-1", "ünï/main", "main²",
+    "-b", "-B", "-c", "--create", "--create-x", "--detach", "-f", "--", "x-b", "-bx",
+    "origin", "HEAD~1", "--force", "echo", "ls", "&&", "||", "|", ";", "&",
+    "'", '"', "'main'", '"git push origin main"', "\\", "#",
+    " ", "  ", "\t", "\n", " ", " ",
+]
+
+
+def legacy(command: str) -> tuple[bool, bool]:
+    blocked = any(re.search(p, command) for p in LEGACY_BLOCK_PATTERNS)
+    return blocked, bool(re.search(LEGACY_WRITE_PATTERN, command))
+
+
+def current(command: str) -> tuple[bool, bool]:
+    branch, is_write = analyze(command)
+    return branch is not None, is_write
+
+
+def random_command(rng: random.Random) -> str:
+    parts = [rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 14))]
+    seps = ["", " ", " ", " ", "\t", "\n", "/"]
+    return "".join(p + rng.choice(seps) for p in parts).rstrip(" ") if rng.random() < 0.5 else \
+        "".join(p + rng.choice(seps) for p in parts)
+
+
+def fuzz(cases: int, seed: int) -> list:
+    rng = random.Random(seed)
+    mismatches = []
+    for _ in range(cases):
+        command = random_command(rng)
+        want, got = legacy(command), current(command)
+        if want != got:
+            mismatches.append({"command": command, "legacy": want, "analyzer": got})
+    return mismatches
+
+
+def big_commands() -> dict:
+    mb = 1_000_000
+    step = "echo step --flag=value src/pkg/module.py && "
+    return {
+        "long-chain-commit": step * (mb // len(step)) + "git commit -m x",
+        "long-chain-push-main": step * (2 * mb // len(step)) + "git push origin main",
+        "checkout-many-tokens": "git checkout " + "x " * (2 * mb // 2) + "y",
+        "checkout-slashes": "git checkout " + "a/" * (mb // 2) + "mainx",
+        "repeated-checkout": "git checkout x;" * (mb // 15),
+        "repeated-push": "git push origin " + "x " * 20 + ";" + ("git push origin x;" * (mb // 18)),
+        "word-run": "git push " + "m" * (3 * mb),
+        "whitespace-run": ";" + " " * (2 * mb) + "git push origin main",
+    }
+
+
+def main():
+    cases, seed, max_ms = DEFAULT_CASES, 0, DEFAULT_MAX_MS
+    args = sys.argv[1:]
+    while args:
+        flag = args.pop(0)
+        if flag == "--cases" and args:
+            cases = int(args.pop(0))
+        elif flag == "--seed" and args:
+            seed = int(args.pop(0))
+        elif flag == "--max-ms" and args:
+            max_ms = float(args.pop(0))
+        else:
+            print(__doc__.strip().splitlines()[2], file=sys.stderr)
+            sys.exit(1)
+
+    mismatches = fuzz(cases, seed)
+    timings = []
+    for name, command in big_commands().items():
+        start = time.perf_counter()
+        branch, is_write = analyze(command)
+        ms = (time.perf_counter() - start) * 1000
+        timings.append({"name": name, "bytes": len(command.encode()), "ms": round(ms, 1),
+                        "blocked": branch, "write": is_write, "ok": ms <= max_ms})
+
+    passed = not mismatches and all(t["ok"] for t in timings)
+    print(json.dumps({
+        "cases": cases,
+        "seed": seed,
+        "mismatches": mismatches[:20],
+        "mismatch_count": len(mismatches),
+        "max_ms": max_ms,
+        "timings": timings,
+        "passed": passed,
+    }, indent=2, ensure_ascii=False))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Check memory_chunks.py garbage collection on synthetic .shaktra trees.
+
+Usage: check_memory_chunks.py
+
+Builds throwaway projects whose stories directory holds story directories with
+and without .chunks/manifest.yml next to the `<id>.yml` story files, plus chunk
+sets that are current, referenced, stale, freshly built, or half-written
+(.tmp). collect_garbage() must delete exactly the stale unreferenced sets, and
+nothing at all when a manifest cannot be parsed.
+
+Prints a JSON report. Exit 0 = all cases pass, Exit 1 = failure.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from memory_chunks import GC_GRACE_SECONDS, chunks_root, collect_garbage
+
+CHUNK_SETS = ("current", "referenced", "stale", "fresh", "building.tmp")
+
+# (name, story files: {relative path: content}, expected deleted keys)
+CASES = [
+    ("story files next to story directories", {
+        "ST-1.yml": "id: ST-1\n",
+        "ST-1/.chunks/manifest.yml": "memory_chunks: referenced\nchunk_count: 0\n",
+        "ST-2.yml": "id: ST-2\n",
+        "ST-2/handoff.yml": "story_id: ST-2\n",
+    }, ["stale"]),
+    ("story directories only", {
+        "ST-1/.chunks/manifest.yml": "memory_chunks: 'referenced'\n",
+    }, ["stale"]),
+    ("unparseable manifest keeps everything", {
+        "ST-1.yml": "id: ST-1\n",
+        "ST-1/.chunks/manifest.yml": "chunks: []\n",
+    }, []),
+]
+
+
+def build(root: str, story_files: dict) -> str:
+    """Create .shaktra with the given story files and every CHUNK_SETS entry; return the memory dir."""
+    memory_dir = os.path.join(root, ".shaktra", "memory")
+    os.makedirs(memory_dir)
+    for rel, content in story_files.items():
+        path = os.path.join(root, ".shaktra", "stories", rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+    old = time.time() - GC_GRACE_SECONDS - 60
+    for name in CHUNK_SETS:
+        path = os.path.join(chunks_root(memory_dir), name)
+        os.makedirs(path)
+        if name != "fresh":
+            os.utime(path, (old, old))
+    return memory_dir
+
+
+def main():
+    if sys.argv[1:]:
+        print(__doc__.strip().splitlines()[2], file=sys.stderr)
+        sys.exit(1)
+
+    failures = []
+    for name, story_files, expected in CASES:
+        with tempfile.TemporaryDirectory() as root:
+            memory_dir = build(root, story_files)
+            deleted = sorted(collect_garbage(memory_dir, "current"))
+            remaining = sorted(os.listdir(chunks_root(memory_dir)))
+        if deleted != expected or sorted(set(CHUNK_SETS) - set(expected)) != remaining:
+            failures.append({"case": name, "expected": expected, "deleted": deleted, "remaining": remaining})
+    print(json.dumps({"cases": len(CASES), "failures": failures, "passed": not failures}, indent=2))
+    sys.exit(0 if not failures else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,80 +7,62 @@ Exit 0 = allow, Exit 2 = block.
 
 from __future__ import annotations
 
-import glob
 import os
 import sys
 
 
-def find_active_story(yaml) -> dict | None:
-    """Return the handoff dict for the active story, or None."""
+def _import_yaml():
+    """Import yaml lazily so an up-to-date index and summary need no PyYAML at all."""
+    try:
+        import yaml
+        return yaml
+    except ImportError:
+        print(
+            "BLOCKED: PyYAML is required for Shaktra hooks.\n"
+            "Install with: pip install pyyaml",
+            file=sys.stderr,
+        )
+        sys.exit(2)
+
+
+def find_active_summary() -> dict | None:
+    """Return the findings summary for the active story's handoff, or None."""
+    import findings_summary
+    import story_index
+
     project = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
-    pattern = os.path.join(project, ".shaktra", "stories", "*", "handoff.yml")
-    candidates = []
-    for path in glob.glob(pattern):
-        try:
-            with open(path) as f:
-                handoff = yaml.safe_load(f)
-            if not isinstance(handoff, dict):
-                continue
-            phase = handoff.get("current_phase", "")
-            if phase not in ("complete", "failed"):
-                candidates.append((os.path.getmtime(path), path, handoff))
-        except Exception:
-            continue
-    if not candidates:
+    entry = story_index.find_active(project, _import_yaml)
+    if entry is None:
         return None
-    candidates.sort(key=lambda c: c[0], reverse=True)
-    return candidates[0][2]
+    return findings_summary.current(project, entry["path"], _import_yaml)
 
 
 def main() -> None:
     if os.environ.get("SHAKTRA_SKIP_P0_CHECK"):
         sys.exit(0)
 
-    # Check if any handoff files exist before importing PyYAML
+    # No stories directory means no handoffs — skip before touching the index or PyYAML
     project = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
-    pattern = os.path.join(project, ".shaktra", "stories", "*", "handoff.yml")
-    if not glob.glob(pattern):
+    if not os.path.isdir(os.path.join(project, ".shaktra", "stories")):
         sys.exit(0)
 
-    try:
-        import yaml
-    except ImportError:
-        print(
-            "BLOCKED: PyYAML is required for Shaktra hooks.\n"
-            "Install with: pip install pyyaml",
-            file=sys.stderr,
-        )
-        sys.exit(2)
-
-    handoff = find_active_story(yaml)
-    if handoff is None:
+    summary = find_active_summary()
+    if summary is None:
         sys.exit(0)
 
-    findings = handoff.get("quality_findings", [])
-    if not isinstance(findings, list):
+    if not summary["valid"]:
         print(
             "BLOCKED: 'quality_findings' in handoff is not a list.\n"
             "  Cannot verify P0 status — blocking until corrected."
         )
         sys.exit(2)
 
-    p0s = [
-        f for f in findings
-        if isinstance(f, dict)
-        and str(f.get("severity", "")).upper() == "P0"
-        and not f.get("resolved", False)
-    ]
+    p0s = summary["p0"]
     if not p0s:
         sys.exit(0)
 
     print(f"BLOCKED: {len(p0s)} P0 finding(s) must be resolved before completion.\n")
-    for f in p0s:
-        loc = f.get("file", "unknown")
-        line = f.get("line", "")
-        desc = f.get("issue", "no description")
-        loc_str = f"{loc}:{line}" if line else loc
+    for loc_str, desc in p0s:
         print(f"  P0  {loc_str} — {desc}")
 
     sys.exit(2)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Check scope_matcher.py against the scope rules it replaced.
+
+Usage: check_scope_matcher.py [--cases N] [--seed N]
+
+Fuzzes random scopes of literal entries — including bracketed route segments
+such as `app/[id]/page.tsx`, dots, and look-alike names — and random paths,
+and requires matches() to agree with the legacy validate_story_scope.py loop
+(exact, directory containment, segment-aligned suffix). Then runs fixed cases
+for globs, `!` exclusions, and bracketed paths, which must never be read as
+character classes.
+
+Prints a JSON report. Exit 0 = all cases agree, Exit 1 = failure.
+"""
+
+import json
+import random
+import sys
+
+from scope_matcher import compile_scope, matches, normalize
+
+PROJECT = "/project"
+DEFAULT_CASES = 20000
+SEGMENTS = ["app", "src", "pkg", "[id]", "[slug]", "[...all]", "i", "d", "id", "page.tsx", "page", "a.py",
+            "a", "b.py", "test_a.py", "(group)", "x.y", "[", "]", "api"]
+
+# (declared files, path, expected)
+FIXED = [
+    (["app/[id]/page.tsx"], "app/[id]/page.tsx", True),
+    (["app/[id]/page.tsx"], "app/i/page.tsx", False),
+    (["app/[id]/page.tsx"], "app/d/page.tsx", False),
+    (["app/[id]"], "app/[id]/layout.tsx", True),
+    (["app/[id]/*.tsx"], "app/[id]/page.tsx", True),
+    (["app/[id]/*.tsx"], "app/i/page.tsx", False),
+    (["app/**/page.tsx"], "app/[slug]/[id]/page.tsx", True),
+    (["src/**/test_*.py"], "src/a/b/test_x.py", True),
+    (["src/**/test_*.py"], "src/a/b/x_test.py", False),
+    (["src/*.py"], "src/a/b.py", False),
+    (["src/?.py"], "src/a.py", True),
+    (["src/file?.py"], "src/file?.py", True),
+    (["src/**"], "src/a/b.py", True),
+    (["src", "!src/generated/**"], "src/generated/x.py", False),
+    (["src", "!src/generated/**"], "src/a.py", True),
+    (["app", "!app/[id]"], "app/[id]/page.tsx", False),
+    (["app", "!app/[id]"], "app/i/page.tsx", True),
+]
+
+
+def legacy(files: list, rel: str) -> bool:
+    for declared in files:
+        norm = normalize(declared, PROJECT)
+        if not norm:
+            continue
+        if rel == norm or rel.startswith(norm + "/") or rel.endswith("/" + norm) or norm.endswith("/" + rel):
+            return True
+    return False
+
+
+def random_path(rng: random.Random) -> str:
+    return "/".join(rng.choice(SEGMENTS) for _ in range(rng.randint(1, 4)))
+
+
+def fuzz(cases: int, seed: int) -> list:
+    rng = random.Random(seed)
+    mismatches = []
+    for _ in range(cases):
+        files = [random_path(rng) for _ in range(rng.randint(1, 5))]
+        rel = random_path(rng)
+        want, got = legacy(files, rel), matches(compile_scope(files, PROJECT), rel)
+        if want != got:
+            mismatches.append({"files": files, "path": rel, "legacy": want, "matcher": got})
+    return mismatches
+
+
+def main():
+    cases, seed = DEFAULT_CASES, 0
+    args = sys.argv[1:]
+    while args:
+        flag = args.pop(0)
+        if flag == "--cases" and args:
+            cases = int(args.pop(0))
+        elif flag == "--seed" and args:
+            seed = int(args.pop(0))
+        else:
+            print(__doc__.strip().splitlines()[2], file=sys.stderr)
+            sys.exit(1)
+
+    mismatches = fuzz(cases, seed)
+    failures = [{"files": files, "path": rel, "expected": expected}
+                for files, rel, expected in FIXED if matches(compile_scope(files, PROJECT), rel) != expected]
+    passed = not mismatches and not failures
+    print(json.dumps({
+        "cases": cases,
+        "seed": seed,
+        "mismatches": mismatches[:20],
+        "mismatch_count": len(mismatches),
+        "fixed_cases": len(FIXED),
+        "fixed_failures": failures,
+        "passed": passed,
+    }, indent=2))
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
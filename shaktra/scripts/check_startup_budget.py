@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Check hook cold-start import cost against a millisecond budget.
+
+Usage: check_startup_budget.py [--budget-ms N] [--runs N]
+
+Runs every hook, directly and through hook_client.py, under `python3 -X importtime`
+with payloads that take each hook's fast path ("not my file", "not a git command",
+no stories). Reports the import time each hook adds on top of a bare interpreter,
+as the median over several runs, and fails when:
+  - the median exceeds the budget (default 15 ms, or SHAKTRA_STARTUP_BUDGET_MS), or
+  - a fast path imports a module it must not (PyYAML, subprocess, socket, ...).
+
+Prints a JSON report. Exit 0 = within budget, Exit 1 = regression.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DEFAULT_BUDGET_MS = 15.0
+DEFAULT_RUNS = 7
+
+# (hook, payload, modules the fast path must not import)
+SCENARIOS = [
+    ("block_main_branch", {"tool_input": {"command": "ls -la && pytest -q"}}, {"yaml", "subprocess", "json"}),
+    ("block_main_branch", {"tool_input": {"command": "git status"}}, {"yaml", "subprocess"}),
+    ("validate_schema", {"tool_input": {"file_path": "src/app.py"}}, {"yaml", "json"}),
+    ("validate_schema", {"tool_input": {"file_path": ".shaktra/notes.md"}}, {"yaml"}),
+    ("validate_story_scope", {"tool_input": {"file_path": ".shaktra/stories/ST-001.yml"}}, {"yaml", "subprocess"}),
+    ("validate_story_scope", {"tool_input": {"file_path": "src/app.py"}}, {"yaml", "subprocess"}),
+    ("check_p0_findings", {}, {"yaml", "subprocess", "json"}),
+]
+
+
+def parse_importtime(stderr: str) -> tuple[float, set]:
+    """Return (total top-level cumulative import ms, imported module names)."""
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, rest = line.partition("import time:")
+        fields = rest.split("|")
+        if len(fields) != 3:
+            continue
+        name = fields[2].rstrip()
+        modules.add(name.strip())
+        if not name.startswith("  "):  # top-level import: cumulative covers its children
+            total_us += int(fields[1])
+    return total_us / 1000, modules
+
+
+def run_once(argv: list, payload: str, env: dict) -> tuple[float, set, int]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        input=payload, capture_output=True, text=True, env=env, timeout=30,
+    )
+    ms, modules = parse_importtime(proc.stderr)
+    return ms, modules, proc.returncode
+
+
+def baseline_ms(env: dict, runs: int) -> float:
+    return statistics.median(run_once(["-c", "pass"], "", env)[0] for _ in range(runs))
+
+
+def main():
+    budget = float(os.environ.get("SHAKTRA_STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS))
+    runs = DEFAULT_RUNS
+    args = sys.argv[1:]
+    while args:
+        flag = args.pop(0)
+        if flag == "--budget-ms" and args:
+            budget = float(args.pop(0))
+        elif flag == "--runs" and args:
+            runs = int(args.pop(0))
+        else:
+            print(__doc__.strip().splitlines()[2], file=sys.stderr)
+            sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as project:
+        env = {**os.environ, "CLAUDE_PROJECT_DIR": project}
+        for key in ("SHAKTRA_HOOKD_SOCKET", "SHAKTRA_HOOKD_AUTOSTART"):
+            env.pop(key, None)
+        env["SHAKTRA_HOOKD_SOCKET"] = os.path.join(project, "no-daemon.sock")
+        base = baseline_ms(env, runs)
+
+        results = []
+        failed = False
+        for hook, payload, forbidden in SCENARIOS:
+            text = json.dumps(payload)
+            for argv in ([str(SCRIPTS_DIR / f"{hook}.py")],
+                         [str(SCRIPTS_DIR / "hook_client.py"), hook]):
+                samples, imported, codes = [], set(), set()
+                for _ in range(runs):
+                    ms, modules, code = run_once(argv, text, env)
+                    samples.append(ms)
+                    imported |= modules
+                    codes.add(code)
+                added = max(statistics.median(samples) - base, 0.0)
+                bad = sorted(forbidden & imported)
+                ok = added <= budget and not bad and codes == {0}
+                failed |= not ok
+                results.append({
+                    "entry": Path(argv[0]).name if len(argv) == 1 else f"hook_client.py {hook}",
+                    "payload": payload,
+                    "added_import_ms": round(added, 2),
+                    "forbidden_imports": bad,
+                    "exit_codes": sorted(codes),
+                    "ok": ok,
+                })
+
+    print(json.dumps({
+        "budget_ms": budget,
+        "baseline_import_ms": round(base, 2),
+        "runs": runs,
+        "passed": not failed,
+        "results": results,
+    }, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Linear-time git command analyzer for block_main_branch.py.
+
+Replaces the block regexes, whose nested quantifiers and `(?!.*...)` lookahead
+backtracked badly on long generated command lines. The command is split into
+commands at the shell operators ; & | (so `&&` and `||` split too), and every
+`git` invocation that starts the line or follows an operator is classified:
+
+  - push | merge | rebase | reset  — blocked if a protected name appears as a
+    word later in the same command (`git push origin main`)
+  - checkout | switch              — blocked if any later whitespace-delimited
+    token is a protected ref (`main`, `origin/main`, `refs/heads/main`), unless
+    a branch-creation flag (-b, -B, -c, --create) follows on the same line
+  - commit | push | merge | rebase | reset — reported as a write operation
+
+Operators, tokens, protected names and creation flags are each collected in one
+left-to-right pass with non-backtracking scanners; each invocation is then
+classified with O(log n) lookups. Decisions match the previous regexes
+exactly, including their quirks: operators split even inside quotes, a leading
+space hides the first command, and checkout targets may sit in a later command.
+check_command_analyzer.py fuzzes this equivalence.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+
+PROTECTED_NAMES = ("main", "master", "prod", "production")
+WRITE_VERBS = ("commit", "push", "merge", "rebase", "reset")
+TARGET_VERBS = ("push", "merge", "rebase", "reset")
+SWITCH_VERBS = ("checkout", "switch")
+OPERATORS = ";&|"
+
+# Compiled on first use (re caches them) so the "git status" path stays cheap to import
+OPERATOR_PATTERN = r"[;&|]"
+SPACE_PATTERN = r"\s*"
+TOKEN_PATTERN = r"\S+"
+WORD_PATTERN = r"\w+"
+NAME_PATTERN = r"(?<!\w)(?:main|master|prod|production)(?![\w-])"
+CREATE_FLAG_PATTERN = r"-[bcB]\b|--create\b"
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def git_starts(command: str):
+    """Yield the index of each `git` that begins the command or follows ; & | and whitespace."""
+    pos = command.find("git")
+    while pos != -1:
+        if pos == 0:
+            yield pos
+        else:
+            i = pos - 1
+            while i >= 0 and command[i].isspace():
+                i -= 1
+            if i >= 0 and command[i] in OPERATORS:
+                yield pos
+        pos = command.find("git", pos + 1)
+
+
+def _subcommand(command: str, start: int) -> tuple[str, int] | None:
+    """Return (verb, index after verb) for `git<whitespace><verb>` at start."""
+    after_git = start + 3
+    verb_start = re.compile(SPACE_PATTERN).match(command, after_git).end()
+    if verb_start == after_git:
+        return None
+    for verb in WRITE_VERBS + SWITCH_VERBS:
+        if command.startswith(verb, verb_start):
+            return verb, verb_start + len(verb)
+    return None
+
+
+def protected_ref(token: str) -> str | None:
+    """Return the protected name if token starts with `(word/)*<name>` not followed by a word char or `-`."""
+    for part in token.split("/"):
+        for name in PROTECTED_NAMES:
+            if part.startswith(name):
+                after = part[len(name):len(name) + 1]
+                if not after or not (_is_word(after) or after == "-"):
+                    return name
+        if not re.fullmatch(WORD_PATTERN, part):
+            return None
+    return None
+
+
+class _Scan:
+    """Lazily built, sorted position tables over one command string."""
+
+    def __init__(self, command: str):
+        self.command = command
+        self._names = self._tokens = self._flags = self._newlines = None
+
+    def names(self):
+        if self._names is None:
+            found = [(m.start(), m.group()) for m in re.finditer(NAME_PATTERN, self.command)]
+            self._names = ([p for p, _ in found], [n for _, n in found])
+        return self._names
+
+    def tokens(self):
+        if self._tokens is None:
+            starts, names = [], []
+            for m in re.finditer(TOKEN_PATTERN, self.command):
+                token = m.group()
+                if "main" in token or "master" in token or "prod" in token:
+                    name = protected_ref(token)
+                    if name:
+                        starts.append(m.start())
+                        names.append(name)
+            self._tokens = (starts, names)
+        return self._tokens
+
+    def flags(self):
+        if self._flags is None:
+            self._flags = [m.start() for m in re.finditer(CREATE_FLAG_PATTERN, self.command)]
+        return self._flags
+
+    def newlines(self):
+        if self._newlines is None:
+            self._newlines = [m.start() for m in re.finditer("\n", self.command)]
+        return self._newlines
+
+
+def _first_at_or_after(table, pos: int, limit: int):
+    """Return the name of the first entry in [pos, limit), or None."""
+    starts, names = table
+    k = bisect_left(starts, pos)
+    if k < len(starts) and starts[k] < limit:
+        return names[k]
+    return None
+
+
+def analyze(command: str) -> tuple[str | None, bool]:
+    """Return (protected branch explicitly targeted, or None; whether any git write is present)."""
+    size = len(command)
+    scan = _Scan(command)
+    blocked = None
+    is_write = False
+    for start in git_starts(command):
+        parsed = _subcommand(command, start)
+        if parsed is None:
+            continue
+        verb, end = parsed
+        at_boundary = end == size or not _is_word(command[end])
+
+        if verb in WRITE_VERBS and at_boundary:
+            is_write = True
+        if blocked is not None:
+            continue
+
+        if verb in TARGET_VERBS and at_boundary:
+            op = re.compile(OPERATOR_PATTERN).search(command, end)
+            blocked = _first_at_or_after(scan.names(), end, op.start() if op else size)
+        elif verb in SWITCH_VERBS:
+            target = re.compile(SPACE_PATTERN).match(command, end).end()
+            if target == end or target == size:
+                continue
+            newlines = scan.newlines()
+            k = bisect_left(newlines, target)
+            line_end = newlines[k] if k < len(newlines) else size
+            flags = scan.flags()
+            k = bisect_left(flags, target)
+            if k < len(flags) and flags[k] < line_end:
+                continue
+            blocked = _first_at_or_after(scan.tokens(), target, size + 1)
+    return blocked, is_write
@@ -0,0 +1,94 @@
+"""Per-test line coverage map read from coverage.py data.
+
+mutation_runner.py uses it to run, for each mutant, only the tests that execute
+the mutated lines; test_impact.py stores it to select the tests affected by a
+story's changes. The data file must be recorded with test contexts:
+
+  python -m pytest --cov=<package> --cov-context=test     (pytest-cov)
+  coverage run --context ... with dynamic_context = test_function
+
+The .coverage file is SQLite; its `file`, `context`, and `line_bits` tables are
+read directly (numbits: bit k of byte i marks line 8*i + k), so coverage.py need
+not be importable here. pytest-cov contexts are pytest node IDs plus a
+`|setup`/`|run`/`|teardown` phase; test_function contexts are dotted names and
+are mapped back to node IDs through the project's test files. Paths are made
+relative to the project.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+
+
+def node_id(context: str, project: str) -> str | None:
+    """The pytest node ID of a coverage context, or None for the empty (static) context."""
+    context = context.split("|", 1)[0]
+    if not context or "::" in context:
+        return context or None
+    parts = context.split(".")  # test_function: package.module.Class.test
+    for cut in range(len(parts) - 1, 0, -1):
+        path = "/".join(parts[:cut]) + ".py"
+        if os.path.isfile(os.path.join(project, path)):
+            return "::".join([path] + parts[cut:])
+    return None
+
+
+def lines(numbits: bytes) -> list[int]:
+    return [8 * i + k for i, byte in enumerate(numbits) if byte for k in range(8) if byte & (1 << k)]
+
+
+def relative(path: str, project: str) -> str:
+    """A measured path made project-relative; paths outside the project are returned as recorded."""
+    real = os.path.realpath(os.path.join(project, path))
+    return os.path.relpath(real, project).replace(os.sep, "/") if real.startswith(project + os.sep) else path
+
+
+def measured(data_file: str, project: str) -> set[str]:
+    """Every file the data file measured, including files only executed at import (no test context)."""
+    try:
+        conn = sqlite3.connect(f"file:{data_file}?mode=ro", uri=True)
+        try:
+            paths = [path for path, in conn.execute("SELECT path FROM file")]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return set()
+    project = os.path.realpath(project)
+    return {relative(path, project) for path in paths}
+
+
+def load(data_file: str, project: str) -> dict[str, dict[int, set[str]]] | None:
+    """{path: {line: {test node IDs}}}, or None when the file has no test contexts."""
+    try:
+        conn = sqlite3.connect(f"file:{data_file}?mode=ro", uri=True)
+        try:
+            files = dict(conn.execute("SELECT id, path FROM file"))
+            contexts = dict(conn.execute("SELECT id, context FROM context"))
+            rows = conn.execute("SELECT file_id, context_id, numbits FROM line_bits").fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    project = os.path.realpath(project)
+    tests = {cid: node_id(name, project) for cid, name in contexts.items()}
+    if not any(tests.values()):
+        return None
+    cov: dict[str, dict[int, set[str]]] = {}
+    for file_id, context_id, numbits in rows:
+        test = tests.get(context_id)
+        if not test or file_id not in files:
+            continue
+        by_line = cov.setdefault(relative(files[file_id], project), {})
+        for line in lines(numbits):
+            by_line.setdefault(line, set()).add(test)
+    return cov
+
+
+def tests_for(cov: dict[str, dict[int, set[str]]], path: str, first: int, last: int) -> set[str]:
+    """Tests that executed any of lines first..last of path."""
+    by_line = cov.get(path) or {}
+    found: set[str] = set()
+    for line in range(first, last + 1):
+        found |= by_line.get(line, set())
+    return found
@@ -0,0 +1,125 @@
+"""Per-story findings summaries for the Stop hook.
+
+validate_schema.py writes .shaktra/.index/findings/<story>.json whenever it
+validates a handoff: unresolved finding counts by severity plus the location and
+description of every unresolved P0. check_p0_findings.py reads only that summary
+instead of parsing the handoff and walking its full quality_findings list.
+
+A summary is trusted only while the handoff's size, mtime, and inode match the
+ones it was built from; otherwise it is rebuilt from the handoff. On filesystems
+with whole-second mtimes, a summary built within RACY_WINDOW_NS of the handoff's
+mtime is not trusted, since a second write in the same tick could go unnoticed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from yaml_cache import load_yaml
+
+SUMMARY_VERSION = 1
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def summary_path(project: str, name: str) -> str:
+    return os.path.join(project, ".shaktra", ".index", "findings", f"{name}.json")
+
+
+def _key(st: os.stat_result) -> list:
+    return [SUMMARY_VERSION, st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def _trusted(summary: dict, st: os.stat_result) -> bool:
+    if summary.get("key") != _key(st):
+        return False
+    coarse = st.st_mtime_ns % 1_000_000_000 == 0
+    return summary.get("built_ns", 0) - st.st_mtime_ns > (RACY_WINDOW_NS if coarse else 0)
+
+
+def summarize(handoff: dict) -> dict:
+    """Return {"valid", "unresolved", "p0"} for a handoff's quality_findings."""
+    findings = handoff.get("quality_findings", [])
+    if not isinstance(findings, list):
+        return {"valid": False, "unresolved": {}, "p0": []}
+    unresolved: dict[str, int] = {}
+    p0 = []
+    for f in findings:
+        if not isinstance(f, dict) or f.get("resolved", False):
+            continue
+        severity = str(f.get("severity", "")).upper() or "UNKNOWN"
+        unresolved[severity] = unresolved.get(severity, 0) + 1
+        if severity == "P0":
+            loc = f.get("file", "unknown")
+            line = f.get("line", "")
+            p0.append([f"{loc}:{line}" if line else f"{loc}", f"{f.get('issue', 'no description')}"])
+    return {"valid": True, "unresolved": unresolved, "p0": p0}
+
+
+def _save(project: str, name: str, summary: dict) -> None:
+    """Write the summary atomically. Failures are ignored — the summary is only a cache."""
+    path = summary_path(project, name)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(summary, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _load(project: str, name: str) -> dict | None:
+    try:
+        with open(summary_path(project, name)) as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return summary if isinstance(summary, dict) else None
+
+
+def record(project: str, path: str, handoff: dict, before: os.stat_result) -> None:
+    """Store the summary of handoff, parsed from path while it had stat `before`.
+
+    Nothing is stored if path changed since `before` (the next reader rebuilds instead)
+    or if path is not a handoff directly under this project's stories directory.
+    """
+    story_dir = os.path.dirname(os.path.abspath(path))
+    if os.path.dirname(story_dir) != os.path.abspath(os.path.join(project, ".shaktra", "stories")):
+        return
+    name = os.path.basename(story_dir)
+    try:
+        after = os.stat(path)
+    except OSError:
+        return
+    if _key(after) != _key(before):
+        return
+    _save(project, name, {"key": _key(after), "built_ns": time.time_ns(), **summarize(handoff)})
+
+
+def current(project: str, path: str, import_yaml) -> dict | None:
+    """Return the findings summary of the handoff at path, rebuilding it if stale.
+
+    Returns None when the handoff is missing, unparseable, or not a mapping.
+    """
+    name = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    summary = _load(project, name)
+    if summary is not None and _trusted(summary, st):
+        return summary
+    try:
+        handoff = load_yaml(path, import_yaml)
+    except Exception:
+        return None
+    if not isinstance(handoff, dict):
+        return None
+    summary = {"key": _key(st), "built_ns": time.time_ns(), **summarize(handoff)}
+    record(project, path, handoff, st)
+    return summary
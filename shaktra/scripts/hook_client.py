@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Hook shim: forward a hook invocation to the resident hook daemon.
+
+Usage: hook_client.py <hook_name>
+
+hooks.json invokes this shim instead of the hook scripts directly. When a
+daemon (hook_daemon.py) is listening, the hook runs inside it with warm
+imports and caches. When no daemon is listening, the daemon reports that it
+is stale, or it goes away before answering (connection reset, empty or
+truncated reply — e.g. it exited with this request still queued), the hook
+runs in-process here, so enforcement never lapses. A daemon that sends a
+complete reply of the wrong shape blocks.
+
+Exit 0 = allow, Exit 2 = block (same contract as the hook scripts).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+HOOKS = ("block_main_branch", "check_p0_findings", "validate_schema", "validate_story_scope")
+PROTOCOL_VERSION = 1
+ENV_PREFIXES = ("CLAUDE_", "SHAKTRA_", "GIT_")
+CONNECT_TIMEOUT = 0.25
+REPLY_TIMEOUT = 30.0
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def socket_path() -> str:
+    """Return the per-user daemon socket path (override with SHAKTRA_HOOKD_SOCKET)."""
+    override = os.environ.get("SHAKTRA_HOOKD_SOCKET")
+    if override:
+        return override
+    base = os.environ.get("TMPDIR", "/tmp")
+    return os.path.join(base, f"shaktra-hookd-{os.getuid()}", "hookd.sock")
+
+
+def scripts_fingerprint() -> str:
+    """Fingerprint the plugin scripts so a daemon running old code is detected as stale."""
+    parts = []
+    with os.scandir(SCRIPTS_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".py"):
+                st = entry.stat()
+                parts.append(f"{entry.name}:{st.st_mtime_ns}:{st.st_size}")
+    parts.sort()
+    return f"v{PROTOCOL_VERSION}|" + "|".join(parts)
+
+
+def forwarded_env() -> dict:
+    """Environment variables the hooks read, forwarded to the daemon per request."""
+    return {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIXES)}
+
+
+def _block(message: str) -> None:
+    print(f"BLOCKED: {message} — failing closed.")
+    sys.exit(2)
+
+
+def run_in_process(hook: str, stdin_text: str | None = None) -> None:
+    """Run the hook's main() in this process. Never returns (hooks always sys.exit)."""
+    if stdin_text is not None:
+        import io
+        sys.stdin = io.StringIO(stdin_text)
+    __import__(hook).main()
+    sys.exit(0)
+
+
+def _autostart() -> None:
+    """Spawn a detached daemon for subsequent calls when SHAKTRA_HOOKD_AUTOSTART is set."""
+    if not os.environ.get("SHAKTRA_HOOKD_AUTOSTART"):
+        return
+    import subprocess
+    try:
+        subprocess.Popen(
+            [sys.executable, os.path.join(SCRIPTS_DIR, "hook_daemon.py"), "start"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass
+
+
+def _connect():
+    """Return a connected socket, or None when no daemon is listening."""
+    path = socket_path()
+    if not os.path.exists(path):
+        return None  # checked before importing socket, which costs more than the hook itself
+    try:
+        import socket
+        family = socket.AF_UNIX
+    except (ImportError, AttributeError):
+        return None
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _exchange(sock, request: dict):
+    """Return the daemon's decoded reply, or None when the daemon went away without a complete one."""
+    import json
+
+    sock.settimeout(REPLY_TIMEOUT)
+    chunks = []
+    try:
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return json.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None  # reset, timeout, empty or truncated reply
+
+
+def main() -> None:
+    if len(sys.argv) != 2 or sys.argv[1] not in HOOKS:
+        _block(f"hook_client.py expects one of {', '.join(HOOKS)}")
+    hook = sys.argv[1]
+
+    sock = _connect()
+    if sock is None:
+        _autostart()
+        run_in_process(hook)
+
+    stdin_text = sys.stdin.read()
+    request = {
+        "v": PROTOCOL_VERSION,
+        "hook": hook,
+        "fingerprint": scripts_fingerprint(),
+        "cwd": os.getcwd(),
+        "env": forwarded_env(),
+        "stdin": stdin_text,
+    }
+    with sock:
+        reply = _exchange(sock, request)
+    if reply is None:
+        run_in_process(hook, stdin_text)  # daemon gone: enforce here instead of blocking the tool call
+    if not isinstance(reply, dict):
+        _block("hook daemon sent a malformed reply")
+    if reply.get("stale"):
+        run_in_process(hook, stdin_text)
+
+    code = reply.get("exit")
+    if code not in (0, 1, 2):
+        _block("hook daemon sent a malformed reply")
+    sys.stdout.write(str(reply.get("stdout", "")))
+    sys.stderr.write(str(reply.get("stderr", "")))
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Resident hook server: run Shaktra hooks in a warm process over a Unix socket.
+
+Usage: hook_daemon.py start|stop|status|serve
+
+Optional. hook_client.py forwards each hook invocation here when the daemon is
+listening, which removes interpreter startup and PyYAML import from every tool
+call and keeps module-level caches warm between calls. Requests are handled one
+at a time; each runs with the caller's cwd, forwarded environment, and stdin.
+
+The daemon exits after SHAKTRA_HOOKD_IDLE seconds without requests (default
+1800), and as soon as a client reports that the plugin scripts have changed.
+On exit it first removes the socket path, so new clients run hooks in-process,
+then answers every connection still queued with `stale` before closing.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import traceback
+
+from hook_client import (
+    ENV_PREFIXES,
+    HOOKS,
+    PROTOCOL_VERSION,
+    SCRIPTS_DIR,
+    scripts_fingerprint,
+    socket_path,
+)
+
+DEFAULT_IDLE_SECONDS = 1800
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+def _ping(path: str) -> bool:
+    """Return True if a daemon is accepting connections on path."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(0.25)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def _prepare_socket_dir(path: str) -> None:
+    """Create the socket directory private to this user, refusing foreign ones."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    if st.st_uid != os.getuid():
+        raise SystemExit(f"Error: {directory} is not owned by the current user.")
+    os.chmod(directory, 0o700)
+
+
+@contextlib.contextmanager
+def _request_context(request: dict):
+    """Apply the caller's cwd, environment, and stdin for the duration of one hook run."""
+    saved_cwd = os.getcwd()
+    saved_env = {k: v for k, v in os.environ.items() if k.startswith(ENV_PREFIXES)}
+    saved_stdin = sys.stdin
+    try:
+        for key in saved_env:
+            del os.environ[key]
+        os.environ.update({str(k): str(v) for k, v in request.get("env", {}).items()})
+        os.chdir(request.get("cwd") or saved_cwd)
+        sys.stdin = io.StringIO(request.get("stdin", ""))
+        yield
+    finally:
+        sys.stdin = saved_stdin
+        os.chdir(saved_cwd)
+        for key in [k for k in os.environ if k.startswith(ENV_PREFIXES)]:
+            del os.environ[key]
+        os.environ.update(saved_env)
+
+
+def run_hook(request: dict) -> dict:
+    """Run one hook's main() and capture its exit code and output."""
+    out, err = io.StringIO(), io.StringIO()
+    code = 0
+    try:
+        module = importlib.import_module(request["hook"])
+        with _request_context(request), contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            module.main()
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            err.write(f"{e.code}\n")
+            code = 1
+    except Exception:
+        traceback.print_exc(file=err)
+        code = 1
+    return {"exit": code, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+
+def _read_request(conn) -> dict | None:
+    buf = bytearray()
+    while b"\n" not in buf:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        buf.extend(chunk)
+        if len(buf) > MAX_REQUEST_BYTES:
+            return None
+    try:
+        request = json.loads(bytes(buf))
+    except ValueError:
+        return None
+    if not isinstance(request, dict) or request.get("hook") not in HOOKS:
+        return None
+    return request
+
+
+def _drain(server) -> None:
+    """Answer connections already queued on the listening socket with `stale`."""
+    server.settimeout(0.0)
+    while True:
+        try:
+            conn, _ = server.accept()
+        except OSError:  # BlockingIOError: queue empty
+            return
+        with conn:
+            conn.settimeout(1)
+            with contextlib.suppress(OSError):
+                _read_request(conn)
+                conn.sendall(json.dumps({"stale": True}).encode())
+
+
+def serve() -> None:
+    path = socket_path()
+    _prepare_socket_dir(path)
+    if os.path.exists(path):
+        if _ping(path):
+            print(f"Hook daemon already running on {path}")
+            return
+        os.unlink(path)
+
+    idle = float(os.environ.get("SHAKTRA_HOOKD_IDLE", DEFAULT_IDLE_SECONDS))
+    fingerprint = scripts_fingerprint()
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    for hook in HOOKS:
+        importlib.import_module(hook)
+    with contextlib.suppress(ImportError):
+        import yaml  # noqa: F401 — warm the import every hook pays for
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(16)
+    server.settimeout(idle)
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+            with conn:
+                conn.settimeout(5)
+                try:
+                    request = _read_request(conn)
+                except OSError:
+                    continue
+                if request is None:
+                    reply = {"exit": 2, "stdout": "BLOCKED: Malformed hook request — failing closed.\n", "stderr": ""}
+                elif request.get("v") != PROTOCOL_VERSION or request.get("fingerprint") != fingerprint:
+                    with contextlib.suppress(OSError):
+                        conn.sendall(json.dumps({"stale": True}).encode())
+                    break
+                else:
+                    reply = run_hook(request)
+                with contextlib.suppress(OSError):
+                    conn.sendall(json.dumps(reply).encode())
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)  # new clients stop connecting and run in-process
+        _drain(server)
+        server.close()
+
+
+def start() -> None:
+    """Launch a detached daemon and wait briefly until it accepts connections."""
+    path = socket_path()
+    if os.path.exists(path) and _ping(path):
+        print(f"Hook daemon already running on {path}")
+        return
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "serve"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if os.path.exists(path) and _ping(path):
+            print(f"Hook daemon started on {path}")
+            return
+        time.sleep(0.05)
+    print("Error: hook daemon did not come up within 5s", file=sys.stderr)
+    sys.exit(1)
+
+
+def stop() -> None:
+    """Ask the daemon to exit by presenting a mismatched fingerprint."""
+    path = socket_path()
+    if not (os.path.exists(path) and _ping(path)):
+        print("Hook daemon not running")
+        return
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(5)
+    with sock:
+        sock.connect(path)
+        request = {"v": PROTOCOL_VERSION, "hook": HOOKS[0], "fingerprint": "stop"}
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with contextlib.suppress(OSError):
+            sock.recv(64)
+    print("Hook daemon stopped")
+
+
+def status() -> None:
+    path = socket_path()
+    running = os.path.exists(path) and _ping(path)
+    print(json.dumps({"running": running, "socket": path}))
+
+
+def main() -> None:
+    commands = {"start": start, "stop": stop, "status": status, "serve": serve}
+    if len(sys.argv) != 2 or sys.argv[1] not in commands:
+        print("Usage: hook_daemon.py start|stop|status|serve", file=sys.stderr)
+        sys.exit(1)
+    commands[sys.argv[1]]()
+
+
+if __name__ == "__main__":
+    main()
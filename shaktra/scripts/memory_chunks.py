@@ -0,0 +1,283 @@
+"""Shared, topic-clustered Tier 3 chunks of the memory stores.
+
+Active entries above the briefing confidence threshold are grouped by primary
+category, ordered by tag within each group, and packed into as few chunks as fit
+the retrieval_chunk_tokens budget (and at most retrieval_chunk_size entries
+each), balanced by estimated tokens so no chunk retriever gets far more text
+than another. Small topics share a chunk; large topics are split. Each chunk
+file starts with a header listing its categories, tags, and estimated tokens.
+
+Token costs come from a local heuristic (estimate_tokens) and are cached per
+entry content hash in .shaktra/.index/token-costs.bin.
+
+Chunks are written once per memory content hash (plus chunk limits and threshold)
+to .shaktra/.index/chunks/<key>/ and shared by every story. A story's
+.chunks/manifest.yml references only the shared chunks that hold at least one of
+its candidates, together with those candidate IDs and each chunk's tokens.
+Chunk sets are garbage-collected by mark and sweep: a set is deleted only when no
+story manifest references it and it is older than GC_GRACE_SECONDS (a story may
+have built it and not yet written its manifest).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import marshal
+import os
+import re
+import shutil
+import time
+
+CHUNKS_VERSION = 2
+TOKENS_VERSION = 1
+GC_GRACE_SECONDS = 3600
+ENTRY_OVERHEAD_TOKENS = 4  # list marker, indentation, and separators around each entry
+_PIECE_RE = re.compile(r"[^\W\d_]+|\d+|\S")
+
+
+def chunks_root(memory_dir: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(memory_dir)), ".index", "chunks")
+
+
+def member_key(source_file: str, entry_id) -> str:
+    return f"{source_file}:{entry_id}"
+
+
+def _strings(value) -> list[str]:
+    return [str(v) for v in value if v is not None] if isinstance(value, list) else []
+
+
+def topic(entry: dict) -> str:
+    """Primary topic of an entry: its first category, else its store."""
+    categories = _strings(entry.get("categories"))
+    return categories[0] if categories else entry["_source_file"].rsplit(".", 1)[0]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count: ~4 letters per token, ~3 digits per token, one per symbol."""
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        if piece[0].isalpha():
+            tokens += (len(piece) + 3) // 4
+        elif piece[0].isdigit():
+            tokens += (len(piece) + 2) // 3
+        else:
+            tokens += 1
+    return tokens
+
+
+def entry_costs(memory_dir: str, entries: list[dict]) -> list[int]:
+    """Estimated tokens per entry, cached by entry content hash in .shaktra/.index/token-costs.bin."""
+    path = os.path.join(os.path.dirname(chunks_root(memory_dir)), "token-costs.bin")
+    try:
+        with open(path, "rb") as f:
+            cache = marshal.load(f)
+        if cache.get("version") != TOKENS_VERSION:
+            cache = {}
+    except Exception:
+        cache = {}
+    costs = cache.get("costs", {})
+    fresh, result = {}, []
+    for entry in entries:
+        text = json.dumps(entry, sort_keys=True, default=str)
+        digest = hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+        cost = costs.get(digest)
+        if cost is None:
+            cost = estimate_tokens(text) + ENTRY_OVERHEAD_TOKENS
+        fresh[digest] = cost
+        result.append(cost)
+    if fresh != costs:  # keep only the current entries
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "wb") as f:
+                marshal.dump({"version": TOKENS_VERSION, "costs": fresh}, f)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+    return result
+
+
+def cluster(entries: list[dict], costs: list[int], chunk_size: int, chunk_tokens: int) -> list[list[int]]:
+    """Split entries into topic-coherent chunks; return the entry positions of each chunk.
+
+    The chunk count is the minimum that keeps every chunk within chunk_tokens
+    estimated tokens and chunk_size entries. Topics are cut into pieces no larger
+    than an even share of the total, and pieces are assigned largest first to the
+    lightest chunk they fit, so chunks end up close to equal in tokens. An entry
+    larger than chunk_tokens gets a chunk of its own.
+    """
+    chunk_size, chunk_tokens = max(1, int(chunk_size)), max(1, int(chunk_tokens))
+    total = sum(costs)
+    count = max(1, -(-total // chunk_tokens), -(-len(entries) // chunk_size))
+    share_tokens, share_entries = -(-total // count), -(-len(entries) // count)
+
+    groups: dict[str, list[int]] = {}
+    for position, entry in enumerate(entries):
+        groups.setdefault(topic(entry), []).append(position)
+    pieces: list[list[int]] = []
+    for name in sorted(groups):
+        piece, tokens = [], 0
+        for position in sorted(groups[name], key=lambda p: (_strings(entries[p].get("tags"))[:1],
+                                                            str(entries[p].get("id")))):
+            if piece and (tokens + costs[position] > share_tokens or len(piece) >= share_entries):
+                pieces.append(piece)
+                piece, tokens = [], 0
+            piece.append(position)
+            tokens += costs[position]
+        if piece:
+            pieces.append(piece)
+
+    bins = [[] for _ in range(count)]
+    loads = [0] * count
+    for piece in sorted(pieces, key=lambda p: (-sum(costs[i] for i in p), p[0])):
+        tokens = sum(costs[i] for i in piece)
+        fits = [b for b in range(len(bins)) if not bins[b] or (
+            loads[b] + tokens <= chunk_tokens and len(bins[b]) + len(piece) <= chunk_size)]
+        if not fits:
+            bins.append([])
+            loads.append(0)
+            fits = [len(bins) - 1]
+        target = min(fits, key=lambda b: (loads[b], b))
+        bins[target] += piece
+        loads[target] += tokens
+    return [sorted(b) for b in bins if b]
+
+
+def header(chunk: list[dict], tokens: int) -> dict:
+    categories, tags = set(), set()
+    for entry in chunk:
+        categories.update(_strings(entry.get("categories")) or [topic(entry)])
+        tags.update(_strings(entry.get("tags")))
+    return {"entry_count": len(chunk), "tokens": tokens, "categories": sorted(categories), "tags": sorted(tags)}
+
+
+def shared_chunks(memory_dir: str, snapshot: dict, chunk_size: int, chunk_tokens: int, threshold: float,
+                  yaml) -> dict:
+    """Return the shared chunk index for this memory content, writing the chunks if needed.
+
+    The index is {"key", "dir", "chunks": [{file, entry_count, tokens, categories, tags}],
+    "members": {"<source_file>:<id>": chunk position}}.
+    """
+    key = json.dumps([CHUNKS_VERSION, TOKENS_VERSION, snapshot["hash"], chunk_size, chunk_tokens, threshold])
+    key = hashlib.sha256(key.encode())
+    key = key.hexdigest()[:16]
+    root = chunks_root(memory_dir)
+    directory = os.path.join(root, key)
+    try:
+        with open(os.path.join(directory, "index.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass  # not built yet for this content
+
+    entries = [snapshot["entries"][i] for i in snapshot["active"]]
+    entries = [e for e in entries
+               if isinstance(e.get("confidence"), (int, float)) and e["confidence"] >= threshold]
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    tmp = f"{directory}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    index = {"key": key, "dir": f".shaktra/.index/chunks/{key}", "chunks": [], "members": {}}
+    costs = entry_costs(memory_dir, entries)
+    for number, positions in enumerate(cluster(entries, costs, chunk_size, chunk_tokens), 1):
+        filename = f"chunk-{number:03d}.yml"
+        chunk = [entries[p] for p in positions]
+        info = header(chunk, sum(costs[p] for p in positions))
+        with open(os.path.join(tmp, filename), "w") as f:
+            yaml.dump({"header": info, "entries": chunk}, f, Dumper=dumper,
+                      default_flow_style=False, sort_keys=False, allow_unicode=True)
+        index["chunks"].append({"file": filename, **info})
+        for entry in chunk:
+            index["members"][member_key(entry["_source_file"], entry.get("id"))] = number - 1
+    with open(os.path.join(tmp, "index.json"), "w") as f:
+        json.dump(index, f, separators=(",", ":"), default=str)
+    try:
+        os.rename(tmp, directory)
+    except OSError:  # another process published the same chunks first
+        shutil.rmtree(tmp, ignore_errors=True)
+    return index
+
+
+def referenced_keys(memory_dir: str) -> set[str] | None:
+    """Chunk set keys referenced by any story manifest, or None if a manifest cannot be read."""
+    stories = os.path.join(os.path.dirname(os.path.abspath(memory_dir)), "stories")
+    keys = set()
+    try:
+        with os.scandir(stories) as it:
+            story_dirs = [e.path for e in it if e.is_dir()]  # skips the <id>.yml story files
+    except OSError:
+        return keys
+    for story_dir in story_dirs:
+        path = os.path.join(story_dir, ".chunks", "manifest.yml")
+        try:
+            with open(path) as f:
+                key = next((line.split(":", 1)[1].strip().strip("'\"") for line in f
+                            if line.startswith("memory_chunks:")), None)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        except OSError:
+            return None
+        if key is None:
+            return None  # unparseable manifest: keep every chunk set
+        keys.add(key)
+    return keys
+
+
+def collect_garbage(memory_dir: str, keep: str) -> list[str]:
+    """Delete chunk sets no manifest references (mark and sweep); return the deleted keys."""
+    root = chunks_root(memory_dir)
+    referenced = referenced_keys(memory_dir)
+    if referenced is None:
+        return []
+    cutoff = time.time() - GC_GRACE_SECONDS
+    deleted = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name == keep or name in referenced or name.endswith(".tmp"):
+            continue
+        try:
+            if os.stat(path).st_mtime > cutoff:
+                continue  # just built; its story may not have written the manifest yet
+        except OSError:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        deleted.append(name)
+    return deleted
+
+
+def write_manifest(story_dir, index: dict, candidates: list[dict], yaml) -> list[dict]:
+    """Write <story_dir>/.chunks/manifest.yml for the chunks holding candidates; return its chunk list."""
+    wanted: dict[int, list] = {}
+    for c in candidates:
+        position = index["members"].get(member_key(c["source_file"], c["id"]))
+        if position is not None:
+            wanted.setdefault(position, []).append(c["id"])
+    chunk_paths = []
+    for position in sorted(wanted):
+        chunk = index["chunks"][position]
+        chunk_paths.append({
+            "path": f"{index['dir']}/{chunk['file']}",
+            "entry_count": chunk["entry_count"],
+            "tokens": chunk["tokens"],
+            "candidate_count": len(wanted[position]),
+            "candidates": wanted[position],
+            "categories": chunk["categories"],
+            "tags": chunk["tags"],
+        })
+
+    chunks_dir = os.path.join(story_dir, ".chunks")
+    os.makedirs(chunks_dir, exist_ok=True)
+    for name in os.listdir(chunks_dir):  # per-story chunk copies from earlier versions
+        if name.startswith("chunk-") and name.endswith(".yml"):
+            os.unlink(os.path.join(chunks_dir, name))
+    manifest = {"memory_chunks": index["key"], "chunk_count": len(chunk_paths), "chunks": chunk_paths}
+    path = os.path.join(chunks_dir, "manifest.yml")
+    tmp = f"{path}.{os.getpid()}.tmp"  # atomic: collect_garbage reads manifests concurrently
+    with open(tmp, "w") as f:
+        yaml.dump(manifest, f, default_flow_style=False, sort_keys=False)
+    os.replace(tmp, path)
+    return chunk_paths
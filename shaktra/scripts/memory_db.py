@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Optional SQLite backend for the Shaktra memory stores.
+
+Usage: memory_db.py import <memory_dir>
+       memory_db.py export <memory_dir>
+       memory_db.py search <memory_dir> <query>
+
+Enabled with `memory.backend: sqlite` in settings.yml. Entries from
+principles.yml, anti-patterns.yml, and procedures.yml are kept in
+.shaktra/memory/memory.db with an FTS5 index over their text, guidance, and tags,
+so memory_retrieval.py ranks candidates with BM25 inside SQLite instead of
+loading every entry. Only the stdlib sqlite3 module is used.
+
+The YAML files stay the format agents and migrate_memory.py write. The database
+re-imports them whenever a store's size, mtime, or inode differs from the last
+import or export; `export` writes the database back out as YAML. Callers check
+fts5_available() first: a sqlite3 built without FTS5 cannot hold the index, and
+memory_retrieval.py then falls back to the YAML snapshot backend.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+import memory_snapshot
+from memory_index import TRIGGER_FLOOR
+from yaml_cache import decode, encode
+
+SCHEMA_VERSION = 1
+DB_NAME = "memory.db"
+BM25_WEIGHTS = (1.0, 1.0, 3.0)  # text, guidance, tags — tags weigh like memory_index FIELD_WEIGHTS
+TEXT_FIELDS = ("text", "failed_approach", "failure_mode", "recommended_approach")
+TAG_FIELDS = ("tags", "categories", "roles", "applies_to", "trigger_patterns")
+
+_fts5: bool | None = None
+
+SCHEMA = """
+DROP TABLE IF EXISTS entries;
+DROP TABLE IF EXISTS triggers;
+DROP TABLE IF EXISTS meta;
+DROP TABLE IF EXISTS entries_fts;
+CREATE TABLE entries (
+    rowid INTEGER PRIMARY KEY,
+    store TEXT NOT NULL,
+    id TEXT,
+    status TEXT NOT NULL,
+    confidence REAL,
+    doc BLOB NOT NULL
+);
+CREATE INDEX entries_status ON entries (status);
+CREATE TABLE triggers (entry INTEGER NOT NULL, pattern TEXT NOT NULL);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE VIRTUAL TABLE entries_fts USING fts5 (text, guidance, tags, tokenize = 'porter unicode61');
+"""
+
+
+def db_path(memory_dir: str) -> str:
+    return os.path.join(memory_dir, DB_NAME)
+
+
+def fts5_available() -> bool:
+    """True when this sqlite3 build has FTS5 (probed once per process)."""
+    global _fts5
+    if _fts5 is None:
+        try:
+            with closing(sqlite3.connect(":memory:")) as conn:
+                conn.execute("CREATE VIRTUAL TABLE probe USING fts5 (x)")
+            _fts5 = True
+        except sqlite3.Error:
+            _fts5 = False
+    return _fts5
+
+
+def connect(memory_dir: str) -> sqlite3.Connection:
+    """Open memory.db, creating (or recreating, on a schema change) its tables."""
+    conn = sqlite3.connect(db_path(memory_dir))
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.executescript(SCHEMA + f"PRAGMA user_version = {SCHEMA_VERSION};")
+    return conn
+
+
+def _text(value) -> str:
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value if v is not None)
+    return "" if value is None else str(value)
+
+
+def _meta(conn: sqlite3.Connection, key: str):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _set_meta(conn: sqlite3.Connection, key: str, value) -> None:
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+
+def import_stores(conn: sqlite3.Connection, memory_dir: str, import_yaml) -> int:
+    """Replace the database contents with the YAML stores; return the entry count."""
+    key = memory_snapshot.stores_key(memory_dir)
+    snapshot = memory_snapshot.load(memory_dir, import_yaml)
+    entries = snapshot["entries"]
+    with conn:
+        conn.execute("DELETE FROM entries")
+        conn.execute("DELETE FROM triggers")
+        conn.execute("DELETE FROM entries_fts")
+        conn.executemany(
+            "INSERT INTO entries (rowid, store, id, status, confidence, doc) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (i, e["_source_file"], str(e.get("id")), str(e.get("status", "active")),
+                 e.get("confidence") if isinstance(e.get("confidence"), (int, float)) else None,
+                 encode({k: v for k, v in e.items() if k != "_source_file"}))
+                for i, e in enumerate(entries, 1)
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO entries_fts (rowid, text, guidance, tags) VALUES (?, ?, ?, ?)",
+            [
+                (i, " ".join(_text(e.get(f)) for f in TEXT_FIELDS), _text(e.get("guidance")),
+                 " ".join(_text(e.get(f)) for f in TAG_FIELDS))
+                for i, e in enumerate(entries, 1)
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO triggers (entry, pattern) VALUES (?, ?)",
+            [
+                (i, str(t).lower())
+                for i, e in enumerate(entries, 1)
+                if e["_source_file"] == "anti-patterns.yml" and isinstance(e.get("trigger_patterns"), list)
+                for t in e["trigger_patterns"] if t
+            ],
+        )
+        # Record the stores only if they did not change while being imported
+        _set_meta(conn, "stores_key", key if memory_snapshot.stores_key(memory_dir) == key else None)
+        _set_meta(conn, "content_hash", snapshot["hash"])
+    return len(entries)
+
+
+def open_db(memory_dir: str, import_yaml) -> sqlite3.Connection:
+    """Connect and re-import the YAML stores if they changed since the last import or export."""
+    conn = connect(memory_dir)
+    if (_meta(conn, "stores_key") != memory_snapshot.stores_key(memory_dir)
+            or _meta(conn, "content_hash") is None):
+        import_stores(conn, memory_dir, import_yaml)
+    return conn
+
+
+def content_hash(conn: sqlite3.Connection) -> str | None:
+    """The memory snapshot content hash of the imported stores, the same cache key the YAML backend uses."""
+    return _meta(conn, "content_hash")
+
+
+def export_stores(conn: sqlite3.Connection, memory_dir: str, yaml) -> dict[str, int]:
+    """Write every store back to its YAML file, keeping each file's leading comments."""
+    written = {}
+    for filename, _ in memory_snapshot.STORES:
+        docs = [decode(doc) for (doc,) in
+                conn.execute("SELECT doc FROM entries WHERE store = ? ORDER BY rowid", (filename,))]
+        memory_snapshot.write_store(memory_dir, filename, docs, yaml, f"Exported from {DB_NAME}")
+        written[filename] = len(docs)
+    key = memory_snapshot.stores_key(memory_dir)
+    snapshot = memory_snapshot.load(memory_dir, lambda: yaml)  # the exported files hash differently
+    with conn:
+        _set_meta(conn, "stores_key", key if memory_snapshot.stores_key(memory_dir) == key else None)
+        _set_meta(conn, "content_hash", snapshot["hash"])
+    return written
+
+
+def counts(conn: sqlite3.Connection) -> dict[str, int]:
+    """Return entry counts by status."""
+    totals = dict.fromkeys(memory_snapshot.STATUSES, 0)
+    totals.update(conn.execute("SELECT status, count(*) FROM entries GROUP BY status"))
+    return totals
+
+
+def active_entries(conn: sqlite3.Connection) -> list[dict]:
+    """Active entries with their `_source_file`, in store order (the input of Tier 3 chunking)."""
+    return [{**decode(doc), "_source_file": store} for store, doc in
+            conn.execute("SELECT store, doc FROM entries WHERE status = 'active' ORDER BY rowid")]
+
+
+def match_query(terms) -> str:
+    """FTS5 query matching any of terms (already reduced to [a-z0-9]+ by memory_index.tokenize)."""
+    return " OR ".join(f'"{t}"' for t in sorted(terms))
+
+
+def shortlist(conn: sqlite3.Connection, terms: set[str] | None, text: str, threshold: float) -> list[dict]:
+    """BM25 counterpart of memory_index.shortlist(), with the same candidate shape and ranking rules.
+
+    relevance = 10 * bm25 / best bm25 among matches, anti-pattern triggers found in the
+    story text lift relevance to TRIGGER_FLOOR, score = relevance * confidence.
+    """
+    active = {rowid: (entry_id, store, confidence) for rowid, entry_id, store, confidence in
+              conn.execute("SELECT rowid, id, store, confidence FROM entries WHERE status = 'active'")}
+    if terms is None:
+        overlap = dict.fromkeys(active, 0.0)
+    elif terms:
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        overlap = {rowid: -rank for rowid, rank in conn.execute(
+            f"SELECT rowid, bm25(entries_fts, {weights}) FROM entries_fts WHERE entries_fts MATCH ?",
+            (match_query(terms),)) if rowid in active}
+    else:
+        overlap = {}
+    boosted = {entry for entry, pattern in conn.execute("SELECT entry, pattern FROM triggers")
+               if entry in active and pattern in text}
+    for rowid in boosted:
+        overlap.setdefault(rowid, 0.0)
+    best = max(overlap.values(), default=0.0) or 1.0
+
+    candidates = []
+    for rowid, raw in overlap.items():
+        entry_id, store, confidence = active[rowid]
+        if confidence is None or confidence < threshold:
+            continue
+        relevance = 10.0 * raw / best
+        if rowid in boosted:
+            relevance = max(relevance, TRIGGER_FLOOR)
+        candidates.append({
+            "id": entry_id,
+            "source_file": store,
+            "relevance": round(relevance, 2),
+            "confidence": confidence,
+            "score": round(relevance * confidence, 3),
+        })
+    candidates.sort(key=lambda c: (-c["score"], -c["confidence"], str(c["id"])))
+    return candidates
+
+
+def main():
+    import sys
+
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] not in ("import", "export", "search") or (args[0] == "search") != (len(args) > 2):
+        print("\n".join(__doc__.strip().splitlines()[2:5]), file=sys.stderr)
+        sys.exit(1)
+
+    def import_yaml():
+        try:
+            import yaml
+            return yaml
+        except ImportError:
+            print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
+            sys.exit(1)
+
+    command, memory_dir = args[0], args[1]
+    if not os.path.isdir(memory_dir):
+        print(f"Error: {memory_dir} not found", file=sys.stderr)
+        sys.exit(1)
+    if command == "import":
+        with closing(connect(memory_dir)) as conn:
+            result = {"imported": import_stores(conn, memory_dir, import_yaml), "counts": counts(conn)}
+    elif command == "export":
+        with closing(connect(memory_dir)) as conn:
+            if not conn.execute("SELECT 1 FROM meta WHERE key = 'stores_key'").fetchone():
+                print(f"Error: {db_path(memory_dir)} has never been imported; nothing to export", file=sys.stderr)
+                sys.exit(1)
+            result = {"exported": export_stores(conn, memory_dir, import_yaml())}
+    else:
+        import memory_index
+        with closing(open_db(memory_dir, import_yaml)) as conn:
+            query = " ".join(args[2:])
+            result = {"candidates": shortlist(conn, set(memory_index.tokenize(query)), query.lower(), 0.0)}
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
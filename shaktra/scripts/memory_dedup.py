@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Near-duplicate lookup for memory consolidation (MinHash + LSH).
+
+Usage: memory_dedup.py <memory_dir> <observations.yml>... [--min-similarity X]
+
+Builds MinHash signatures over the text, guidance, and tags of every active
+principle, anti-pattern, and procedure, and buckets them with locality-sensitive
+hashing. Each observation is then compared only with the entries that share a
+bucket with it, instead of with every entry, so the memory-curator evaluates a
+handful of likely pairs per observation (consolidation-guide.md, Steps 2 and 6).
+
+Each feature is hashed once with SHAKE-128, whose output supplies all NUM_PERM
+independent 32-bit hash values, so results are identical across runs and
+machines. The index is stored in .shaktra/.index/memory-lsh.bin and rebuilt only
+when the memory snapshot's content hash changes.
+
+Prints JSON: for each observation, the likely-matching entry IDs with their
+estimated Jaccard similarity. Consistency checks also list their principle_id.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import struct
+
+import memory_snapshot
+from memory_index import tokenize
+
+LSH_VERSION = 1
+NUM_PERM = 64
+BANDS, ROWS = 32, 2  # BANDS * ROWS == NUM_PERM; pairs above ~0.2 Jaccard likely share a bucket
+MIN_SIMILARITY = 0.25
+TEXT_FIELDS = ("text", "failed_approach", "failure_mode", "recommended_approach", "guidance",
+               "tags", "categories", "trigger_patterns")
+_HASHES = struct.Struct(f"<{NUM_PERM}I")
+
+
+def shingles(text) -> set[str]:
+    """Terms of text plus adjacent term pairs, so word order contributes a little."""
+    terms = tokenize(text)
+    return set(terms) | {f"{a} {b}" for a, b in zip(terms, terms[1:])}
+
+
+def signature(features: set[str]) -> list[int] | None:
+    """MinHash signature of a feature set, or None when the set is empty."""
+    if not features:
+        return None
+    rows = [_HASHES.unpack(hashlib.shake_128(f.encode()).digest(_HASHES.size)) for f in features]
+    return [min(column) for column in zip(*rows)]
+
+
+def bands(sig: list[int]) -> list[tuple]:
+    return [(band, *sig[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """Estimated Jaccard similarity: the fraction of agreeing MinHash slots."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def entry_text(entry: dict) -> list:
+    parts = []
+    for field in TEXT_FIELDS:
+        value = entry.get(field)
+        parts += value if isinstance(value, list) else [value]
+    return [str(p) for p in parts if p is not None]
+
+
+def build(snapshot: dict) -> dict:
+    """Return {"hash", "signatures": {idx: sig}, "buckets": {band key: [idx]}} for active entries."""
+    signatures, buckets = {}, {}
+    for idx in snapshot["active"]:
+        sig = signature(shingles(entry_text(snapshot["entries"][idx])))
+        if sig is None:
+            continue
+        signatures[idx] = sig
+        for key in bands(sig):
+            buckets.setdefault(key, []).append(idx)
+    return {"version": LSH_VERSION, "hash": snapshot["hash"], "signatures": signatures, "buckets": buckets}
+
+
+def load(memory_dir: str, snapshot: dict) -> dict:
+    """Return the LSH index for snapshot, rebuilding it when the memory content changed."""
+    path = os.path.join(os.path.dirname(memory_snapshot.snapshot_path(memory_dir)), "memory-lsh.bin")
+    try:
+        with open(path, "rb") as f:
+            index = marshal.load(f)
+        if index.get("version") == LSH_VERSION and index.get("hash") == snapshot["hash"]:
+            return index
+    except Exception:
+        pass  # missing, corrupt, or stale index — rebuild
+    index = build(snapshot)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump(index, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+    return index
+
+
+def matches(index: dict, snapshot: dict, text, min_similarity: float = MIN_SIMILARITY) -> list[dict]:
+    """Return [{id, source_file, similarity}] for entries likely to duplicate text, best first."""
+    sig = signature(shingles(text))
+    if sig is None:
+        return []
+    candidates = set()
+    for key in bands(sig):
+        candidates.update(index["buckets"].get(key, ()))
+    found = []
+    for idx in candidates:
+        score = similarity(sig, index["signatures"][idx])
+        if score >= min_similarity:
+            entry = snapshot["entries"][idx]
+            found.append({"id": entry.get("id"), "source_file": entry["_source_file"], "similarity": round(score, 3)})
+    found.sort(key=lambda m: (-m["similarity"], str(m["id"])))
+    return found
+
+
+def main():
+    import json
+    import sys
+
+    from yaml_cache import load_yaml
+
+    args, positional, min_similarity = sys.argv[1:], [], MIN_SIMILARITY
+    while args:
+        arg = args.pop(0)
+        if arg == "--min-similarity":
+            try:
+                min_similarity = float(args.pop(0))
+                if not 0.0 <= min_similarity <= 1.0:
+                    raise ValueError(min_similarity)
+            except (IndexError, ValueError):
+                print(__doc__.strip().splitlines()[2], file=sys.stderr)
+                sys.exit(1)
+        else:
+            positional.append(arg)
+    args = positional
+    if len(args) < 2:
+        print(__doc__.strip().splitlines()[2], file=sys.stderr)
+        sys.exit(1)
+
+    def import_yaml():
+        try:
+            import yaml
+            return yaml
+        except ImportError:
+            print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
+            sys.exit(1)
+
+    memory_dir = args[0]
+    snapshot = memory_snapshot.load(memory_dir, import_yaml)
+    index = load(memory_dir, snapshot)
+    results, pairs = [], 0
+    for path in args[1:]:
+        data = load_yaml(path, import_yaml) if os.path.exists(path) else None
+        observations = data.get("observations") if isinstance(data, dict) else None
+        for obs in observations if isinstance(observations, list) else []:
+            if not isinstance(obs, dict):
+                continue
+            tags = obs.get("tags") if isinstance(obs.get("tags"), list) else []
+            found = matches(index, snapshot, [obs.get("text"), *tags], min_similarity)
+            pairs += len(found)
+            results.append({"file": path, "id": obs.get("id"), "type": obs.get("type"),
+                            "principle_id": obs.get("principle_id"), "matches": found})
+    print(json.dumps({
+        "entries_indexed": len(index["signatures"]),
+        "observations": len(results),
+        "pairs": pairs,
+        "results": results,
+    }, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
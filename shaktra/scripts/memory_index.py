@@ -0,0 +1,149 @@
+"""Inverted index over the Shaktra memory stores.
+
+Maps terms from each active entry's tags, categories, roles, applies_to,
+trigger_patterns, and tokenized text/guidance to the entries that contain them.
+memory_retrieval.py uses it to shortlist the entries that can matter for a story
+before any agent scores them, so briefing cost follows the shortlist instead of
+the store size.
+
+The index is built by memory_snapshot.py and stored inside the compiled memory
+snapshot, so it is rebuilt only when a store changes.
+
+Scoring is deterministic (retrieval-guide.md, Steps 2-3, with lexical relevance):
+  relevance  = 10 * overlap / best overlap among candidates, where overlap sums
+               idf(term) * field weight over the story terms the entry contains
+  boost      = anti-patterns whose trigger_patterns occur in the story text get
+               relevance = max(relevance, 8)
+  score      = relevance * confidence; entries below the confidence threshold
+               or with no overlap and no trigger match are not candidates
+"""
+
+from __future__ import annotations
+
+import math
+import re
+
+FIELD_WEIGHTS = {
+    "tags": 3.0,
+    "trigger_patterns": 3.0,
+    "categories": 2.0,
+    "roles": 1.0,
+    "applies_to": 1.0,
+    "text": 1.0,
+    "guidance": 1.0,
+    "failed_approach": 1.0,
+    "failure_mode": 1.0,
+    "recommended_approach": 1.0,
+}
+TRIGGER_FLOOR = 8.0
+STOPWORDS = frozenset(
+    "the and for with that this from into when then than are was were been have has not "
+    "but all any each its our their your use using used should must will can may also "
+    "only over under via per more most less new given".split()
+)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def stem(word: str) -> str:
+    """Cheap plural folding so `retries`/`retry` and `caches`/`cache` share a term."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text) -> list[str]:
+    """Lowercase word terms of text (strings, or lists of strings), minus stopwords."""
+    if isinstance(text, list):
+        return [t for item in text for t in tokenize(item)]
+    if not isinstance(text, str):
+        return []
+    return [stem(w) for w in _TOKEN_RE.findall(text.lower()) if len(w) > 2 and w not in STOPWORDS]
+
+
+def build(entries: list) -> dict:
+    """Return {"active", "postings", "triggers"} over the active entries of a snapshot.
+
+    Postings map term -> [[entry position, field weight], ...]; triggers map the
+    position of each anti-pattern with trigger_patterns to its lowercased triggers.
+    """
+    active, postings, triggers = [], {}, {}
+    for idx, item in enumerate(entries):
+        if item.get("status", "active") != "active":
+            continue
+        active.append(idx)
+        patterns = item.get("trigger_patterns")
+        if item["_source_file"] == "anti-patterns.yml" and isinstance(patterns, list) and patterns:
+            triggers[idx] = [str(t).lower() for t in patterns]
+        weights: dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(item.get(field)):
+                if weights.get(term, 0) < weight:
+                    weights[term] = weight
+        for term, weight in weights.items():
+            postings.setdefault(term, []).append([idx, weight])
+    return {"active": active, "postings": postings, "triggers": triggers}
+
+
+def story_terms(story: dict) -> tuple[set[str], str]:
+    """Return (terms, lowercased text) from a story's title, description, scope, criteria, and files."""
+    parts = [story.get(f) for f in ("title", "description", "scope", "tags", "keywords")]
+    for ac in story.get("acceptance_criteria") or []:
+        if isinstance(ac, dict):
+            parts += [ac.get("given"), ac.get("when"), ac.get("then")]
+    files = story.get("files")
+    if isinstance(files, list):
+        parts += [str(f).replace("/", " ").replace("_", " ") for f in files]
+    texts = []
+    for part in parts:
+        if isinstance(part, list):
+            texts += [str(p) for p in part]
+        elif part is not None:
+            texts.append(str(part))
+    text = " ".join(texts).lower()
+    return set(tokenize(text)), text
+
+
+def shortlist(snapshot: dict, terms: set[str] | None, text: str, threshold: float) -> list[dict]:
+    """Return ranked candidates [{id, source_file, relevance, confidence, score}] for a story.
+
+    terms=None (no story found) makes every active entry above the threshold a candidate.
+    """
+    entries = snapshot["entries"]
+    postings = snapshot["postings"]
+    triggers = snapshot["triggers"]
+    total = len(snapshot["active"]) or 1
+    overlap: dict[int, float] = {}
+    if terms is None:  # no story to match: every entry is a candidate, ranked by confidence
+        overlap = dict.fromkeys(snapshot["active"], 0.0)
+    for term in terms or ():
+        posting = postings.get(term)
+        if not posting:
+            continue
+        idf = math.log(1 + total / len(posting))
+        for idx, weight in posting:
+            overlap[idx] = overlap.get(idx, 0.0) + idf * weight
+    boosted = {idx for idx, patterns in triggers.items() if any(t and t in text for t in patterns)}
+    for idx in boosted:
+        overlap.setdefault(idx, 0.0)
+    best = max(overlap.values(), default=0.0) or 1.0
+
+    candidates = []
+    for idx, raw in overlap.items():
+        entry = entries[idx]
+        confidence = entry.get("confidence", 0)
+        if not isinstance(confidence, (int, float)) or confidence < threshold:
+            continue
+        relevance = 10.0 * raw / best
+        if idx in boosted:
+            relevance = max(relevance, TRIGGER_FLOOR)
+        candidates.append({
+            "id": entry.get("id"),
+            "source_file": entry["_source_file"],
+            "relevance": round(relevance, 2),
+            "confidence": confidence,
+            "score": round(relevance * confidence, 3),
+        })
+    candidates.sort(key=lambda c: (-c["score"], -c["confidence"], str(c["id"])))
+    return candidates
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Apply consistency-check observations to the memory stores in one batch.
+
+Usage: memory_lifecycle.py [PROJECT_DIR] [--story ID | --observations FILE...]
+                           [--today YYYY-MM-DD] [--dry-run]
+
+Implements consolidation-guide.md Steps 3 and 7 for a whole batch:
+  1. Collect every unapplied consistency-check observation (principle_id +
+     relationship) from the story being consolidated (--story ID, default the
+     active story: .shaktra/stories/<ID>/.observations.yml) or the given files.
+     Workflow-level files (.shaktra/observations/) are skipped: no briefing
+     exists to validate against.
+  2. Sum the reinforce/weaken/contradict deltas per entry (settings.memory.*) and
+     apply each entry's net delta once, clamped to [0.0, 1.0]. Summing first makes
+     the result independent of observation order. Reinforcements from incident
+     workflows are scaled by settings.incident.incident_confidence_multiplier; the
+     workflow type is the observation's `workflow_type`, else its file's top-level
+     `workflow_type`, else `incident` for files under .shaktra/incidents/.
+  3. Archive active entries below confidence_archive.
+  4. Enforce max_principles / max_anti_patterns / max_procedures by archiving the
+     weakest active entries (lowest confidence, then oldest last_reinforced) first.
+  5. Rewrite each changed store once, atomically, then mark the applied observations
+     with `applied: <date>` so a later run does not count them again.
+
+--dry-run prints the same report without writing anything.
+Prints a JSON report. Exit 0 = success, Exit 1 = usage or input error.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import sys
+from datetime import date
+
+try:
+    import yaml
+except ImportError:
+    print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
+    sys.exit(1)
+
+import story_index
+from memory_snapshot import STORES, write_store, write_yaml
+from yaml_cache import load_yaml
+
+DEFAULTS = {
+    "confidence_reinforce": 0.08,
+    "confidence_weaken": 0.08,
+    "confidence_contradict": 0.20,
+    "confidence_archive": 0.2,
+    "max_principles": 200,
+    "max_anti_patterns": 100,
+    "max_procedures": 50,
+}
+CAPS = {"principles.yml": "max_principles", "anti-patterns.yml": "max_anti_patterns",
+        "procedures.yml": "max_procedures"}
+RELATIONSHIPS = {"reinforce": "confidence_reinforce", "weaken": "confidence_weaken",
+                 "contradict": "confidence_contradict"}
+SIGNS = {"reinforce": 1, "weaken": -1, "contradict": -1}
+
+
+def read_settings(project: str) -> tuple[dict, float]:
+    """Return (memory settings with defaults, incident confidence multiplier)."""
+    path = os.path.join(project, ".shaktra", "settings.yml")
+    data = load_yaml(path, lambda: yaml) if os.path.exists(path) else {}
+    data = data if isinstance(data, dict) else {}
+    memory = data.get("memory") or {}
+    incident = data.get("incident") or {}
+    return {k: memory.get(k, v) for k, v in DEFAULTS.items()}, incident.get("incident_confidence_multiplier", 1.5)
+
+
+def story_observations(project: str, story_id: str | None) -> list[str] | None:
+    """The observation file of the named story, or of the active story; None when there is no story."""
+    if story_id is None:
+        entry = story_index.find_active(project, lambda: yaml)
+        story_id = entry["story_id"] if entry else None
+    if story_id is None:
+        return None
+    path = os.path.join(project, ".shaktra", "stories", story_id, ".observations.yml")
+    return [path] if os.path.exists(path) else []
+
+
+def collect(project: str, files: list[str]) -> tuple[dict, list, list]:
+    """Return ({path: document}, [(path, observation, workflow_type)], skipped workflow-level files)."""
+    docs, checks, skipped = {}, [], []
+    workflow_dir = os.path.join(project, ".shaktra", "observations") + os.sep
+    incidents_dir = os.path.join(project, ".shaktra", "incidents") + os.sep
+    for path in files:
+        if path.startswith(workflow_dir):
+            skipped.append(os.path.relpath(path, project))
+            continue
+        data = load_yaml(path, lambda: yaml) if os.path.exists(path) else None
+        observations = data.get("observations") if isinstance(data, dict) else None
+        if not isinstance(observations, list):
+            continue
+        docs[path] = data
+        default_type = data.get("workflow_type") or ("incident" if path.startswith(incidents_dir) else None)
+        for obs in observations:
+            if (isinstance(obs, dict) and obs.get("type") == "consistency-check" and not obs.get("applied")
+                    and obs.get("principle_id") and obs.get("relationship") in RELATIONSHIPS):
+                checks.append((path, obs, obs.get("workflow_type") or default_type))
+    return docs, checks, skipped
+
+
+def _is_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _weakest_key(entry: dict) -> tuple:
+    confidence = entry.get("confidence")
+    confidence = confidence if isinstance(confidence, (int, float)) else 0.0
+    return confidence, str(entry.get("last_reinforced") or entry.get("created") or ""), str(entry.get("id"))
+
+
+def run(project: str, files: list[str], today: date, dry_run: bool) -> dict:
+    settings, multiplier = read_settings(project)
+    memory_dir = os.path.join(project, ".shaktra", "memory")
+    docs, checks, skipped = collect(project, files)
+
+    stores, by_id = {}, {}
+    for filename, key in STORES:
+        path = os.path.join(memory_dir, filename)
+        data = load_yaml(path, lambda: yaml) if os.path.exists(path) else None
+        items = data.get(key) if isinstance(data, dict) else None
+        stores[filename] = items if isinstance(items, list) else []
+        for item in stores[filename]:
+            if isinstance(item, dict) and item.get("id") is not None:
+                by_id[str(item["id"])] = (filename, item)
+
+    # Net delta per entry, then one update per entry
+    deltas: dict[str, float] = {}
+    reinforced: dict[str, int] = {}
+    unknown, applied = [], []
+    for path, obs, workflow_type in checks:
+        entry_id = str(obs["principle_id"])
+        if entry_id not in by_id:
+            unknown.append({"file": os.path.relpath(path, project), "id": obs.get("id"), "principle_id": entry_id})
+            continue
+        relationship = obs["relationship"]
+        step = SIGNS[relationship] * settings[RELATIONSHIPS[relationship]]
+        if relationship == "reinforce" and workflow_type == "incident":
+            step *= multiplier
+        deltas[entry_id] = deltas.get(entry_id, 0.0) + step
+        if relationship == "reinforce":
+            reinforced[entry_id] = reinforced.get(entry_id, 0) + 1
+        applied.append((path, obs))
+
+    changed, updated, archived = set(), [], []
+    for entry_id, delta in sorted(deltas.items()):
+        filename, item = by_id[entry_id]
+        before = item.get("confidence") if isinstance(item.get("confidence"), (int, float)) else 0.0
+        after = round(min(1.0, max(0.0, before + delta)), 4)
+        item["confidence"] = after
+        if reinforced.get(entry_id):
+            item["source_count"] = int(item.get("source_count") or 0) + reinforced[entry_id]
+            item["last_reinforced"] = today
+        updated.append({"id": entry_id, "store": filename, "from": before, "to": after, "delta": round(delta, 4)})
+        changed.add(filename)
+
+    for filename, items in stores.items():
+        active = [i for i in items if isinstance(i, dict) and i.get("status", "active") == "active"]
+        keep = []
+        for item in active:
+            if _weakest_key(item)[0] < settings["confidence_archive"]:
+                item["status"] = "archived"
+                archived.append({"id": item.get("id"), "store": filename, "reason": "below-threshold"})
+                changed.add(filename)
+            else:
+                keep.append(item)
+        excess = len(keep) - int(settings[CAPS[filename]])
+        if excess > 0:
+            for item in heapq.nsmallest(excess, keep, key=_weakest_key):
+                item["status"] = "archived"
+                archived.append({"id": item.get("id"), "store": filename, "reason": "cap"})
+            changed.add(filename)
+
+    if not dry_run:
+        for filename in sorted(changed):
+            write_store(memory_dir, filename, stores[filename], yaml, "Written by memory_lifecycle.py")
+        for _, obs in applied:
+            obs["applied"] = today
+        for path in sorted({p for p, _ in applied}):
+            write_yaml(path, docs[path], yaml, "Observations")
+
+    return {
+        "dry_run": dry_run,
+        "observation_files": [os.path.relpath(p, project) for p in files],
+        "skipped_workflow_level": skipped,
+        "consistency_checks": len(checks),
+        "applied": len(applied),
+        "unknown": unknown,
+        "updated": updated,
+        "archived": archived,
+        "stores_written": [] if dry_run else sorted(changed),
+    }
+
+
+def main():
+    project, files, story_id, today, dry_run = None, None, None, date.today(), False
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        if arg == "--dry-run":
+            dry_run = True
+        elif arg == "--story" and args:
+            story_id = args.pop(0)
+        elif arg == "--today" and args and _is_date(args[0]):
+            today = date.fromisoformat(args.pop(0))
+        elif arg == "--observations":
+            files = []
+            while args and not args[0].startswith("--"):
+                files.append(os.path.abspath(args.pop(0)))
+        elif not arg.startswith("-") and project is None:
+            project = arg
+        else:
+            print("\n".join(__doc__.strip().splitlines()[2:4]), file=sys.stderr)
+            sys.exit(1)
+    project = os.path.abspath(project or os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+    if not os.path.isdir(os.path.join(project, ".shaktra", "memory")):
+        print(f"Error: {project}/.shaktra/memory not found", file=sys.stderr)
+        sys.exit(1)
+
+    if files is None:
+        files = story_observations(project, story_id)
+    if files is None:
+        print("Error: no active story; name it with --story ID or pass --observations FILE...", file=sys.stderr)
+        sys.exit(1)
+    report = run(project, files, today, dry_run)
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,20 @@
 #!/usr/bin/env python3
-"""Determine memory retrieval tier and prepare chunks for Tier 3 retrieval."""
+"""Shortlist memory entries for a story, pick the retrieval tier, and prepare Tier 3 chunks.
+
+The tier follows the number of candidates memory_index.py shortlists for the
+story, not the size of the memory stores. The stores are read through the
+compiled snapshot (memory_snapshot.py), so they are parsed at most once, or,
+with `memory.backend: sqlite`, ranked with BM25 in memory.db (memory_db.py)
+without loading the snapshot. When sqlite3 lacks FTS5 or memory.db cannot be
+opened, the snapshot backend is used instead (`backend_fallback` says why).
+Tier 3 references shared topic-clustered chunks (memory_chunks.py) instead of
+writing copies of the entries per story. When the story, the memory stores, and
+these settings are unchanged since .briefing.yml was generated, the tier is
+"cached" (briefing_cache.py) and the existing briefing is reused.
+"""
 
 import json
+import sqlite3
 import sys
 from pathlib import Path
 
@@ -11,22 +24,10 @@ except ImportError:
     print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
     sys.exit(1)
 
-
-def count_active_entries(memory_dir):
-    """Count total active entries across all memory stores."""
-    total = 0
-    for filename in ("principles.yml", "anti-patterns.yml", "procedures.yml"):
-        path = memory_dir / filename
-        if not path.exists():
-            continue
-        with open(path) as f:
-            data = yaml.safe_load(f) or {}
-        # Each file uses its own top-level key
-        for key in data:
-            entries = data[key]
-            if isinstance(entries, list):
-                total += sum(1 for e in entries if e.get("status", "active") == "active")
-    return total
+import briefing_cache
+import memory_index
+import memory_snapshot
+from yaml_cache import load_yaml
 
 
 def read_settings(settings_path):
@@ -35,62 +36,45 @@ def read_settings(settings_path):
         "retrieval_tier1_max": 100,
         "retrieval_tier2_max": 500,
         "retrieval_chunk_size": 150,
+        "retrieval_chunk_tokens": 20000,
+        "briefing_confidence_threshold": 0.4,
+        "max_briefing_entries": 15,
+        "backend": "yaml",
     }
     if not Path(settings_path).exists():
         return defaults
-    with open(settings_path) as f:
-        data = yaml.safe_load(f) or {}
+    data = load_yaml(settings_path, lambda: yaml) or {}
     memory = data.get("memory", {})
     return {k: memory.get(k, v) for k, v in defaults.items()}
 
 
-def collect_all_entries(memory_dir):
-    """Collect all active entries from all memory stores."""
-    entries = []
-    for filename, key_hint in [("principles.yml", "principles"),
-                                ("anti-patterns.yml", "anti_patterns"),
-                                ("procedures.yml", "procedures")]:
-        path = memory_dir / filename
-        if not path.exists():
-            continue
-        with open(path) as f:
-            data = yaml.safe_load(f) or {}
-        for key in data:
-            items = data[key]
-            if isinstance(items, list):
-                for item in items:
-                    if item.get("status", "active") == "active":
-                        item["_source_file"] = filename
-                        entries.append(item)
-    return entries
-
-
-def write_chunks(story_dir, entries, chunk_size):
-    """Split entries into chunks and write manifest for Tier 3."""
-    chunks_dir = Path(story_dir) / ".chunks"
-    chunks_dir.mkdir(parents=True, exist_ok=True)
-
-    chunk_paths = []
-    for i in range(0, len(entries), chunk_size):
-        chunk_num = (i // chunk_size) + 1
-        chunk_entries = entries[i:i + chunk_size]
-        chunk_filename = f"chunk-{chunk_num:03d}.yml"
-        chunk_path = chunks_dir / chunk_filename
-
-        with open(chunk_path, "w") as f:
-            yaml.dump({"entries": chunk_entries}, f, default_flow_style=False, sort_keys=False)
-
-        chunk_paths.append({
-            "path": f".chunks/{chunk_filename}",
-            "entry_count": len(chunk_entries),
-        })
-
-    # Write manifest
-    manifest = {"chunk_count": len(chunk_paths), "chunks": chunk_paths}
-    with open(chunks_dir / "manifest.yml", "w") as f:
-        yaml.dump(manifest, f, default_flow_style=False, sort_keys=False)
-
-    return chunk_paths
+def read_story(story_dir):
+    """Return the story mapping for .shaktra/stories/<id> (read from <id>.yml), or None."""
+    path = story_dir.parent / f"{story_dir.name}.yml"
+    if not path.exists():
+        return None
+    data = load_yaml(path, lambda: yaml)
+    return data if isinstance(data, dict) else None
+
+
+def open_backend(memory_dir, settings):
+    """Return (sqlite connection or None, snapshot or None, memory hash, active total, fallback reason)."""
+    fallback = None
+    if settings["backend"] == "sqlite":
+        import memory_db
+        if memory_db.fts5_available():
+            conn = None
+            try:
+                conn = memory_db.open_db(str(memory_dir), lambda: yaml)
+                return conn, None, memory_db.content_hash(conn), memory_db.counts(conn)["active"], None
+            except sqlite3.Error as e:
+                if conn is not None:
+                    conn.close()
+                fallback = f"memory.db unavailable: {e}"
+        else:
+            fallback = "sqlite3 was built without FTS5"
+    snapshot = memory_snapshot.load(str(memory_dir), lambda: yaml)
+    return None, snapshot, snapshot["hash"], snapshot["counts"]["active"], fallback
 
 
 def main():
@@ -103,21 +87,68 @@ def main():
     memory_dir = story_dir.parents[1] / "memory"  # .shaktra/stories/<id> → .shaktra/memory
 
     settings = read_settings(settings_path)
-    total = count_active_entries(memory_dir)
+    conn, snapshot, memory_hash, total, fallback = open_backend(memory_dir, settings)
+    try:
+        result, key, reason = retrieve(story_dir, memory_dir, settings, conn, snapshot, memory_hash, total)
+    finally:
+        if conn is not None:
+            conn.close()
+    if fallback:
+        result["backend_fallback"] = fallback
+    if result["tier"] != "cached":
+        briefing_cache.record(story_dir, key, reason, result["tier"], result["candidate_count"])
+    print(json.dumps(result))
 
-    if total <= settings["retrieval_tier1_max"]:
+
+def retrieve(story_dir, memory_dir, settings, conn, snapshot, memory_hash, total):
+    """Return (result, briefing cache key, cache miss reason) using the open backend."""
+    key = briefing_cache.inputs_key(story_dir, memory_hash, settings)
+    record, reason = briefing_cache.check(story_dir, key)
+    if reason is None:
+        return {
+            "tier": "cached",
+            "total_entries": total,
+            "candidate_count": record.get("candidate_count"),
+            "briefing": str(story_dir / ".briefing.yml"),
+            "chunks": [],
+        }, key, reason
+
+    story = read_story(story_dir)
+    terms, text = memory_index.story_terms(story) if story else (None, "")
+    threshold = settings["briefing_confidence_threshold"]
+    if conn is not None:
+        import memory_db
+        candidates = memory_db.shortlist(conn, terms, text, threshold)
+    else:
+        candidates = memory_index.shortlist(snapshot, terms, text, threshold)
+    count = len(candidates)
+
+    if count <= settings["retrieval_tier1_max"]:
         tier = 1
         chunks = []
-    elif total <= settings["retrieval_tier2_max"]:
+    elif count <= settings["retrieval_tier2_max"]:
         tier = 2
         chunks = []
     else:
         tier = 3
-        all_entries = collect_all_entries(memory_dir)
-        chunks = write_chunks(story_dir, all_entries, settings["retrieval_chunk_size"])
-
-    result = {"tier": tier, "total_entries": total, "chunks": chunks}
-    print(json.dumps(result))
+        import memory_chunks
+        if snapshot is None:  # sqlite: chunk the database's active entries, not the YAML stores
+            import memory_db
+            entries = memory_db.active_entries(conn)
+            snapshot = {"hash": memory_hash, "entries": entries, "active": range(len(entries))}
+        index = memory_chunks.shared_chunks(str(memory_dir), snapshot, settings["retrieval_chunk_size"],
+                                            settings["retrieval_chunk_tokens"], threshold, yaml)
+        chunks = memory_chunks.write_manifest(story_dir, index, candidates, yaml)
+        memory_chunks.collect_garbage(str(memory_dir), index["key"])
+
+    return {
+        "tier": tier,
+        "total_entries": total,
+        "candidate_count": count,
+        "candidates": candidates,
+        "chunks": chunks,
+        "cache_miss": reason,
+    }, key, reason
 
 
 if __name__ == "__main__":
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Compiled snapshot of the Shaktra memory stores.
+
+Usage: memory_snapshot.py <memory_dir> [settings_path]
+
+Parses principles.yml, anti-patterns.yml, and procedures.yml once into a single
+snapshot: every entry as a compact record tagged with its source file, per-store
+and total counts by status, a content hash over the store files, and the
+inverted index from memory_index.py. The snapshot lives in
+.shaktra/.index/memory-snapshot.bin and is recompiled only when a store's size,
+mtime, or inode changes, so tier selection, chunking, and memory-stats read the
+stores with one load instead of re-parsing the YAML.
+
+Run as a script, prints the memory-stats audit (counts, strongest, near-archive,
+recent, and high-severity anti-pattern entries) as JSON.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+
+import memory_index
+from yaml_cache import decode, encode, load_yaml
+
+SNAPSHOT_VERSION = 1
+STORES = (
+    ("principles.yml", "principles"),
+    ("anti-patterns.yml", "anti_patterns"),
+    ("procedures.yml", "procedures"),
+)
+STATUSES = ("active", "archived", "superseded")
+NEAR_ARCHIVE_MARGIN = 0.15
+AUDIT_TOP = 5
+
+_memo: dict[str, tuple] = {}
+
+
+def snapshot_path(memory_dir: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(memory_dir)), ".index", "memory-snapshot.bin")
+
+
+def stores_key(memory_dir: str) -> list:
+    """Identify the current version of every store by (name, size, mtime_ns, inode)."""
+    key = [SNAPSHOT_VERSION]
+    for filename, _ in STORES:
+        try:
+            st = os.stat(os.path.join(memory_dir, filename))
+            key.append([filename, st.st_size, st.st_mtime_ns, st.st_ino])
+        except OSError:
+            key.append([filename, None])
+    return key
+
+
+def compile_snapshot(memory_dir: str, import_yaml) -> dict:
+    """Parse every store once and return the snapshot (without its stat key)."""
+    digest = hashlib.sha256()
+    entries, stores = [], {}
+    totals = dict.fromkeys(STATUSES, 0)
+    for filename, key in STORES:
+        counts = dict.fromkeys(STATUSES, 0)
+        stores[filename] = counts
+        path = os.path.join(memory_dir, filename)
+        try:
+            with open(path, "rb") as f:
+                digest.update(f"{filename}\0".encode() + f.read() + b"\0")
+        except OSError:
+            continue
+        data = load_yaml(path, import_yaml) or {}
+        items = data.get(key) if isinstance(data, dict) else None
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
+                continue
+            status = str(item.get("status", "active"))
+            counts[status] = counts.get(status, 0) + 1
+            totals[status] = totals.get(status, 0) + 1
+            entries.append({**item, "_source_file": filename})
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "hash": digest.hexdigest(),
+        "stores": stores,
+        "counts": totals,
+        "entries": entries,
+    }
+    snapshot.update(memory_index.build(entries))
+    return snapshot
+
+
+def _save(path: str, key: list, blob: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump(key, f)
+            f.write(blob)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def load(memory_dir: str, import_yaml) -> dict:
+    """Return the snapshot for memory_dir, recompiling it if any store changed.
+
+    import_yaml() is called only when a store must be re-parsed.
+    """
+    memory_dir = os.path.abspath(memory_dir)
+    key = stores_key(memory_dir)
+    memo = _memo.get(memory_dir)
+    if memo and memo[0] == key:
+        return memo[1]
+    path = snapshot_path(memory_dir)
+    try:
+        with open(path, "rb") as f:
+            if marshal.load(f) == key:
+                snapshot = decode(f.read())
+                _memo[memory_dir] = (key, snapshot)
+                return snapshot
+    except Exception:
+        pass  # missing, corrupt, or stale snapshot — recompile
+    snapshot = compile_snapshot(memory_dir, import_yaml)
+    if stores_key(memory_dir) == key:  # stores did not change while being compiled
+        _save(path, key, encode(snapshot))
+        _memo[memory_dir] = (key, snapshot)
+    return snapshot
+
+
+def write_store(memory_dir: str, filename: str, items: list, yaml, default_header: str) -> None:
+    """Atomically rewrite one store with items, keeping the file's leading comment lines."""
+    write_yaml(os.path.join(memory_dir, filename), {dict(STORES)[filename]: items}, yaml, default_header)
+
+
+def write_yaml(path: str, data, yaml, default_header: str) -> None:
+    """Atomically rewrite a YAML file with SafeDumper, keeping the file's leading comment lines."""
+    header = []
+    try:
+        with open(path) as f:
+            for line in f:
+                if not line.startswith("#"):
+                    break
+                header.append(line)
+    except OSError:
+        header = [f"# {default_header}\n"]
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            f.writelines(header)
+            yaml.dump(data, f, Dumper=yaml.SafeDumper, default_flow_style=False, sort_keys=False,
+                      allow_unicode=True)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _confidence(entry: dict) -> float:
+    value = entry.get("confidence", 0)
+    return value if isinstance(value, (int, float)) else 0.0
+
+
+def _summary(entry: dict) -> dict:
+    return {
+        "id": entry.get("id"),
+        "source_file": entry["_source_file"],
+        "text": str(entry.get("text") or entry.get("failed_approach") or "")[:80],
+        "confidence": entry.get("confidence"),
+        "source_count": entry.get("source_count"),
+        "source": entry.get("source"),
+        "created": entry.get("created"),
+        "last_reinforced": entry.get("last_reinforced"),
+    }
+
+
+def audit(snapshot: dict, archive_threshold: float = 0.2) -> dict:
+    """Return the data behind the /shaktra:memory-stats full audit."""
+    active = [snapshot["entries"][i] for i in snapshot["active"]]
+    strongest = sorted(active, key=lambda e: (-_confidence(e), str(e.get("id"))))[:AUDIT_TOP]
+    near = [e for e in active if _confidence(e) < archive_threshold + NEAR_ARCHIVE_MARGIN]
+    recent = sorted(active, key=lambda e: (str(e.get("created", "")), str(e.get("id"))), reverse=True)
+    alerts = [
+        {"id": e.get("id"), "failed_approach": e.get("failed_approach"), "severity": e.get("severity"),
+         "trigger_patterns": e.get("trigger_patterns"), "recommended_approach": e.get("recommended_approach")}
+        for e in active
+        if e["_source_file"] == "anti-patterns.yml" and str(e.get("severity", "")).upper() in ("P0", "P1")
+    ]
+    return {
+        "hash": snapshot["hash"],
+        "stores": snapshot["stores"],
+        "counts": snapshot["counts"],
+        "strongest": [_summary(e) for e in strongest],
+        "near_archive": [_summary(e) for e in sorted(near, key=_confidence)],
+        "recent": [_summary(e) for e in recent[:AUDIT_TOP]],
+        "anti_pattern_alerts": alerts,
+    }
+
+
+def main():
+    import json
+    import sys
+
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[2], file=sys.stderr)
+        sys.exit(1)
+
+    def import_yaml():
+        try:
+            import yaml
+            return yaml
+        except ImportError:
+            print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
+            sys.exit(1)
+
+    memory_dir = sys.argv[1]
+    threshold = 0.2
+    if len(sys.argv) > 2 and os.path.exists(sys.argv[2]):
+        settings = load_yaml(sys.argv[2], import_yaml) or {}
+        threshold = (settings.get("memory") or {}).get("confidence_archive", threshold)
+    print(json.dumps(audit(load(memory_dir, import_yaml), threshold), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -114,6 +114,15 @@ def migrate(project_root):
     print(f"\nMigration complete: {len(principles)} principles written to {principles_path}")
     print(f"Backups: {decisions_path}.bak, {lessons_path}.bak")
 
+    # Keep the SQLite backend in step with the migrated stores
+    if (memory_dir / "memory.db").exists():
+        from contextlib import closing
+
+        import memory_db
+        with closing(memory_db.connect(str(memory_dir))) as conn:
+            count = memory_db.import_stores(conn, str(memory_dir), lambda: yaml)
+        print(f"Imported {count} entries into {memory_dir / 'memory.db'}")
+
 
 if __name__ == "__main__":
     project_root = sys.argv[1] if len(sys.argv) > 1 else "."
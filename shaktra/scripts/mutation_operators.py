@@ -0,0 +1,239 @@
+"""AST mutation operators for mutation_runner.py.
+
+Implements the eight operator families of mutation-strategy.md for Python
+source. A mutant is a single source-span replacement: the mutated node's text
+(located by its AST offsets) is replaced, the rest of the file is kept byte for
+byte, and the replacement is padded so the file keeps its line count. Every
+mutant is compiled; those that do not compile, or reproduce the original, are
+dropped.
+
+  arithmetic   + <-> -, * <-> /, % -> *, ** -> *, // -> *
+  relational   ==/!=, is/is not, in/not in swaps; ordering swaps not against a limit
+  logical      and <-> or, remove `not`
+  conditional  flip an if condition, empty an if body, remove an else body,
+               remove an early return
+  return       None, 0, "", [], {}, set(), or the negation, by the returned expression
+  exception    let the exception propagate (`except ()`), swallow it (`pass`),
+               remove a raise
+  boundary     < <-> <=, > <-> >= against a number or len(); 0 <-> 1, -1 -> -2,
+               len(x) -> len(x) - 1
+  deletion     remove a call statement or an assignment
+
+generate() honours the mutation selection heuristic: mutants in error paths
+(except handlers, raises, and guards that raise) come first, then conditionals,
+return values, boundaries, and the rest; families take turns so a capped
+function still gets a spread of operators.
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+
+FAMILIES = ("exception", "conditional", "logical", "relational", "return", "boundary", "arithmetic", "deletion")
+SEVERITY = {"arithmetic": "P2", "deletion": "P2"}  # every other surviving family is P1
+SECURITY_RE = re.compile(r"auth|permission|access|role|admin|login|passw|secret|token|credential|crypt|hash|"
+                         r"sign|verif|valid|saniti|escape|csrf|sql|query|shell|command", re.IGNORECASE)
+_ARITHMETIC = {ast.Add: ast.Sub, ast.Sub: ast.Add, ast.Mult: ast.Div, ast.Div: ast.Mult, ast.Mod: ast.Mult,
+               ast.Pow: ast.Mult, ast.FloorDiv: ast.Mult}
+_COMPARE = {ast.Eq: ast.NotEq, ast.NotEq: ast.Eq, ast.Is: ast.IsNot, ast.IsNot: ast.Is, ast.In: ast.NotIn,
+            ast.NotIn: ast.In, ast.Lt: ast.LtE, ast.LtE: ast.Lt, ast.Gt: ast.GtE, ast.GtE: ast.Gt}
+_ORDERING = (ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+
+
+def functions(tree: ast.AST) -> list[tuple[str, ast.AST]]:
+    """(qualified name, node) of every function and method, outermost first."""
+    found, stack = [], [(tree, "")]
+    while stack:
+        node, prefix = stack.pop()
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                name = f"{prefix}{child.name}"
+                if not isinstance(child, ast.ClassDef):
+                    found.append((name, child))
+                stack.append((child, f"{name}."))
+            else:
+                stack.append((child, prefix))
+    return sorted(found, key=lambda f: f[1].lineno)
+
+
+def find(tree: ast.AST, spec: str) -> list[tuple[str, ast.AST]]:
+    """Functions matching a qualified name, a bare name, or a START-END line range."""
+    span = re.fullmatch(r"(\d+)-(\d+)", spec)
+    if span:
+        start, end = int(span.group(1)), int(span.group(2))
+        return [(n, f) for n, f in functions(tree) if f.lineno <= end and f.end_lineno >= start]
+    return [(n, f) for n, f in functions(tree) if n == spec or n.endswith(f".{spec}")]
+
+
+def _is_limit(node: ast.AST) -> bool:
+    return (isinstance(node, ast.Constant) and type(node.value) in (int, float)) or (
+        isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "len")
+
+
+def _returned(value: ast.AST) -> str | None:
+    if isinstance(value, ast.Constant):
+        if value.value is None:
+            return None
+        if isinstance(value.value, bool):
+            return repr(not value.value)
+        return '""' if isinstance(value.value, str) else "None" if not isinstance(value.value, (int, float)) \
+            else "0" if value.value != 0 else "1"
+    if isinstance(value, (ast.Compare, ast.BoolOp)) or (isinstance(value, ast.UnaryOp) and
+                                                        isinstance(value.op, ast.Not)):
+        return f"not ({ast.unparse(value)})"
+    if isinstance(value, (ast.List, ast.ListComp, ast.Tuple)):
+        return "[]" if not isinstance(value, ast.Tuple) else "()"
+    if isinstance(value, (ast.Dict, ast.DictComp)):
+        return "{}"
+    if isinstance(value, (ast.Set, ast.SetComp)):
+        return "set()"
+    if isinstance(value, ast.JoinedStr):
+        return '""'
+    return "0" if isinstance(value, ast.BinOp) and not isinstance(value.op, ast.Add) else "None"
+
+
+def candidates(func: ast.AST) -> list[dict]:
+    """Every mutation of func's body as {"family", "nodes", "replacement", "what", "expression", "error_path"}."""
+    parents, skip = {}, set()
+    for node in ast.walk(func):
+        for child in ast.iter_child_nodes(node):
+            parents[child] = node
+        if isinstance(node, (ast.JoinedStr, ast.arg)) or node is getattr(func, "returns", None):
+            skip.update(id(n) for n in ast.walk(node))
+
+    def error_path(node) -> bool:
+        while node is not None and node is not func:
+            if isinstance(node, (ast.ExceptHandler, ast.Raise)) or (
+                    isinstance(node, ast.If) and any(isinstance(s, ast.Raise) for s in node.body)):
+                return True
+            node = parents.get(node)
+        return False
+
+    found = []
+
+    def add(family, target, replacement, what, expression=True):
+        nodes = target if isinstance(target, list) else [target]
+        found.append({"family": family, "nodes": nodes, "replacement": replacement, "what": what,
+                      "expression": expression, "error_path": error_path(nodes[0])})
+
+    last = func.body[-1]
+    for node in (n for stmt in func.body for n in ast.walk(stmt)):
+        if id(node) in skip:
+            continue
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+            add("arithmetic", node, ast.unparse(ast.BinOp(node.left, _ARITHMETIC[type(node.op)](), node.right)),
+                "swap arithmetic operator")
+            if isinstance(node.op, ast.Sub) and _is_limit(node.left) and isinstance(node.right, ast.Constant) \
+                    and node.right.value == 1:
+                add("boundary", node, ast.unparse(node.left), "drop `- 1`")
+        elif isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in _COMPARE:
+            family = "boundary" if isinstance(node.ops[0], _ORDERING) and (
+                _is_limit(node.comparators[0]) or _is_limit(node.left)) else "relational"
+            add(family, node, ast.unparse(ast.Compare(node.left, [_COMPARE[type(node.ops[0])]()], node.comparators)),
+                "swap comparison operator")
+        elif isinstance(node, ast.BoolOp):
+            add("logical", node, ast.unparse(ast.BoolOp(ast.Or() if isinstance(node.op, ast.And) else ast.And(),
+                                                        node.values)), "swap and/or")
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            add("logical", node, ast.unparse(node.operand), "remove `not`")
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) and isinstance(node.operand, ast.Constant) \
+                and node.operand.value == 1 and not isinstance(node.operand.value, bool):
+            add("boundary", node, "-2", "-1 -> -2")
+        elif isinstance(node, ast.Constant) and type(node.value) is int and node.value in (0, 1) \
+                and not isinstance(parents.get(node), ast.UnaryOp):
+            add("boundary", node, str(1 - node.value), f"{node.value} -> {1 - node.value}")
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "len" \
+                and not isinstance(parents.get(node), ast.BinOp):
+            add("boundary", node, f"{ast.unparse(node)} - 1", "len(x) -> len(x) - 1")
+        elif isinstance(node, ast.If):
+            add("conditional", node.test, f"not ({ast.unparse(node.test)})", "flip if condition")
+            add("conditional", node.body, "pass", "remove if body", expression=False)
+            if node.orelse and not (len(node.orelse) == 1 and isinstance(node.orelse[0], ast.If)):
+                add("conditional", node.orelse, "pass", "remove else body", expression=False)
+        elif isinstance(node, ast.Return):
+            if node is not last and isinstance(parents.get(node), ast.If):
+                add("conditional", node, "pass", "remove early return", expression=False)
+            alternative = _returned(node.value) if node.value is not None else None
+            if alternative is not None:
+                add("return", node.value, alternative, f"return {alternative}")
+        elif isinstance(node, ast.ExceptHandler):
+            if node.type is not None:
+                add("exception", node.type, "()", "let the exception propagate")
+            if not (len(node.body) == 1 and isinstance(node.body[0], ast.Pass)):
+                add("exception", node.body, "pass", "swallow the exception", expression=False)
+        elif isinstance(node, ast.Raise):
+            add("exception", node, "pass", "remove raise", expression=False)
+        elif (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)) or isinstance(
+                node, (ast.Assign, ast.AugAssign, ast.AnnAssign)) and getattr(node, "value", None) is not None:
+            add("deletion", node, "pass", "remove statement", expression=False)
+    return found
+
+
+def apply(source: bytes, line_starts: list[int], mutation: dict) -> tuple[bytes, int, int]:
+    """Splice one mutation into source; return (mutated source, first line, last line)."""
+    first, last = mutation["nodes"][0], mutation["nodes"][-1]
+    start = line_starts[first.lineno - 1] + first.col_offset
+    end = line_starts[last.end_lineno - 1] + last.end_col_offset
+    padding = "\n" * source.count(b"\n", start, end)
+    text = f"({mutation['replacement']}{padding})" if mutation["expression"] else f"{mutation['replacement']}{padding}"
+    return source[:start] + text.encode("utf-8") + source[end:], first.lineno, last.end_lineno
+
+
+def generate(path: str, source: bytes, specs: list[str], limit: int) -> tuple[list[dict], list[str]]:
+    """Mutants of the functions named by specs in one file, at most limit per function.
+
+    Returns (mutants, specs that matched no function). Each mutant carries its
+    mutated source plus the metadata mutation_runner.py reports.
+    """
+    tree = ast.parse(source, filename=path)
+    starts = [0]
+    for line in source.splitlines(keepends=True):
+        starts.append(starts[-1] + len(line))
+    text = source.decode("utf-8", errors="replace")
+    mutants, missing, seen_functions = [], [], set()
+    for spec in specs:
+        matched = find(tree, spec)
+        if not matched:
+            missing.append(spec)
+        for qualname, func in matched:
+            if qualname in seen_functions:
+                continue
+            seen_functions.add(qualname)
+            by_family: dict[str, list[dict]] = {}
+            for mutation in candidates(func):
+                by_family.setdefault(mutation["family"], []).append(mutation)
+            order = sorted(by_family, key=lambda f: (not any(m["error_path"] for m in by_family[f]),
+                                                     FAMILIES.index(f)))
+            queues = [sorted(by_family[f], key=lambda m: (not m["error_path"], m["nodes"][0].lineno)) for f in order]
+            chosen, seen_sources = [], {source}
+            while len(chosen) < limit and any(queues):
+                for queue in queues:
+                    while queue and len(chosen) < limit:
+                        mutation = queue.pop(0)
+                        mutated, first, last = apply(source, starts, mutation)
+                        if mutated in seen_sources:
+                            continue
+                        try:
+                            compile(mutated, path, "exec", dont_inherit=True)
+                        except (SyntaxError, ValueError):
+                            continue
+                        seen_sources.add(mutated)
+                        original = ast.get_source_segment(text, mutation["nodes"][0])
+                        security = bool(SECURITY_RE.search(qualname) or SECURITY_RE.search(original or ""))
+                        chosen.append({
+                            "file": path, "function": qualname, "operator": mutation["family"],
+                            "mutation": f"line {first}: {mutation['what']}: `{_clip(original)}` -> "
+                                        f"`{_clip(mutation['replacement'])}`",
+                            "lines": [first, last], "security_relevant": security,
+                            "severity": "P0" if security else SEVERITY.get(mutation["family"], "P1"),
+                            "source": mutated,
+                        })
+                        break
+            mutants += chosen
+    return mutants, missing
+
+
+def _clip(text: str | None, width: int = 60) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= width else text[:width - 3] + "..."
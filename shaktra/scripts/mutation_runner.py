@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Parallel mutation testing for the adversarial-review mutation probes.
+
+Usage: mutation_runner.py [PROJECT_DIR] --function FILE:NAME [--function ...] [--test-command CMD] [--coverage FILE] [--jobs N] [--timeout SECONDS] [--max-per-function N] [--isolation copy|worktree] [--output FILE]
+
+Generates AST mutants for the named Python functions (mutation_operators.py;
+NAME is a function, Class.method, or a START-END line range) and runs the test
+command against each one. The project is never modified: each worker owns an
+isolated sandbox — a copy of the project (virtualenv and node_modules
+directories are symlinked, .git is left out) or, with --isolation worktree, a
+detached `git worktree` of HEAD with the uncommitted changes and untracked
+(non-ignored) files copied over — writes one mutant at a time into it, runs the
+tests in a new process group, and restores the file before taking the next one.
+Bytecode writing is disabled so a same-size mutant is never served stale .pyc.
+
+With a coverage.py data file recorded with test contexts (--coverage, default
+PROJECT_DIR/.coverage when it has contexts; see coverage_map.py), each mutant
+runs only the tests covering its lines, appended to the command as pytest node
+IDs, and a mutant no test covers is recorded as `no_coverage` without running.
+Otherwise every mutant runs the full command. The selected tests first run once
+unmutated; a failing baseline aborts the run.
+
+Statuses: killed (tests failed), timeout (counted as killed, per
+mutation-strategy.md), survived, no_coverage (counted as survived), error
+(excluded). Defaults for --max-per-function, --timeout, and the kill threshold
+come from settings.yml `adversarial_review`; --test-command defaults to
+`python -m pytest -x -q -p no:cacheprovider`.
+
+Prints a JSON report whose `mutation_results` block matches the adversary's
+output format (--output also writes it to a file). Exit 0 = mutants ran,
+Exit 1 = usage error, no mutants, or failing baseline.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import shlex
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import analysis_git
+import coverage_map
+import mutation_operators
+from yaml_cache import load_yaml
+
+DEFAULT_COMMAND = f"{shlex.quote(sys.executable)} -m pytest -x -q -p no:cacheprovider"
+LINKED_DIRS = {".venv", "venv", "env", "node_modules"}  # shared read-only into sandboxes
+SKIPPED_DIRS = {".git", ".shaktra", "__pycache__", ".pytest_cache", ".mypy_cache", ".tox", ".nox"}
+OUTPUT_LINES = 15
+
+
+def run_tests(command: list[str], cwd: str, timeout: float) -> tuple[str, float, str]:
+    """Run command in cwd; return (killed | survived | timeout | error, seconds, output tail)."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    started = time.perf_counter()
+    try:
+        proc = subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                stdin=subprocess.DEVNULL, start_new_session=True, text=True, errors="replace")
+    except OSError as e:
+        return "error", 0.0, f"{type(e).__name__}: {e}"
+    try:
+        output, _ = proc.communicate(timeout=timeout)
+        status = "survived" if proc.returncode == 0 else "error" if proc.returncode == 5 else "killed"
+    except subprocess.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)  # the whole group: pytest workers, subprocesses
+        output, _ = proc.communicate()
+        status = "timeout"
+    tail = "\n".join((output or "").rstrip().splitlines()[-OUTPUT_LINES:])
+    return status, round(time.perf_counter() - started, 3), tail
+
+
+def copy_uncommitted(top: str, target: str) -> None:
+    """Bring a worktree of HEAD at target up to the working tree of top: modified and
+    untracked (non-ignored) files are copied, files deleted since HEAD are removed."""
+    changed = analysis_git.git(top, "diff", "HEAD", "--name-only", "--no-renames", "-z")
+    untracked = analysis_git.git(top, "ls-files", "--others", "--exclude-standard", "-z")
+    if changed is None or untracked is None:
+        raise RuntimeError("git diff failed")
+    for rel in {p for p in (changed + untracked).split("\0") if p}:
+        src, dst = os.path.join(top, rel), os.path.join(target, rel)
+        if os.path.lexists(src):
+            if os.path.isdir(src) and not os.path.islink(src):
+                continue  # submodule or nested repository
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            if os.path.lexists(dst):
+                os.unlink(dst)
+            shutil.copy2(src, dst, follow_symlinks=False)
+        elif os.path.lexists(dst) and not os.path.isdir(dst):
+            os.unlink(dst)
+
+
+def make_sandbox(project: str, root: str, index: int, isolation: str) -> str:
+    """Create one isolated project tree under root; return the project directory inside it."""
+    target = os.path.join(root, f"w{index}")
+    if isolation == "worktree":
+        top = (analysis_git.git(project, "rev-parse", "--show-toplevel") or "").strip()
+        if not top or analysis_git.git(top, "worktree", "add", "--detach", "--quiet", target, "HEAD") is None:
+            raise RuntimeError("git worktree add failed")
+        copy_uncommitted(top, target)
+        sandbox = os.path.join(target, os.path.relpath(project, top))
+    else:
+        shutil.copytree(project, target, symlinks=True,
+                        ignore=lambda d, names: [n for n in names if n in SKIPPED_DIRS or n in LINKED_DIRS
+                                                 or n.startswith(".coverage")])
+        sandbox = target
+    for name in LINKED_DIRS:
+        if os.path.isdir(os.path.join(project, name)) and not os.path.exists(os.path.join(sandbox, name)):
+            os.symlink(os.path.join(project, name), os.path.join(sandbox, name))
+    return sandbox
+
+
+def remove_sandboxes(project: str, root: str, isolation: str) -> None:
+    if isolation == "worktree":
+        for name in os.listdir(root):
+            analysis_git.git(project, "worktree", "remove", "--force", os.path.join(root, name))
+        analysis_git.git(project, "worktree", "prune")
+    shutil.rmtree(root, ignore_errors=True)
+
+
+def run(project: str, mutants: list[dict], originals: dict[str, bytes], command: list[str], cov, jobs: int,
+        timeout: float, isolation: str) -> str | None:
+    """Fill in each mutant's status; return the baseline failure output, if any."""
+    for mutant in mutants:
+        mutant["tests"] = sorted(coverage_map.tests_for(cov, mutant["file"], *mutant["lines"])) if cov else None
+        if cov is not None and not mutant["tests"]:
+            mutant.update(status="no_coverage", seconds=0.0, output="")
+    pending = [m for m in mutants if "status" not in m]
+    if not pending:
+        return None
+    root = tempfile.mkdtemp(prefix="shaktra-mutants-")
+    sandboxes: queue.Queue = queue.Queue()
+    try:
+        first = make_sandbox(project, root, 0, isolation)
+        baseline_tests = sorted({t for m in pending for t in m["tests"]}) if cov else []
+        status, _, output = run_tests(command + baseline_tests, first, timeout * 10)
+        if status != "survived":
+            return output
+        sandboxes.put(first)
+        for index in range(1, min(jobs, len(pending))):
+            sandboxes.put(make_sandbox(project, root, index, isolation))
+
+        def one(mutant: dict) -> None:
+            sandbox = sandboxes.get()
+            path = os.path.join(sandbox, mutant["file"])
+            try:
+                with open(path, "wb") as f:
+                    f.write(mutant["source"])
+                status, seconds, output = run_tests(command + (mutant["tests"] or []), sandbox, timeout)
+                mutant.update(status=status, seconds=seconds, output=output)
+            except OSError as e:
+                mutant.update(status="error", seconds=0.0, output=f"{type(e).__name__}: {e}")
+            finally:
+                with open(path, "wb") as f:
+                    f.write(originals[mutant["file"]])
+                with open(path, "rb") as f:
+                    restored = f.read() == originals[mutant["file"]]
+                sandboxes.put(sandbox)
+            if not restored:  # the next mutant in this sandbox would run against a corrupted tree
+                raise RuntimeError(f"could not restore {mutant['file']} in {sandbox}")
+
+        with ThreadPoolExecutor(max_workers=sandboxes.qsize()) as pool:
+            list(pool.map(one, pending))
+    finally:
+        remove_sandboxes(project, root, isolation)
+    return None
+
+
+def report(mutants: list[dict], threshold, **fields) -> dict:
+    counts = {s: sum(1 for m in mutants if m.get("status") == s)
+              for s in ("killed", "timeout", "survived", "no_coverage", "error")}
+    killed = counts["killed"] + counts["timeout"]
+    survived = counts["survived"] + counts["no_coverage"]
+    score = round(100 * killed / (killed + survived), 1) if killed + survived else None
+    def evidence(m: dict) -> str:
+        if m["status"] == "no_coverage":
+            return "no test covers the mutated lines"
+        ran = f"{len(m['tests'])} covering test(s)" if m["tests"] is not None else "full test command"
+        return f"{ran} passed: {m['output'].splitlines()[-1] if m['output'] else ''}"
+
+    surviving = [{"function": f"{m['file']}:{m['function']}", "mutation": m["mutation"], "operator": m["operator"],
+                  "severity": m["severity"], "security_relevant": m["security_relevant"], "evidence": evidence(m)}
+                 for m in mutants if m.get("status") in ("survived", "no_coverage")]
+    return {
+        "mutation_results": {"total": killed + survived, "killed": killed, "survived": survived,
+                             "surviving_mutations": surviving},
+        "mutation_score": score, "threshold": threshold,
+        "passed": None if score is None else score >= threshold,
+        "timeouts": counts["timeout"], "no_coverage": counts["no_coverage"], "errors": counts["error"], **fields,
+        "mutants": [{k: v for k, v in m.items() if k != "source"} for m in mutants],
+    }
+
+
+def _import_yaml():
+    try:
+        import yaml
+        return yaml
+    except ImportError:
+        print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    project, specs, options = None, [], {}
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        if arg == "--function" and args:
+            specs.append(args.pop(0))
+        elif arg in ("--test-command", "--coverage", "--output", "--isolation") and args:
+            options[arg] = args.pop(0)
+        elif arg in ("--jobs", "--timeout", "--max-per-function") and args and args[0].replace(".", "", 1).isdigit():
+            options[arg] = float(args.pop(0))
+        elif not arg.startswith("-") and project is None:
+            project = arg
+        else:
+            specs = []
+            break
+    isolation = options.get("--isolation", "copy")
+    if not specs or isolation not in ("copy", "worktree") or any(":" not in s for s in specs):
+        print(__doc__.strip().splitlines()[2], file=sys.stderr)
+        sys.exit(1)
+    project = os.path.realpath(project or os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+    settings_path = os.path.join(project, ".shaktra", "settings.yml")
+    settings = load_yaml(settings_path, _import_yaml) if os.path.exists(settings_path) else {}
+    review = (settings or {}).get("adversarial_review") if isinstance(settings, dict) else None
+    review = review if isinstance(review, dict) else {}
+    limit = int(options.get("--max-per-function") or review.get("max_mutations_per_function") or 5)
+    timeout = float(options.get("--timeout") or review.get("mutation_timeout") or 30)
+    jobs = max(1, int(options.get("--jobs") or os.cpu_count() or 1))
+
+    by_file: dict[str, list[str]] = {}
+    for spec in specs:
+        path, name = spec.rsplit(":", 1)
+        rel = os.path.relpath(os.path.realpath(os.path.join(project, path)), project).replace(os.sep, "/")
+        by_file.setdefault(rel, []).append(name)
+    mutants, originals, unsupported, unmatched = [], {}, [], []
+    for path, names in sorted(by_file.items()):
+        if not path.endswith(".py") or not os.path.isfile(os.path.join(project, path)):
+            unsupported.append(path)
+            continue
+        with open(os.path.join(project, path), "rb") as f:
+            originals[path] = f.read()
+        try:
+            found, missing = mutation_operators.generate(path, originals[path], names, limit)
+        except (SyntaxError, ValueError) as e:
+            print(f"Error: cannot parse {path}: {e}", file=sys.stderr)
+            sys.exit(1)
+        mutants += found
+        unmatched += [f"{path}:{name}" for name in missing]
+    for number, mutant in enumerate(mutants, 1):
+        mutant["id"] = f"M{number:03d}"
+
+    coverage_file = options.get("--coverage") or os.path.join(project, ".coverage")
+    cov = coverage_map.load(coverage_file, project) if os.path.isfile(coverage_file) else None
+    if options.get("--coverage") and cov is None:
+        print(f"Error: {coverage_file} has no test contexts (record with --cov-context=test)", file=sys.stderr)
+        sys.exit(1)
+    if not mutants:
+        print(json.dumps({"error": "no mutants generated", "unsupported": unsupported, "unmatched": unmatched}))
+        sys.exit(1)
+
+    command = shlex.split(options.get("--test-command") or DEFAULT_COMMAND)
+    started = time.perf_counter()
+    failure = run(project, mutants, originals, command, cov, jobs, timeout, isolation)
+    if failure is not None:
+        print(json.dumps({"error": "baseline tests fail without mutations", "output": failure}))
+        sys.exit(1)
+    result = report(mutants, review.get("mutation_kill_threshold", 80),
+                    test_selection="coverage" if cov else "all", jobs=jobs, isolation=isolation,
+                    timeout=timeout, seconds=round(time.perf_counter() - started, 3),
+                    unsupported=unsupported, unmatched=unmatched)
+    text = json.dumps(result, indent=2)
+    if options.get("--output"):
+        with open(options["--output"], "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Compiled file-scope matcher for validate_story_scope.py.
+
+A story's declared `files` list is compiled once into two segment tries and a
+set of glob regexes, then cached per story file by (mtime, size, inode) — in
+memory for the hook daemon and under .shaktra/.index/scope/ for one-shot hook
+runs. A story file modified within RACY_WINDOW_NS is compiled but not cached,
+since a second same-size write inside the same mtime tick would go unnoticed.
+
+Matching keeps the original semantics for literal entries:
+  - exact match                  rel == declared
+  - directory containment        rel is inside declared
+  - segment-aligned suffix       rel ends with /declared, or declared ends with /rel
+and adds glob entries (`*`, `?`, `**` across directories) and negations
+(`!pattern`), which exclude matching paths from the scope. Brackets are not
+glob syntax: `app/[id]/page.tsx` is a literal route path, never a character
+class. Every glob entry also matches as a literal path first, so a file whose
+name contains `*` or `?` is still in scope. A glob that matches a leading part
+of the path contains everything beneath it, like a literal directory. Each glob is attached to the trie node of its literal
+leading directories, so a lookup only tries globs on the path being checked.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+
+CACHE_VERSION = 3
+RACY_WINDOW_NS = 2_000_000_000
+END = "/end"    # trie key: a declared path ends at this node
+GLOB = "/glob"  # trie key: regex for globs whose literal prefix ends at this node
+GLOB_CHARS = frozenset("*?")
+
+_memo: dict[str, tuple] = {}
+_regex_cache: dict[str, re.Pattern] = {}
+
+
+def normalize(file_path: str, project: str) -> str:
+    """Strip project dir prefix, leading ./, and trailing slash to get a relative path."""
+    proj = project.rstrip(os.sep)
+    if file_path == proj or file_path.startswith(proj + os.sep):
+        file_path = file_path[len(proj):]
+    file_path = file_path.lstrip(os.sep)
+    if file_path.startswith("./"):
+        file_path = file_path[2:]
+    return file_path.rstrip(os.sep)
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a path glob into a regex source. `**` spans directories; `*` does not; brackets are literal."""
+    out, i, n = [], 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+def _combine(regexes: list[str]) -> str:
+    """Combine glob regexes into one pattern that also accepts anything beneath a match."""
+    return "(?:" + "|".join(regexes) + ")(?:/.*)?"
+
+
+def _node(trie: dict, segments) -> dict:
+    for seg in segments:
+        trie = trie.setdefault(seg, {})
+    return trie
+
+
+def compile_scope(files: list, project: str) -> dict:
+    """Compile a declared files list into a JSON-serializable matcher."""
+    prefix: dict = {}
+    suffix: dict = {}
+    globs: dict[tuple, list[str]] = {}
+    negations: list[str] = []
+    for declared in files:
+        if not isinstance(declared, str):
+            continue
+        negate = declared.startswith("!")
+        norm = normalize(declared[1:] if negate else declared, project)
+        if not norm:
+            continue
+        if negate:
+            negations.append(glob_to_regex(norm))
+            continue
+        segments = norm.split("/")
+        _node(prefix, segments)[END] = True  # literal match first, globs included
+        _node(suffix, reversed(segments))[END] = True
+        if GLOB_CHARS.isdisjoint(norm):
+            continue
+        literal = []
+        for seg in segments[:-1]:
+            if not GLOB_CHARS.isdisjoint(seg):
+                break
+            literal.append(seg)
+        remainder = "/".join(segments[len(literal):])
+        globs.setdefault(tuple(literal), []).append(glob_to_regex(remainder))
+    for literal, regexes in globs.items():
+        _node(prefix, literal)[GLOB] = _combine(regexes)
+    return {
+        "prefix": prefix,
+        "suffix": suffix,
+        "negate": _combine(negations) if negations else None,
+        "declared": [str(f) for f in files],
+    }
+
+
+def _regex(source: str) -> re.Pattern:
+    compiled = _regex_cache.get(source)
+    if compiled is None:
+        compiled = _regex_cache[source] = re.compile(source)
+    return compiled
+
+
+def matches(scope: dict, rel: str) -> bool:
+    """Return True if rel (project-relative, normalized) is inside the compiled scope."""
+    if scope["negate"] and _regex(scope["negate"]).fullmatch(rel):
+        return False
+    segments = rel.split("/")
+    count = len(segments)
+
+    # Exact match, directory containment, and globs anchored at each literal prefix
+    node = scope["prefix"]
+    for i in range(count + 1):
+        if END in node:
+            return True
+        if GLOB in node and i < count and _regex(node[GLOB]).fullmatch("/".join(segments[i:])):
+            return True
+        if i == count:
+            break
+        node = node.get(segments[i])
+        if node is None:
+            break
+
+    # Segment-aligned suffix match in either direction
+    node = scope["suffix"]
+    for seg in reversed(segments):
+        node = node.get(seg)
+        if node is None:
+            return False
+        if END in node:
+            return True
+    return any(key != END for key in node)
+
+
+def _cache_path(project: str, story_path: str) -> str:
+    name = os.path.basename(story_path)
+    return os.path.join(project, ".shaktra", ".index", "scope", f"{name}.json")
+
+
+def load_scope(story_path: str, project: str, load_files) -> dict:
+    """Return the compiled scope for a story file, compiling only when the file changed.
+
+    load_files() is called on a cache miss and must return the story's files list.
+    """
+    try:
+        st = os.stat(story_path)
+    except OSError:
+        return compile_scope(load_files(), project)
+    key = [CACHE_VERSION, st.st_mtime_ns, st.st_size, st.st_ino, project]
+
+    memo = _memo.get(story_path)
+    if memo and memo[0] == key:
+        return memo[1]
+
+    cache_path = _cache_path(project, story_path)
+    scope = None
+    try:
+        with open(cache_path) as f:
+            record = json.load(f)
+        if isinstance(record, dict) and record.get("key") == key:
+            scope = record["scope"]
+    except (OSError, ValueError, KeyError):
+        scope = None
+
+    if scope is None:
+        scope = compile_scope(load_files(), project)
+        try:
+            after = os.stat(story_path)
+        except OSError:
+            return scope
+        if (time.time_ns() - st.st_mtime_ns <= RACY_WINDOW_NS
+                or [CACHE_VERSION, after.st_mtime_ns, after.st_size, after.st_ino, project] != key):
+            return scope  # racily new or changed while loading: do not cache
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump({"key": key, "scope": scope}, f, separators=(",", ":"))
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+
+    _memo[story_path] = (key, scope)
+    return scope
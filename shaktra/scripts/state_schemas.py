@@ -0,0 +1,192 @@
+"""Validators for Shaktra state files other than stories and handoffs.
+
+Rules follow the schemas in skills/shaktra-reference/schemas/ (settings,
+principles, anti-patterns, procedures) and skills/shaktra-stories/sprint-schema.md.
+Each validator takes the parsed YAML mapping and returns a list of error strings,
+like validate_story() and validate_handoff() in validate_schema.py.
+"""
+
+from __future__ import annotations
+
+SETTINGS_REQUIRED = ("project", "tdd", "quality", "review", "analysis", "refactoring", "sprints")
+SETTINGS_PROJECT_REQUIRED = ("name", "type", "language")
+SETTINGS_FIELDS = {
+    "tdd": {"coverage_threshold": "percent", "hotfix_coverage_threshold": "percent",
+            "small_coverage_threshold": "percent", "large_coverage_threshold": "percent"},
+    "quality": {"p1_threshold": "count"},
+    "review": {"min_verification_tests": "count"},
+    "analysis": {"summary_token_budget": "count", "incremental_refresh": "bool"},
+    "refactoring": {"safety_threshold": "percent", "structural_safety_threshold": "percent",
+                    "max_characterization_tests": "count"},
+    "sprints": {"enabled": "bool", "velocity_tracking": "bool", "sprint_duration_weeks": "count",
+                "default_velocity": "count"},
+    "pm": {"quick_win_effort_threshold": "count", "big_bet_impact_threshold": "count",
+           "min_persona_evidence": "count", "min_journey_stages": "count"},
+    "memory": {"confidence_start": "fraction", "confidence_reinforce": "fraction",
+               "confidence_weaken": "fraction", "confidence_contradict": "fraction",
+               "confidence_archive": "fraction", "max_principles": "count", "max_anti_patterns": "count",
+               "max_procedures": "count", "max_observations_per_story": "count",
+               "briefing_confidence_threshold": "fraction", "retrieval_tier1_max": "count",
+               "retrieval_tier2_max": "count", "max_briefing_entries": "count",
+               "retrieval_chunk_size": "count"},
+}
+SETTINGS_ENUMS = {
+    ("project", "type"): {"greenfield", "brownfield"},
+    ("review", "verification_test_persistence"): {"auto", "always", "never", "ask"},
+    ("pm", "default_framework"): {"rice", "weighted", "moscow"},
+    ("memory", "backend"): {"yaml", "sqlite"},
+}
+
+VALID_TRENDS = {"improving", "stable", "declining"}
+VALID_PRIORITIES = {"critical", "high", "medium", "low"}
+
+# memory file -> (top-level key, ID prefix, required text fields, valid statuses, list fields)
+MEMORY_STORES = {
+    "principles.yml": ("principles", "PR-", ("text",), {"active", "archived", "superseded"},
+                       ("categories", "guidance", "tags", "roles")),
+    "anti-patterns.yml": ("anti_patterns", "AP-", ("failed_approach", "recommended_approach"),
+                          {"active", "archived"}, ("trigger_patterns", "tags", "roles")),
+    "procedures.yml": ("procedures", "PC-", ("text",), {"active", "archived"},
+                       ("tags", "roles", "applies_to")),
+}
+VALID_MEMORY_SCOPES = {"project", "universal"}
+VALID_SEVERITIES = {"P0", "P1", "P2", "P3"}
+VALID_CATEGORIES = {
+    "correctness", "reliability", "performance", "security", "maintainability", "testability",
+    "observability", "scalability", "compatibility", "accessibility", "usability", "cost",
+    "compliance", "consistency",
+}
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_kind(name: str, value, kind: str) -> str | None:
+    if kind == "bool" and not isinstance(value, bool):
+        return f"'{name}' must be true or false, got {value!r}"
+    if kind == "count" and not (_is_int(value) and value >= 0):
+        return f"'{name}' must be a non-negative integer, got {value!r}"
+    if kind == "percent" and not (_is_int(value) and 0 <= value <= 100):
+        return f"'{name}' must be an integer from 0 to 100, got {value!r}"
+    if kind == "fraction" and not (isinstance(value, (int, float)) and not isinstance(value, bool)
+                                   and 0 <= value <= 1):
+        return f"'{name}' must be a number from 0 to 1, got {value!r}"
+    return None
+
+
+def validate_settings(data: dict) -> list[str]:
+    errors = [f"Missing required section: {s}" for s in SETTINGS_REQUIRED if s not in data]
+    project = data.get("project")
+    if isinstance(project, dict):
+        errors += [f"'project.{f}' must be set" for f in SETTINGS_PROJECT_REQUIRED if not project.get(f)]
+    for section, fields in SETTINGS_FIELDS.items():
+        values = data.get(section)
+        if values is None:
+            continue
+        if not isinstance(values, dict):
+            errors.append(f"'{section}' must be a mapping")
+            continue
+        for field, kind in fields.items():
+            if field in values:
+                error = _check_kind(f"{section}.{field}", values[field], kind)
+                if error:
+                    errors.append(error)
+    for (section, field), valid in SETTINGS_ENUMS.items():
+        values = data.get(section)
+        value = values.get(field) if isinstance(values, dict) else None
+        if value and str(value).lower() not in valid:
+            errors.append(f"Invalid {section}.{field} '{value}' — must be one of: {', '.join(sorted(valid))}")
+    return errors
+
+
+def validate_sprints(data: dict) -> list[str]:
+    """Accepts both the init template form and the scrummaster's migrated schema."""
+    errors = []
+    sprint = data.get("current_sprint")
+    if sprint is not None:
+        if not isinstance(sprint, dict):
+            errors.append("'current_sprint' must be a mapping or null")
+        else:
+            if "id" not in sprint:
+                errors.append("Missing required field: current_sprint.id")
+            if not isinstance(sprint.get("stories", []), list):
+                errors.append("'current_sprint.stories' must be a list of story IDs")
+            for field in ("capacity_points", "committed_points"):
+                error = _check_kind(f"current_sprint.{field}", sprint.get(field, 0), "count")
+                if error:
+                    errors.append(error)
+    for field in ("velocity_history", "sprints"):
+        if field in data and not isinstance(data[field], list):
+            errors.append(f"'{field}' must be a list")
+    velocity = data.get("velocity")
+    if velocity is not None:
+        if not isinstance(velocity, dict):
+            errors.append("'velocity' must be a mapping")
+        else:
+            history = velocity.get("history", [])
+            if not isinstance(history, list):
+                errors.append("'velocity.history' must be a list")
+            else:
+                for i, entry in enumerate(history):
+                    if not isinstance(entry, dict) or "sprint_id" not in entry:
+                        errors.append(f"velocity.history[{i}] must be a mapping with sprint_id")
+            trend = velocity.get("trend")
+            if trend is not None and str(trend).lower() not in VALID_TRENDS:
+                errors.append(f"Invalid velocity.trend '{trend}' — must be one of: {', '.join(sorted(VALID_TRENDS))}")
+    backlog = data.get("backlog")
+    if backlog is not None and not isinstance(backlog, list):
+        errors.append("'backlog' must be a list")
+    for i, item in enumerate(backlog if isinstance(backlog, list) else []):
+        if not isinstance(item, dict) or "story_id" not in item:
+            errors.append(f"backlog[{i}] must be a mapping with story_id")
+            continue
+        priority = item.get("priority")
+        if priority is not None and str(priority).lower() not in VALID_PRIORITIES:
+            errors.append(f"Invalid backlog[{i}].priority '{priority}' — must be one of: "
+                          f"{', '.join(sorted(VALID_PRIORITIES))}")
+        if "blocked_by" in item and not isinstance(item["blocked_by"], list):
+            errors.append(f"'backlog[{i}].blocked_by' must be a list")
+    return errors
+
+
+def validate_memory(filename: str, data: dict) -> list[str]:
+    key, prefix, required, statuses, list_fields = MEMORY_STORES[filename]
+    if key not in data:
+        return [f"Missing required field: {key}"]
+    entries = data[key]
+    if not isinstance(entries, list):
+        return [f"'{key}' must be a list"]
+    errors, seen = [], set()
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append(f"{key}[{i}] must be a mapping")
+            continue
+        entry_id = entry.get("id")
+        label = entry_id or f"{key}[{i}]"
+        if not isinstance(entry_id, str) or not entry_id.startswith(prefix):
+            errors.append(f"{label}: 'id' must start with {prefix}")
+        elif entry_id in seen:
+            errors.append(f"{label}: duplicate id")
+        seen.add(entry_id)
+        errors += [f"{label}: missing required field: {f}" for f in required if not entry.get(f)]
+        error = _check_kind("confidence", entry.get("confidence", 0), "fraction")
+        if error:
+            errors.append(f"{label}: {error}")
+        status = entry.get("status")
+        if status is not None and str(status).lower() not in statuses:
+            errors.append(f"{label}: invalid status '{status}' — must be one of: {', '.join(sorted(statuses))}")
+        scope = entry.get("scope")
+        if scope is not None and str(scope).lower() not in VALID_MEMORY_SCOPES:
+            errors.append(f"{label}: invalid scope '{scope}' — must be one of: project, universal")
+        errors += [f"{label}: '{f}' must be a list" for f in list_fields
+                   if f in entry and not isinstance(entry[f], list)]
+        severity = entry.get("severity")
+        if severity is not None and str(severity).upper() not in VALID_SEVERITIES:
+            errors.append(f"{label}: invalid severity '{severity}' — must be one of: P0, P1, P2, P3")
+        categories = entry.get("categories")
+        if filename == "principles.yml" and isinstance(categories, list):
+            unknown = [c for c in categories if str(c).lower() not in VALID_CATEGORIES]
+            if unknown:
+                errors.append(f"{label}: unknown categories {unknown}")
+    return errors
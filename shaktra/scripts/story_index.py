@@ -0,0 +1,212 @@
+"""Active-story index shared by the Shaktra hooks.
+
+validate_schema.py records every handoff write in .shaktra/.index/active.json
+(story ID, phase, mtime). check_p0_findings.py and validate_story_scope.py read
+the active story from it without parsing any handoff. When the index is missing,
+unreadable, or older than the handoffs it describes, readers fall back to a full
+scan and rebuild it. The rebuild re-parses only handoffs whose mtime changed.
+
+Freshness is checked by stat alone: the stories directory, every story
+directory (a new handoff.yml changes its directory's mtime), and every indexed
+handoff (a handoff rewritten in place, by any tool) must match the recorded
+mtimes. Index updates are read-modify-write under an exclusive lock on
+.shaktra/.index/active.lock and land with an atomic replace, so concurrent
+hooks cannot drop each other's updates.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks; updates stay atomic but may race
+    fcntl = None
+
+from yaml_cache import load_yaml
+
+INDEX_VERSION = 2
+TERMINAL_PHASES = ("complete", "failed")
+
+
+def stories_dir(project: str) -> str:
+    return os.path.join(project, ".shaktra", "stories")
+
+
+def index_path(project: str) -> str:
+    return os.path.join(project, ".shaktra", ".index", "active.json")
+
+
+@contextmanager
+def _locked(project: str):
+    """Hold the exclusive index lock for a read-modify-write of active.json."""
+    path = index_path(project)[:-len(".json")] + ".lock"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError:
+        yield  # unwritable .shaktra — the index is only a cache
+        return
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # releases the lock
+
+
+def _mtime_ns(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_index(project: str) -> dict | None:
+    """Return the parsed index, or None if missing or unreadable."""
+    try:
+        with open(index_path(project)) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return None
+    if not isinstance(index.get("stories"), dict):
+        return None
+    return index
+
+
+def save_index(project: str, index: dict) -> None:
+    """Write the index atomically. Failures are ignored — the index is only a cache."""
+    path = index_path(project)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _select_active(stories: dict) -> str | None:
+    """Return the key of the most recently written non-terminal handoff."""
+    best_key, best_mtime = None, -1
+    for key, entry in stories.items():
+        if entry.get("phase") in TERMINAL_PHASES:
+            continue
+        if entry["mtime_ns"] > best_mtime:
+            best_key, best_mtime = key, entry["mtime_ns"]
+    return best_key
+
+
+def is_fresh(project: str, index: dict) -> bool:
+    """Stat-only freshness check: no story directory or handoff added, removed, or rewritten."""
+    root = stories_dir(project)
+    if index.get("stories_mtime_ns") != _mtime_ns(root):
+        return False
+    dirs = index.get("dirs")
+    if not isinstance(dirs, dict):
+        return False
+    if any(mtime_ns != _mtime_ns(os.path.join(root, name)) for name, mtime_ns in dirs.items()):
+        return False
+    return all(entry["mtime_ns"] == _mtime_ns(entry["path"]) for entry in index["stories"].values())
+
+
+def _entry(path: str, mtime_ns: int, handoff: dict) -> dict:
+    return {
+        "story_id": handoff.get("story_id"),
+        "phase": handoff.get("current_phase", ""),
+        "mtime_ns": mtime_ns,
+        "path": path,
+    }
+
+
+def rebuild(project: str, import_yaml, previous: dict | None = None) -> dict:
+    """Scan every handoff and rebuild the index, reusing entries whose mtime is unchanged.
+
+    import_yaml is called only if a handoff actually needs parsing and is not cached.
+    """
+    known = (previous or {}).get("stories", {})
+    root = stories_dir(project)
+    stories, dirs = {}, {}
+    stories_mtime_ns = _mtime_ns(root)  # before listing: a directory added meanwhile forces the next rebuild
+    try:
+        names = os.listdir(root)
+    except OSError:
+        # Not a Shaktra project (or no stories yet) — nothing to index, nothing to write
+        return {"version": INDEX_VERSION, "stories_mtime_ns": None, "dirs": {}, "stories": {}, "active": None}
+    for name in names:
+        dir_mtime_ns = _mtime_ns(os.path.join(root, name))
+        if dir_mtime_ns is None or not os.path.isdir(os.path.join(root, name)):
+            continue
+        dirs[name] = dir_mtime_ns
+        path = os.path.join(root, name, "handoff.yml")
+        mtime_ns = _mtime_ns(path)
+        if mtime_ns is None:
+            continue
+        cached = known.get(name)
+        if cached and cached.get("mtime_ns") == mtime_ns and cached.get("path") == path:
+            stories[name] = cached
+            continue
+        try:
+            handoff = load_yaml(path, import_yaml)
+        except Exception:
+            continue
+        if isinstance(handoff, dict):
+            stories[name] = _entry(path, mtime_ns, handoff)
+    index = {
+        "version": INDEX_VERSION,
+        "stories_mtime_ns": stories_mtime_ns,
+        "dirs": dirs,
+        "stories": stories,
+        "active": _select_active(stories),
+    }
+    save_index(project, index)
+    return index
+
+
+def _current(project: str, import_yaml) -> dict:
+    index = load_index(project)
+    if index is not None and is_fresh(project, index):
+        return index
+    return rebuild(project, import_yaml, index)
+
+
+def current_index(project: str, import_yaml) -> dict:
+    """Return a fresh index, rebuilding it (under the lock) if missing or stale."""
+    index = load_index(project)
+    if index is not None and is_fresh(project, index):
+        return index
+    with _locked(project):
+        return _current(project, import_yaml)  # another hook may have rebuilt it meanwhile
+
+
+def find_active(project: str, import_yaml) -> dict | None:
+    """Return the index entry (story_id, phase, mtime_ns, path) of the active story, or None."""
+    index = current_index(project, import_yaml)
+    active = index.get("active")
+    return index["stories"].get(active) if active else None
+
+
+def record_handoff(project: str, path: str, handoff: dict, import_yaml) -> None:
+    """Record a handoff write seen by validate_schema.py."""
+    path = os.path.abspath(path)
+    if os.path.dirname(os.path.dirname(path)) != os.path.abspath(stories_dir(project)):
+        return
+    mtime_ns = _mtime_ns(path)
+    if mtime_ns is None:
+        return
+    name = os.path.basename(os.path.dirname(path))
+    with _locked(project):
+        index = _current(project, import_yaml)
+        entry_path = os.path.join(stories_dir(project), name, "handoff.yml")
+        index["stories"][name] = _entry(entry_path, mtime_ns, handoff)
+        index["dirs"][name] = _mtime_ns(os.path.dirname(entry_path))
+        index["active"] = _select_active(index["stories"])
+        save_index(project, index)
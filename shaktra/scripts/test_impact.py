@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""Test impact analysis for the TDD quality loop.
+
+Usage: test_impact.py record|select [PROJECT_DIR] [--coverage FILE] [--run] [--test-command CMD] [--story ID] [--files PATH...] [--all]
+
+record  Stores .shaktra/.index/test-impact.bin: per executed file, a hash of
+        each line and the tests that ran it (coverage_map.py), plus a content
+        hash of every project file. Reads a coverage.py data file recorded with
+        test contexts (--coverage, default PROJECT_DIR/.coverage), or with --run
+        makes one by running the pytest command (--test-command, default
+        `python -m pytest -q -p no:cacheprovider`) plus `--cov --cov-context=test`
+        — a full suite run whose test output goes to stderr.
+
+select  Lists the tests affected by what changed since the map was recorded,
+        limited to the active story's `files` scope (--story ID overrides the
+        active story; --files names the changed paths explicitly; --all checks
+        the whole project). Test configuration is checked regardless of scope.
+
+Selection per changed file:
+  measured source      tests that ran the changed or deleted lines (lines
+                       around an insertion); all tests that ran the file when a
+                       changed line was never run by a test (import-time code)
+  test file            the whole file
+  new Python source,   nothing: new modules only run through the changed files
+  documentation        that import them; docs (.md, .rst, .txt, images) and
+                       .coverage data never run
+  anything else        the full suite — configuration, data, a source file the
+                       map did not measure, or one only executed at import time
+
+`mode` is `selected` (run `tests`), `none` (nothing affected), or `full` (run
+the whole suite, with `reasons`). Selection is for fix iterations only; the
+quality gate always runs the full suite (re-record then with `record --run`).
+
+Prints a JSON report. Exit 0 = success, Exit 1 = usage or input error.
+"""
+
+from __future__ import annotations
+
+import difflib
+import hashlib
+import json
+import marshal
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+import analysis_static
+import coverage_map
+import story_index
+from scope_matcher import load_scope, matches, normalize
+from yaml_cache import load_yaml
+
+VERSION = 1
+DEFAULT_COMMAND = f"{shlex.quote(sys.executable)} -m pytest -q -p no:cacheprovider"
+COVERAGE_FLAGS = ["--cov", "--cov-context=test", "--cov-report="]
+TEST_CONFIG = {"conftest.py", "pyproject.toml", "setup.cfg", "setup.py", "pytest.ini", "tox.ini", ".coveragerc",
+               "noxfile.py", "requirements.txt", "requirements-dev.txt", "poetry.lock", "Pipfile.lock", "uv.lock"}
+IGNORED_SUFFIXES = (".md", ".rst", ".txt", ".png", ".jpg", ".jpeg", ".gif", ".svg")
+
+
+def map_path(project: str) -> str:
+    return os.path.join(project, ".shaktra", ".index", "test-impact.bin")
+
+
+def digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def line_hashes(data: bytes) -> list[int]:
+    return [zlib.crc32(line) for line in data.splitlines()]
+
+
+def is_test_file(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def read(project: str, path: str) -> bytes | None:
+    try:
+        with open(os.path.join(project, path), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def record(project: str, data_file: str) -> dict:
+    """Build the map from a coverage data file and save it; return the report."""
+    cov = coverage_map.load(data_file, project) if os.path.isfile(data_file) else None
+    if cov is None:
+        raise ValueError(f"{data_file} has no test contexts (record with --cov-context=test)")
+    tests = sorted({t for by_line in cov.values() for ts in by_line.values() for t in ts})
+    index = {t: i for i, t in enumerate(tests)}
+    files, snapshot = {}, {}
+    for path in analysis_static.list_files(project):
+        data = read(project, path)
+        if data is None:
+            continue
+        st = os.stat(os.path.join(project, path))
+        snapshot[path] = (st.st_mtime_ns, st.st_size, digest(data))
+        if path in cov:
+            files[path] = {"lines": line_hashes(data),
+                           "hits": {line: tuple(sorted(index[t] for t in ts)) for line, ts in cov[path].items()}}
+    measured = sorted(p for p in coverage_map.measured(data_file, project) if p in snapshot)
+    impact = {"version": VERSION, "recorded_ns": time.time_ns(), "tests": tests, "files": files,
+              "measured": measured, "snapshot": snapshot}
+    path = map_path(project)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(tmp, "wb") as f:
+        marshal.dump(impact, f)
+    os.replace(tmp, path)
+    return {"map": os.path.relpath(path, project), "tests": len(tests), "files": len(files),
+            "measured": len(measured), "snapshot": len(snapshot)}
+
+
+def run_suite(project: str, command: list[str], data_file: str) -> dict:
+    """Run the full suite with per-test contexts into data_file; its output goes to stderr."""
+    result = subprocess.run(command + COVERAGE_FLAGS, cwd=project, env={**os.environ, "COVERAGE_FILE": data_file},
+                            stdout=sys.stderr, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+    return {"test_exit_code": result.returncode, "tests_passed": result.returncode == 0}
+
+
+def load_map(project: str) -> dict | None:
+    try:
+        with open(map_path(project), "rb") as f:
+            impact = marshal.load(f)
+        if impact.get("version") == VERSION:
+            return impact
+    except Exception:
+        pass  # missing, corrupt, or older format — the caller runs the full suite
+    return None
+
+
+def affected_lines(old: list[int], new: list[int]) -> set[int]:
+    """1-based lines of the recorded file that were replaced, deleted, or border an insertion."""
+    lines: set[int] = set()
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    for tag, i1, i2, _, _ in matcher.get_opcodes():
+        if tag in ("replace", "delete"):
+            lines.update(range(i1 + 1, i2 + 1))
+        elif tag == "insert":
+            lines.update(line for line in (i1, i1 + 1) if 1 <= line <= len(old))
+    return lines
+
+
+def changed_files(project: str, impact: dict, scope: dict | None, explicit: list[str] | None) -> list[str]:
+    """Paths in scope whose content differs from the recorded snapshot, new and deleted ones included."""
+    snapshot = impact["snapshot"]
+    if explicit is not None:
+        paths = {normalize(os.path.join(project, p), project) for p in explicit}
+    else:
+        paths = set(analysis_static.list_files(project)) | set(snapshot)
+        if scope is not None:
+            paths = {p for p in paths if matches(scope, p) or p.rsplit("/", 1)[-1] in TEST_CONFIG}
+    changed = []
+    for path in sorted(paths):
+        try:
+            st = os.stat(os.path.join(project, path))
+        except OSError:
+            if path in snapshot:
+                changed.append(path)  # deleted
+            continue
+        recorded = snapshot.get(path)
+        if recorded and recorded[:2] == (st.st_mtime_ns, st.st_size):
+            continue
+        data = read(project, path)
+        if recorded is None or data is None or digest(data) != recorded[2]:
+            changed.append(path)
+    return changed
+
+
+def select(project: str, impact: dict, changed: list[str]) -> dict:
+    """Apply the per-file selection rules to the changed paths."""
+    tests, files, measured = impact["tests"], impact["files"], set(impact["measured"])
+    test_paths = {t.split("::", 1)[0] for t in tests}
+    selected, test_files, reasons, ignored = set(), set(), [], []
+    for path in changed:
+        name = path.rsplit("/", 1)[-1]
+        exists = os.path.exists(os.path.join(project, path))
+        if name in TEST_CONFIG:
+            reasons.append(f"{path}: test configuration changed")
+        elif is_test_file(path) or path in test_paths:
+            if exists:
+                test_files.add(path)
+            else:
+                ignored.append(path)  # deleted: its recorded tests are dropped below
+        elif path in files:
+            hits, old = files[path]["hits"], files[path]["lines"]
+            lines = affected_lines(old, line_hashes(read(project, path) or b"")) if exists else set(hits)
+            if any(line not in hits for line in lines):
+                selected.update(i for ts in hits.values() for i in ts)  # import-time or unexecuted code changed
+            else:
+                selected.update(i for line in lines for i in hits[line])
+        elif path in measured:
+            reasons.append(f"{path}: only executed at import time, not attributable to tests")
+        elif path.endswith(".py") and path not in impact["snapshot"] or path.lower().endswith(IGNORED_SUFFIXES) \
+                or name.startswith(".coverage"):
+            ignored.append(path)
+        else:
+            reasons.append(f"{path}: not measured by the recorded coverage")
+    nodes = sorted({tests[i] for i in selected if tests[i].split("::", 1)[0] not in test_files
+                    and os.path.exists(os.path.join(project, tests[i].split("::", 1)[0]))} | test_files)
+    return {"mode": "full" if reasons else "selected" if nodes else "none", "tests": [] if reasons else nodes,
+            "reasons": reasons, "ignored": ignored, "total_tests": len(tests)}
+
+
+def story_scope(project: str, story_id: str | None) -> tuple[str | None, dict | None]:
+    """(story_id, compiled files scope) of the named or active story; (None, None) when there is none."""
+    if story_id is None:
+        entry = story_index.find_active(project, _import_yaml)
+        story_id = entry["story_id"] if entry else None
+    if story_id is None:
+        return None, None
+    story_path = os.path.join(project, ".shaktra", "stories", f"{story_id}.yml")
+    if not os.path.isfile(story_path):
+        raise ValueError(f"story {story_id} not found")
+    story = load_yaml(story_path, _import_yaml)
+    files = story.get("files") if isinstance(story, dict) else None
+    scoped = isinstance(files, list) and files  # no declared scope: check the whole project
+    return story_id, load_scope(story_path, project, lambda: files) if scoped else None
+
+
+def _import_yaml():
+    try:
+        import yaml
+        return yaml
+    except ImportError:
+        print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
+        sys.exit(1)
+
+
+def main():
+    args = sys.argv[1:]
+    action = args.pop(0) if args and args[0] in ("record", "select") else None
+    project, story_id, explicit, options = None, None, None, {}
+    while args and action:
+        arg = args.pop(0)
+        if arg in ("--run", "--all"):
+            options[arg] = True
+        elif arg in ("--coverage", "--test-command") and args:
+            options[arg] = args.pop(0)
+        elif arg == "--story" and args:
+            story_id = args.pop(0)
+        elif arg == "--files":
+            explicit = explicit or []
+            while args and not args[0].startswith("--"):
+                explicit.append(args.pop(0))
+        elif not arg.startswith("-") and project is None:
+            project = arg
+        else:
+            action = None
+    if action is None:
+        print(__doc__.strip().splitlines()[2], file=sys.stderr)
+        sys.exit(1)
+    project = os.path.realpath(project or os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+    if not os.path.isdir(project):
+        print(f"Error: {project} not found", file=sys.stderr)
+        sys.exit(1)
+
+    if action == "record":
+        started, run = time.perf_counter(), {}
+        data_file = options.get("--coverage") or os.path.join(project, ".coverage")
+        workdir = tempfile.mkdtemp(prefix="shaktra-impact-") if options.get("--run") else None
+        try:
+            if workdir:
+                data_file = os.path.join(workdir, ".coverage")
+                run = run_suite(project, shlex.split(options.get("--test-command") or DEFAULT_COMMAND), data_file)
+            report = record(project, data_file)
+        except ValueError as e:
+            print(f"Error: {e}" + (f" (test command exited {run['test_exit_code']})" if run else ""), file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+        print(json.dumps({**report, **run, "seconds": round(time.perf_counter() - started, 3)}, indent=2))
+        return
+
+    impact = load_map(project)
+    if impact is None:
+        print(json.dumps({"mode": "full", "tests": [], "reasons": ["no test-impact map: run `record` first"]}))
+        return
+    try:
+        story_id, scope = (None, None) if options.get("--all") or explicit is not None \
+            else story_scope(project, story_id)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    changed = changed_files(project, impact, scope, explicit)
+    result = select(project, impact, changed)
+    print(json.dumps({**result, "story": story_id, "changed": changed,
+                      "map_age_seconds": (time.time_ns() - impact["recorded_ns"]) // 1_000_000_000}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,13 +7,10 @@ Exit 0 = allow, Exit 2 = block.
 
 from __future__ import annotations
 
-import json
 import os
-import re
 import sys
 
-STORY_RE = re.compile(r"\.shaktra/stories/[^/]+\.yml$")
-HANDOFF_RE = re.compile(r"\.shaktra/stories/[^/]+/handoff\.yml$")
+STORIES_SUFFIX = ".shaktra/stories"
 
 VALID_TIERS = {"trivial", "small", "medium", "large"}
 VALID_SCOPES = {
@@ -31,6 +28,23 @@ def normalize(file_path: str, project: str) -> str:
     return file_path.lstrip(os.sep)
 
 
+def classify(rel: str) -> str | None:
+    """Return "story" for .shaktra/stories/<id>.yml, "handoff" for .shaktra/stories/<id>/handoff.yml."""
+    head, _, name = rel.rpartition("/")
+    if head.endswith(STORIES_SUFFIX) and name.endswith(".yml") and len(name) > 4:
+        return "story"
+    if name == "handoff.yml":
+        parent, _, story_dir = head.rpartition("/")
+        if story_dir and parent.endswith(STORIES_SUFFIX):
+            return "handoff"
+    return None
+
+
+def cannot_mention(raw: str, word: str) -> bool:
+    """True if raw JSON text cannot contain word in any string, even via \\u escapes."""
+    return word not in raw and "\\u" not in raw
+
+
 def validate_story(data: dict) -> list[str]:
     errors = []
     for field in ("id", "title", "description"):
@@ -72,9 +86,16 @@ def validate_handoff(data: dict) -> list[str]:
 
 
 def main() -> None:
+    # Fast path: input that cannot name a .shaktra file needs neither json nor PyYAML
+    raw = sys.stdin.read()
+    if cannot_mention(raw, "shaktra"):
+        sys.exit(0)
+
+    import json
+
     try:
-        data = json.load(sys.stdin)
-    except (json.JSONDecodeError, EOFError):
+        data = json.loads(raw)
+    except json.JSONDecodeError:
         print("BLOCKED: Could not parse hook input — failing closed.")
         sys.exit(2)
 
@@ -85,10 +106,14 @@ def main() -> None:
     project = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
     rel = normalize(file_path, project)
 
-    is_story = bool(STORY_RE.search(rel))
-    is_handoff = bool(HANDOFF_RE.search(rel))
-    if not is_story and not is_handoff:
+    kind = classify(rel)
+    if kind is None:
         sys.exit(0)
+    is_handoff = kind == "handoff"
+
+    import findings_summary
+    import story_index
+    from yaml_cache import load_yaml
 
     try:
         import yaml
@@ -101,8 +126,8 @@ def main() -> None:
         sys.exit(2)
 
     try:
-        with open(file_path) as f:
-            content = yaml.safe_load(f)
+        before = os.stat(file_path)
+        content = load_yaml(file_path, lambda: yaml)
     except yaml.YAMLError as e:
         print(f"BLOCKED: Invalid YAML syntax in {rel}\n  {e}")
         sys.exit(2)
@@ -113,6 +138,10 @@ def main() -> None:
         print(f"BLOCKED: {rel} must be a YAML mapping, got {type(content).__name__}")
         sys.exit(2)
 
+    if is_handoff:
+        story_index.record_handoff(project, file_path, content, lambda: yaml)
+        findings_summary.record(project, file_path, content, before)
+
     errors = validate_handoff(content) if is_handoff else validate_story(content)
 
     if errors:
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Validate every Shaktra state file in a project in one batch.
+
+Usage: validate_state.py [PROJECT_DIR] [--jobs N]
+
+Checks stories and handoffs (with the same rules as the validate_schema.py hook),
+sprints.yml, settings.yml, and the memory stores under .shaktra/, spreading the
+files across a process pool. Read-only: nothing is written, not even the YAML cache.
+
+Prints a JSON report. Exit 0 = all files valid, Exit 1 = at least one invalid file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import yaml
+except ImportError:
+    print("Error: PyYAML required. Install with: pip install pyyaml", file=sys.stderr)
+    sys.exit(1)
+
+from state_schemas import MEMORY_STORES, validate_memory, validate_settings, validate_sprints
+from validate_schema import validate_handoff, validate_story
+from yaml_cache import parse_yaml
+
+INLINE_MAX_FILES = 64  # below this a process pool costs more than it saves
+MAX_ERRORS_PER_FILE = 50
+
+
+def discover(project: str) -> list[tuple[str, str]]:
+    """Return (kind, path) for every state file to validate, stories and handoffs sorted by path."""
+    shaktra = os.path.join(project, ".shaktra")
+    tasks = [("settings", os.path.join(shaktra, "settings.yml"))]
+    if os.path.exists(os.path.join(shaktra, "sprints.yml")):
+        tasks.append(("sprints", os.path.join(shaktra, "sprints.yml")))
+    for filename in MEMORY_STORES:
+        path = os.path.join(shaktra, "memory", filename)
+        if os.path.exists(path):
+            tasks.append((f"memory:{filename}", path))
+    stories = os.path.join(shaktra, "stories")
+    try:
+        entries = sorted(os.scandir(stories), key=lambda e: e.name)
+    except OSError:
+        entries = []
+    for entry in entries:
+        if entry.is_file() and entry.name.endswith(".yml") and len(entry.name) > 4:
+            tasks.append(("story", entry.path))
+        elif entry.is_dir() and os.path.isfile(os.path.join(entry.path, "handoff.yml")):
+            tasks.append(("handoff", os.path.join(entry.path, "handoff.yml")))
+    return tasks
+
+
+def check_file(task: tuple[str, str]) -> tuple[str, str, list[str]]:
+    """Validate one file; return (kind, path, errors)."""
+    kind, path = task
+    try:
+        with open(path) as f:
+            data = parse_yaml(f, yaml)
+    except FileNotFoundError:
+        return kind, path, ["File not found"]
+    except (OSError, UnicodeDecodeError) as e:
+        return kind, path, [f"Could not read file: {e}"]
+    except yaml.YAMLError as e:
+        return kind, path, [f"Invalid YAML syntax: {e}"]
+    if not isinstance(data, dict):
+        return kind, path, [f"Must be a YAML mapping, got {type(data).__name__}"]
+    if kind == "story":
+        return kind, path, validate_story(data)
+    if kind == "handoff":
+        return kind, path, validate_handoff(data)
+    if kind == "settings":
+        return kind, path, validate_settings(data)
+    if kind == "sprints":
+        return kind, path, validate_sprints(data)
+    return kind, path, validate_memory(kind.split(":", 1)[1], data)
+
+
+def run(project: str, jobs: int) -> dict:
+    start = time.perf_counter()
+    tasks = discover(project)
+    if jobs <= 1 or len(tasks) <= INLINE_MAX_FILES:
+        results = [check_file(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(check_file, tasks, chunksize=max(1, len(tasks) // (jobs * 8))))
+    by_kind: dict[str, dict] = {}
+    invalid = []
+    for kind, path, errors in results:
+        group = kind.split(":", 1)[0]
+        stats = by_kind.setdefault(group, {"files": 0, "invalid": 0})
+        stats["files"] += 1
+        if errors:
+            stats["invalid"] += 1
+            if len(errors) > MAX_ERRORS_PER_FILE:
+                extra = len(errors) - MAX_ERRORS_PER_FILE
+                errors = errors[:MAX_ERRORS_PER_FILE] + [f"... and {extra} more"]
+            invalid.append({"path": os.path.relpath(path, project), "kind": kind, "errors": errors})
+    return {
+        "project": project,
+        "files": len(results),
+        "invalid": len(invalid),
+        "by_kind": by_kind,
+        "results": invalid,
+        "jobs": jobs,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def main():
+    project, jobs = None, os.cpu_count() or 1
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        if arg == "--jobs" and args:
+            jobs = int(args.pop(0))
+        elif not arg.startswith("-") and project is None:
+            project = arg
+        else:
+            print(__doc__.strip().splitlines()[2], file=sys.stderr)
+            sys.exit(1)
+    project = os.path.abspath(project or os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+    if not os.path.isdir(os.path.join(project, ".shaktra")):
+        print(f"Error: {project}/.shaktra not found", file=sys.stderr)
+        sys.exit(1)
+
+    report = run(project, jobs)
+    print(json.dumps(report, indent=2, default=str))
+    sys.exit(1 if report["invalid"] else 0)
+
+
+if __name__ == "__main__":
+    main()
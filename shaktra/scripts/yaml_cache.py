@@ -0,0 +1,175 @@
+"""Parsed-YAML cache for Shaktra state files.
+
+Hooks and memory scripts read the same stories, handoffs, settings, and memory
+stores over and over. load_yaml() keeps each parsed document on disk under the
+owning .shaktra/.cache/yaml/ directory, serialized with marshal (or a restricted
+pickle when the document holds dates), keyed by path, size, mtime, and inode.
+A hit costs one stat plus one small read and never imports PyYAML.
+
+Safety rules:
+  - Any change to size, mtime, or inode invalidates the entry.
+  - Files modified within RACY_WINDOW_NS of the parse are not cached, since a
+    second write inside the same mtime tick could go unnoticed.
+  - Files outside a .shaktra/ tree are parsed but never cached.
+  - The cache directory is capped at SHAKTRA_YAML_CACHE_MAX_BYTES (default
+    32 MiB); least recently used entries are evicted first.
+
+Misses parse with libyaml's CSafeLoader when available, else SafeLoader.
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+import time
+import zlib
+
+CACHE_VERSION = 1
+RACY_WINDOW_NS = 2_000_000_000
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+EVICT_EVERY = 256  # stores between size checks within one process (the first store always checks)
+_SAFE_GLOBALS = {
+    ("datetime", "date"),
+    ("datetime", "datetime"),
+    ("datetime", "time"),
+    ("datetime", "timedelta"),
+    ("datetime", "timezone"),
+}
+
+_memo: dict[str, tuple] = {}
+_stores = 0
+
+
+def _cache_dir(path: str) -> str | None:
+    """Return the .shaktra/.cache/yaml directory owning path, or None if outside .shaktra/."""
+    head = path
+    while True:
+        head, tail = os.path.split(head)
+        if tail == ".shaktra":
+            return os.path.join(head, ".shaktra", ".cache", "yaml")
+        if not tail:
+            return None
+
+
+def encode(doc) -> bytes:
+    """Serialize a parsed YAML document: marshal, or restricted pickle when it holds dates."""
+    try:
+        return b"M" + marshal.dumps(doc)
+    except ValueError:
+        import pickle
+        return b"P" + pickle.dumps(doc, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode(blob: bytes):
+    """Inverse of encode(); pickled blobs may only reference datetime classes."""
+    if blob[:1] == b"M":
+        return marshal.loads(blob[1:])
+    if blob[:1] == b"P":
+        import io
+        import pickle
+
+        class _SafeUnpickler(pickle.Unpickler):
+            def find_class(self, module, name):
+                if (module, name) not in _SAFE_GLOBALS:
+                    raise pickle.UnpicklingError(f"{module}.{name} is not allowed")
+                return super().find_class(module, name)
+
+        return _SafeUnpickler(io.BytesIO(blob[1:])).load()
+    raise ValueError("unknown cache entry format")
+
+
+def parse_yaml(stream, yaml):
+    """Parse with the libyaml-backed safe loader when PyYAML was built with it."""
+    loader = getattr(yaml, "CSafeLoader", None) or yaml.SafeLoader
+    return yaml.load(stream, Loader=loader)
+
+
+def _evict(directory: str, max_bytes: int) -> None:
+    entries = []
+    total = 0
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith(".bin"):
+                st = entry.stat()
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                total += st.st_size
+    if total <= max_bytes:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes // 2:
+            break
+        try:
+            os.unlink(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _store(cache_file: str, key: list, blob: bytes) -> None:
+    global _stores
+    directory = os.path.dirname(cache_file)
+    tmp = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump(key, f)
+            f.write(blob)
+        os.replace(tmp, cache_file)
+        if _stores % EVICT_EVERY == 0:
+            max_bytes = int(os.environ.get("SHAKTRA_YAML_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+            _evict(directory, max_bytes)
+        _stores += 1
+    except (OSError, ValueError):
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def load_yaml(path: str, import_yaml):
+    """Return yaml.safe_load() of path, served from the cache when the file is unchanged.
+
+    import_yaml() is called only on a miss. Raises the same errors as parsing the file
+    directly: OSError (e.g. FileNotFoundError) and yaml.YAMLError.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    key = [CACHE_VERSION, path, st.st_size, st.st_mtime_ns, st.st_ino]
+
+    memo = _memo.get(path)
+    if memo and memo[0] == key:
+        return decode(memo[1])
+
+    directory = _cache_dir(path)
+    cache_file = None
+    if directory is not None:
+        # Cheap file name; the stored key carries the full path, so collisions are just misses
+        raw = path.encode()
+        cache_file = os.path.join(directory, f"{zlib.crc32(raw):08x}{zlib.adler32(raw):08x}.bin")
+        try:
+            with open(cache_file, "rb") as f:
+                if marshal.load(f) == key:
+                    blob = f.read()
+                    doc = decode(blob)
+                    _memo[path] = (key, blob)
+                    os.utime(cache_file)  # refresh LRU position
+                    return doc
+        except Exception:
+            pass  # missing, corrupt, or foreign entry — treat as a miss
+
+    yaml = import_yaml()
+    with open(path) as f:
+        doc = parse_yaml(f, yaml)
+
+    # Cache only if the file is not racily new and did not change while being parsed
+    after = os.stat(path)
+    if time.time_ns() - st.st_mtime_ns <= RACY_WINDOW_NS:
+        return doc
+    if [CACHE_VERSION, path, after.st_size, after.st_mtime_ns, after.st_ino] != key:
+        return doc
+    blob = encode(doc)
+    _memo[path] = (key, blob)
+    if cache_file is not None:
+        _store(cache_file, key, blob)
+    return doc